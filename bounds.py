@@ -0,0 +1,218 @@
+from collections import deque
+from math import ceil
+
+from orar import HARD_PENALTY
+
+
+SOURCE, SINK = 'sursa', 'destinatie'
+
+
+def max_flow(graph, source=SOURCE, sink=SINK):
+    """
+    Fluxul maxim (Edmonds-Karp) intr-o retea data ca dictionar nod -> {vecin: capacitate}.
+
+    Args:
+        graph (dict): Reteaua; nu este modificata.
+        source: Nodul sursa.
+        sink: Nodul destinatie.
+
+    Returns:
+        int: Valoarea fluxului maxim.
+    """
+    residual = {}
+    for node, edges in graph.items():
+        for neighbor, capacity in edges.items():
+            residual.setdefault(node, {})
+            residual[node][neighbor] = residual[node].get(neighbor, 0) + capacity
+            residual.setdefault(neighbor, {}).setdefault(node, 0)
+
+    flow = 0
+    while True:
+        parents = {source: None}
+        queue = deque([source])
+        while queue and sink not in parents:
+            node = queue.popleft()
+            for neighbor, capacity in residual.get(node, {}).items():
+                if capacity > 0 and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
+        if sink not in parents:
+            return flow
+
+        path, node = [], sink
+        while parents[node] is not None:
+            path.append((parents[node], node))
+            node = parents[node]
+        pushed = min(residual[u][v] for u, v in path)
+        for u, v in path:
+            residual[u][v] -= pushed
+            residual[v][u] += pushed
+        flow += pushed
+
+
+class Bounds:
+    def __init__(self, info, slots):
+        """
+        Margini inferioare pentru costul oricarui orar al unei instante, calculate inainte de cautare din
+        capacitatea salilor si din orele profesorilor, prin relaxari de flux.
+
+        - studentii: fiecare materie isi acopera cererea doar din salile in care se poate preda, fiecare sala
+          gazduind o singura materie in fiecare interval (flux materie -> (zi, interval, sala));
+        - orele: fiecare materie are nevoie de cel putin ceil(cerere / cea mai mare sala eligibila) ore, iar un
+          profesor preda cel mult limita lui de sloturi (flux materie -> profesor);
+        - preferintele: orele care nu incap in intervalele acceptate de profesori incalca cel putin o
+          constrangere optionala fiecare.
+
+        Args:
+            info (Info): Informatiile despre sali, profesori si materii.
+            slots (list): Intervalele orarului, ca perechi (zi, interval).
+        """
+        self.info = info
+        self.slots = list(slots)
+        # Motivele pentru care nu exista niciun orar fara constrangeri obligatorii incalcate
+        self.reasons = []
+        self.min_lessons = self.lessons_needed()
+        self.student_shortfall = self.check_students()
+        self.lesson_shortfall = self.check_lessons()
+        self.soft = self.soft_bound() if self.feasible() else 0
+
+    def feasible(self):
+        """
+        Returns:
+            bool: False daca instanta sigur nu are niciun orar fara constrangeri obligatorii incalcate.
+        """
+        return not self.reasons
+
+    def lower_bound(self):
+        """
+        Costul minim (in sensul State.get_conflicts) al oricarui orar al instantei; cautarea se poate opri
+        cand un orar valid il atinge.
+
+        Un orar valid costa cat preferintele pe care le incalca, deci cel putin soft_bound; orice orar invalid
+        incalca o constrangere obligatorie (o materie neacoperita sau o ora invalida), deci costa cel putin
+        HARD_PENALTY. O instanta fara orar valid are marginea HARD_PENALTY.
+
+        Returns:
+            int: Marginea inferioara a costului.
+        """
+        if not self.feasible():
+            return HARD_PENALTY
+        return min(HARD_PENALTY, self.soft)
+
+    def lessons_needed(self):
+        """
+        Numarul minim de ore necesar fiecarei materii, folosind cea mai mare sala in care se poate preda.
+
+        Returns:
+            dict: Materie -> numar de ore (None daca materia nu se poate preda in nicio sala).
+        """
+        info = self.info
+        lessons = {}
+        for course, demand in info.courses.items():
+            capacities = [info.classrooms[room]['Capacitate'] for room in info.classrooms
+                          if course in info.room_courses[room]]
+            lessons[course] = ceil(demand / max(capacities)) if capacities else None
+        return lessons
+
+    def check_students(self):
+        """
+        Compara cererea fiecarei materii cu locurile din salile eligibile si calculeaza fluxul maxim de studenti
+        de la materii la sloturile (zi, interval, sala).
+
+        Returns:
+            int: Numarul minim de studenti care raman neacoperiti.
+        """
+        info = self.info
+        graph = {SOURCE: {}}
+        for course, demand in info.courses.items():
+            rooms = [room for room in info.classrooms if course in info.room_courses[room]]
+            if not rooms:
+                self.reasons.append(f'Materia {course} nu se poate preda in nicio sala')
+            supply = len(self.slots) * sum(info.classrooms[room]['Capacitate'] for room in rooms)
+            if supply < demand:
+                self.reasons.append(f'Materia {course} are {demand} studenti, dar salile ei au doar {supply} locuri')
+
+            graph[SOURCE][course] = demand
+            graph[course] = {(day, interval, room): info.classrooms[room]['Capacitate']
+                             for day, interval in self.slots for room in rooms}
+        for day, interval in self.slots:
+            for room in info.classrooms:
+                graph[(day, interval, room)] = {SINK: info.classrooms[room]['Capacitate']}
+
+        shortfall = sum(info.courses.values()) - max_flow(graph)
+        if shortfall > 0:
+            self.reasons.append(f'Salile nu pot acoperi impreuna toate materiile: raman cel putin {shortfall} studenti')
+        return shortfall
+
+    def teacher_hours(self, teacher, allowed=False):
+        """
+        Numarul maxim de ore ale unui profesor: limita de sloturi, dar nu mai mult decat intervalele orarului
+        (sau decat intervalele pe care le accepta, daca allowed este True).
+        """
+        if not allowed:
+            return min(self.info.teacher_slots[teacher], len(self.slots))
+        days, intervals = self.info.forbidden[teacher]
+        return min(self.info.teacher_slots[teacher], sum(day not in days and interval not in intervals
+                                          for day, interval in self.slots))
+
+    def lesson_flow(self, allowed=False):
+        """
+        Fluxul maxim de ore de la materii (cel putin min_lessons ore fiecare) la profesorii care le predau.
+        """
+        info = self.info
+        graph = {SOURCE: {}}
+        for course, lessons in self.min_lessons.items():
+            if lessons is None:
+                continue
+            graph[SOURCE][course] = lessons
+            graph[course] = {teacher: lessons for teacher in info.course_teachers[course]}
+        for teacher in info.teachers:
+            graph[teacher] = {SINK: self.teacher_hours(teacher, allowed)}
+        return max_flow(graph)
+
+    def check_lessons(self):
+        """
+        Compara orele necesare fiecarei materii cu orele pe care le pot preda profesorii ei si calculeaza fluxul
+        maxim de ore de la materii la profesori.
+
+        Returns:
+            int: Numarul minim de ore care nu pot fi predate.
+        """
+        info = self.info
+        for course, lessons in self.min_lessons.items():
+            if lessons is None:
+                continue
+            hours = sum(self.teacher_hours(teacher) for teacher in info.course_teachers[course])
+            if hours < lessons:
+                self.reasons.append(f'Materia {course} are nevoie de cel putin {lessons} ore, '
+                                    f'dar profesorii ei pot preda doar {hours}')
+
+        needed = sum(lessons for lessons in self.min_lessons.values() if lessons is not None)
+        shortfall = needed - self.lesson_flow()
+        if shortfall > 0:
+            self.reasons.append(f'Profesorii nu pot preda impreuna toate orele necesare: lipsesc cel putin {shortfall} ore')
+        return shortfall
+
+    def soft_bound(self):
+        """
+        Numarul minim de constrangeri optionale incalcate de un orar valid: orele necesare (toate materiile sunt
+        acoperite) care nu incap in intervalele acceptate de profesori.
+
+        Returns:
+            int: Marginea inferioara a constrangerilor optionale incalcate.
+        """
+        needed = sum(lessons for lessons in self.min_lessons.values() if lessons is not None)
+        return needed - self.lesson_flow(allowed=True)
+
+
+def instance_bounds(state):
+    """
+    Marginile instantei careia ii apartine starea data.
+
+    Args:
+        state (State): O stare a problemei (doar informatiile si intervalele orarului sunt folosite).
+
+    Returns:
+        Bounds: Marginile instantei.
+    """
+    return Bounds(state.info, [(day, interval) for day in state.timetable for interval in state.timetable[day]])
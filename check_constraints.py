@@ -1,6 +1,7 @@
-import yaml
 import argparse
 import sys
+import io
+from contextlib import redirect_stdout
 from utils import read_yaml_file, get_profs_initials, pretty_print_timetable
 
 
@@ -55,41 +56,54 @@ def get_timetable(timetable_specs : dict, output_name : str, debug_flag : bool =
         print(initials_to_prof)
         print()
 
+    with open(output_name, 'r') as file:
+        return parse_timetable_lines(timetable_specs, file, timetable, initials_to_prof)
+
+
+def parse_timetable_lines(timetable_specs : dict, lines, timetable : dict = None, initials_to_prof : dict = None):
+    '''
+    Se reprezintă intern orarul din liniile unui fișier de ieșire (sau din textul primit de la serviciu, împărțit pe linii).
+    '''
+    if timetable is None:
+        timetable = {day : {eval(interval) : {} for interval in timetable_specs[INTERVALE]} for day in timetable_specs[ZILE]}
+
+    if initials_to_prof is None:
+        _, initials_to_prof = get_profs_initials(timetable_specs[PROFESORI])
+
     interval = None
 
-    with open(output_name, 'r') as file:
-        for line in file:
-            if line[0] != '|':
-                continue
+    for line in lines:
+        if not line or line[0] != '|':
+            continue
 
-            crt_parsing = line.strip().split('|')
-            crt_parsing = [x.strip() for x in crt_parsing]
-            if not crt_parsing:
-                continue
+        crt_parsing = line.strip().split('|')
+        crt_parsing = [x.strip() for x in crt_parsing]
+        if not crt_parsing:
+            continue
 
-            if crt_parsing[1] == 'Interval':
-                continue
+        if crt_parsing[1] == 'Interval':
+            continue
 
-            crt_interval = crt_parsing[1]
+        crt_interval = crt_parsing[1]
 
-            if crt_interval != '':
-                interval = parse_interval(crt_interval)
-            # print(parse_subject_room_prof(crt_parsing[2], timetable_specs[PROFESORI]))
+        if crt_interval != '':
+            interval = parse_interval(crt_interval)
+        # print(parse_subject_room_prof(crt_parsing[2], timetable_specs[PROFESORI]))
 
-            idx = 2
+        idx = 2
 
-            for day in timetable_specs[ZILE]:
-                subject, room, prof = parse_subject_room_prof(crt_parsing[idx], initials_to_prof)
-                if subject:
-                    # ACEEASI SALA ESTE OCUPATA DE 2 MATERII IN ACELASI INTERVAL
-                    if room in timetable[day][interval]:
-                        print(f'Sala {room} este ocupata de 2 materii in acelasi interval!')
-                        raise Exception('Sala ocupata de 2 materii in acelasi interval!')
+        for day in timetable_specs[ZILE]:
+            subject, room, prof = parse_subject_room_prof(crt_parsing[idx], initials_to_prof)
+            if subject:
+                # ACEEASI SALA ESTE OCUPATA DE 2 MATERII IN ACELASI INTERVAL
+                if room in timetable[day][interval]:
+                    print(f'Sala {room} este ocupata de 2 materii in acelasi interval!')
+                    raise Exception('Sala ocupata de 2 materii in acelasi interval!')
 
-                    timetable[day][interval][room] = prof, subject 
-                else:
-                    timetable[day][interval][room] = None
-                idx += 1
+                timetable[day][interval][room] = prof, subject 
+            else:
+                timetable[day][interval][room] = None
+            idx += 1
 
 
     return timetable
@@ -197,6 +211,52 @@ def check_optional_constraints(timetable : {str : {(int, int) : {str : (str, str
 
     return constrangeri_incalcate
 
+
+def validate_timetable(timetable : {str : {(int, int) : {str : (str, str)}}}, timetable_specs : dict):
+    '''
+    Se verifică ambele categorii de constrângeri fără a afișa nimic.
+
+    Returnează numărul de constrângeri obligatorii încălcate, numărul de constrângeri opționale încălcate
+    și lista mesajelor pe care le-ar fi afișat verificările.
+    '''
+
+    output = io.StringIO()
+
+    with redirect_stdout(output):
+        constrangeri_obligatorii = check_mandatory_constraints(timetable, timetable_specs)
+        constrangeri_optionale = check_optional_constraints(timetable, timetable_specs)
+
+    return constrangeri_obligatorii, constrangeri_optionale, output.getvalue().splitlines()
+
+
+def get_forbidden_slots(timetable_specs : dict):
+    '''
+    Se extrag, pentru fiecare profesor, zilele și intervalele în care nu dorește să predea (constrângerile cu '!').
+
+    Returnează un dicționar prof -> (set de zile, set de intervale), cu aceeași semantică ca check_optional_constraints.
+    '''
+
+    forbidden = {}
+
+    for prof in timetable_specs[PROFESORI]:
+        days, intervals = set(), set()
+
+        for const in timetable_specs[PROFESORI][prof][CONSTRANGERI]:
+            if const[0] != '!':
+                continue
+
+            const = const[1:]
+
+            if const in timetable_specs[ZILE]:
+                days.add(const)
+            elif '-' in const:
+                start, end = parse_interval(const)
+                intervals.update((i, i + 2) for i in range(start, end, 2))
+
+        forbidden[prof] = (days, intervals)
+
+    return forbidden
+
 if __name__ == '__main__':
 
     
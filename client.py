@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from service import SOCKET_PATH, TERMINAL_EVENTS
+
+
+class SolverClient:
+    def __init__(self, path=SOCKET_PATH, port=None):
+        """
+        Client pentru serviciul local de rezolvare (service.py).
+
+        O conexiune trateaza cererile pe rand: cat timp se urmareste un job cu watch(), anularea lui
+        se face dintr-un alt client.
+
+        Args:
+            path (str): Calea socketului Unix al serviciului.
+            port (int, optional): Portul pe 127.0.0.1, daca serviciul nu foloseste un socket Unix.
+        """
+        self.path = path
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        if self.port is None:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        return self
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def send(self, request):
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+
+    async def receive(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError('Serviciul a inchis conexiunea')
+        return json.loads(line)
+
+    async def request(self, **request):
+        """
+        Trimite o cerere si intoarce raspunsul; ridica RuntimeError daca serviciul raporteaza o eroare.
+        """
+        await self.send(request)
+        response = await self.receive()
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error'))
+        return response
+
+    async def load(self, path):
+        return (await self.request(op='load', path=path))['instance']
+
+    async def submit(self, kind, path, **params):
+        """
+        Trimite un job ("solve", "validate" sau "repair") si intoarce identificatorul lui.
+        """
+        return (await self.request(op='submit', kind=kind, path=path, params=params))['job']
+
+    async def watch(self, job):
+        """
+        Generator asincron cu evenimentele jobului, pana la cel final (inclusiv).
+        """
+        await self.send({'op': 'watch', 'job': job})
+        while True:
+            event = await self.receive()
+            if 'event' not in event:
+                raise RuntimeError(event.get('error'))
+            yield event
+            if event['event'] in TERMINAL_EVENTS:
+                return
+
+    async def wait(self, job):
+        """
+        Asteapta terminarea jobului si intoarce evenimentul final.
+        """
+        async for event in self.watch(job):
+            pass
+        return event
+
+    async def cancel(self, job):
+        await self.request(op='cancel', job=job)
+
+    async def status(self, job):
+        return await self.request(op='status', job=job)
+
+    async def shutdown(self):
+        await self.request(op='shutdown')
+
+
+async def main(args):
+    params = {}
+    if args.kind == 'solve':
+        params['algorithm'] = args.algorithm
+        for name in ['time_limit', 'target_cost', 'stall']:
+            if getattr(args, name) is not None:
+                params[name] = getattr(args, name)
+    else:
+        with open(args.timetable_file, 'r') as file:
+            params['timetable'] = file.read()
+
+    async with SolverClient(args.socket, args.port) as client:
+        job = await client.submit(args.kind, args.input_file, **params)
+        async for event in client.watch(job):
+            if event['event'] not in TERMINAL_EVENTS:
+                print(json.dumps(event), file=sys.stderr)
+
+    if event['event'] == 'error':
+        print(event['error'], file=sys.stderr)
+        return 1
+
+    result = event['result'] or {}
+    if result.get('timetable'):
+        print(result.pop('timetable'))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Send a job to the local timetable solver service.')
+    parser.add_argument('kind', type=str, choices=['solve', 'validate', 'repair'], help='Job type')
+    parser.add_argument('input_file', type=str, help='Input YAML file containing timetable specifications')
+    parser.add_argument('timetable_file', nargs='?', default=None, type=str, help='Timetable to validate or repair (validate/repair jobs)')
+    parser.add_argument('--algorithm', type=str, default='hc', help='Algorithm for solve jobs')
+    parser.add_argument('--time-limit', type=float, default=None, help='Time budget in seconds for solve jobs')
+    parser.add_argument('--target-cost', type=int, default=None, help='Stop a solve job once this cost is reached')
+    parser.add_argument('--stall', type=int, default=None, help='Stop a solve job after this many iterations without improvement')
+    parser.add_argument('--socket', type=str, default=SOCKET_PATH, help='Unix socket of the service')
+    parser.add_argument('--port', type=int, default=None, help='TCP port of the service on 127.0.0.1')
+    args = parser.parse_args()
+
+    if args.kind != 'solve' and args.timetable_file is None:
+        parser.error(f'{args.kind} needs a timetable file')
+
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,163 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from orar import Info, algorithm_steps, instance_specs, run_algorithm, state_from_timetable
+from progress import ProgressEvent
+from repair import repair_timetable
+
+
+HEARTBEAT = 0.5  # Secunde intre doua evenimente emise cat timp nicio componenta nu s-a terminat
+
+_stop = None
+
+
+def sub_state(state, component):
+    """
+    Starea restransa la o componenta: doar salile, profesorii si materiile ei, cu orele din starea data
+    care raman valide in componenta.
+
+    Args:
+        state (State): Starea intregii instante.
+        component (tuple): Componenta (sali, profesori, materii).
+
+    Returns:
+        State: Starea componentei.
+    """
+    info = state.info
+    rooms, teachers, courses = component
+    sub_info = Info(({room: info.classrooms[room] for room in rooms},
+                     {teacher: info.teachers[teacher] for teacher in teachers},
+                     {course: info.courses[course] for course in courses}), info.days)
+
+    timetable = {}
+    for day in state.timetable:
+        timetable[day] = {}
+        for interval in state.timetable[day]:
+            timetable[day][interval] = {}
+            for room in rooms:
+                lesson = state.timetable[day][interval][room]
+                keep = lesson is not None and lesson[0] in sub_info.teachers and lesson[1] in sub_info.courses
+                timetable[day][interval][room] = lesson if keep else None
+
+    return state_from_timetable(sub_info, timetable, state.seed)
+
+
+def merge(state, timetables):
+    """
+    Reuneste orarele componentelor intr-un orar al intregii instante; salile care nu apartin niciunei
+    componente raman libere. Un slot liber in orarul unei componente nu sterge ora pusa acolo de alta componenta.
+    """
+    merged = {day: {interval: {room: None for room in state.timetable[day][interval]}
+                    for interval in state.timetable[day]} for day in state.timetable}
+    for timetable in timetables:
+        for day in timetable:
+            for interval in timetable[day]:
+                for room, lesson in timetable[day][interval].items():
+                    if lesson is not None:
+                        merged[day][interval][room] = lesson
+    return merged
+
+
+def component_workers(components, workers=None):
+    """
+    Imparte procesele intre componente.
+
+    Returns:
+        int: Numarul de procese worker care rezolva componentele.
+        int: Numarul de procese al cautarii fiecarei componente (None: ales de algoritm).
+    """
+    if workers is None:
+        return min(components, os.cpu_count()), None
+    pool = min(components, workers)
+    return pool, max(1, workers // pool)
+
+
+def init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def solve_component(task):
+    """
+    Rezolva o componenta in procesul worker, pana la terminarea algoritmului sau pana la oprirea cautarii.
+
+    Args:
+        task (tuple): (numele algoritmului, starea componentei, numarul de procese al cautarii, parametrii
+            proprii algoritmului).
+
+    Returns:
+        dict: Orarul componentei.
+        int: Numarul de stari generate.
+    """
+    algorithm, state, workers, options = task
+    best_state, _, evaluations = run_algorithm(algorithm, state, callback=lambda event: _stop.is_set(), workers=workers,
+                                               options=options)
+    return best_state.timetable, evaluations
+
+
+def decomposed_steps(initial_state, algorithm, workers=None, options=None):
+    """
+    Rezolva separat, in procese diferite, componentele independente ale instantei (Info.components) si
+    reuneste orarele lor. Durata este data de cea mai mare componenta, nu de intreaga instanta. Daca orarul
+    reunit nu respecta toate constrangerile obligatorii, este reparat la final.
+
+    O instanta cu o singura componenta este rezolvata direct, ca si fara descompunere.
+
+    Args:
+        initial_state (State): Starea initiala.
+        algorithm (str): Algoritmul folosit pentru fiecare componenta.
+        workers (int, optional): Numarul total de procese, impartit intre componente (component_workers).
+            Implicit, cel mult numarul de procesoare, iar algoritmul isi alege singur numarul de procese.
+        options (dict, optional): Parametrii proprii algoritmului (vezi orar.algorithm_steps).
+
+    Yields:
+        ProgressEvent: Un eveniment la fiecare componenta rezolvata si periodic intre ele.
+    """
+    components = initial_state.info.components
+    if len(components) <= 1:
+        yield from algorithm_steps(algorithm, initial_state, workers, options)
+        return
+
+    start = time.time()
+    info = initial_state.info
+    states = [sub_state(initial_state, component) for component in components]
+    timetables = [state.timetable for state in states]
+    evaluations = 0
+    best_state = initial_state
+    cost = initial_state.get_conflicts()
+
+    stop = multiprocessing.Event()
+    pool, budget = component_workers(len(components), workers)
+    executor = ProcessPoolExecutor(max_workers=pool, initializer=init_worker, initargs=(stop,))
+    futures = {executor.submit(solve_component, (algorithm, state, budget, options)): idx
+               for idx, state in enumerate(states)}
+    pending = set(futures)
+
+    try:
+        iteration = 0
+        while pending:
+            done, pending = wait(pending, timeout=HEARTBEAT, return_when=FIRST_COMPLETED)
+            for future in done:
+                timetables[futures[future]], count = future.result()
+                evaluations += count
+
+            improved = False
+            if done:
+                state = state_from_timetable(info, merge(initial_state, timetables), initial_state.seed)
+                if not pending and not state.is_valid():
+                    # Componentele nu au profesori sau sali comune; reparatia acopera ce a ramas neacoperit
+                    state = state_from_timetable(info, repair_timetable(state.timetable, instance_specs(state)),
+                                                 initial_state.seed)
+                # Orarul reunit (si reparat) inlocuieste cea mai buna stare doar daca are un cost mai mic
+                improved = state.get_conflicts() < cost
+                if improved:
+                    best_state, cost = state, state.get_conflicts()
+
+            iteration += 1
+            yield ProgressEvent(algorithm, iteration, evaluations, cost, cost, time.time() - start, best_state,
+                                improved)
+    finally:
+        stop.set()
+        executor.shutdown(cancel_futures=True)
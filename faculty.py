@@ -0,0 +1,336 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from utils import read_yaml_file, write_timetable, INTERVALE, ZILE, MATERII, PROFESORI, SALI
+from orar import Info, build_initial_state, algorithm_steps, instance_specs, state_from_timetable
+from decompose import sub_state, merge, component_workers, init_worker, solve_component, HEARTBEAT
+from progress import ProgressEvent, until, last
+from registry import available as available_solvers, exists as solver_exists
+from repair import repair_timetable, teacher_slots
+
+
+SEPARATOR = '/'  # Materiile instantei comune sunt prefixate cu numele departamentului: 'departament/materie'
+
+
+def department_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def course_key(department, course):
+    return f'{department}{SEPARATOR}{course}'
+
+
+def couple(departments):
+    """
+    Reuneste instantele departamentelor intr-o singura instanta. Profesorii si salile cu acelasi nume sunt aceiasi
+    in toate departamentele (limita de sloturi si ocuparea lor sunt comune); materiile raman ale fiecarui
+    departament, chiar daca au acelasi nume.
+
+    Args:
+        departments (dict): Nume departament -> specificatiile lui (forma citita din fisierul YAML).
+
+    Returns:
+        dict: Specificatiile instantei comune.
+    """
+    (first, specs), *_ = departments.items()
+    days, intervals = specs[ZILE], specs[INTERVALE]
+    courses, teachers, rooms = {}, {}, {}
+
+    for name, specs in departments.items():
+        if specs[ZILE] != days or specs[INTERVALE] != intervals:
+            raise ValueError(f'Departamentul {name} nu are aceleasi zile si intervale ca {first}')
+
+        for course, students in specs[MATERII].items():
+            courses[course_key(name, course)] = students
+
+        for room, details in specs[SALI].items():
+            room_courses = [course_key(name, course) for course in details[MATERII]]
+            if room not in rooms:
+                rooms[room] = {'Capacitate': details['Capacitate'], MATERII: room_courses}
+            elif rooms[room]['Capacitate'] != details['Capacitate']:
+                raise ValueError(f'Sala {room} are capacitati diferite in departamentul {name}')
+            else:
+                rooms[room][MATERII] += room_courses
+
+        for teacher, details in specs[PROFESORI].items():
+            entry = teachers.setdefault(teacher, {'Constrangeri': [], MATERII: []})
+            entry[MATERII] += [course_key(name, course) for course in details[MATERII]]
+            # Preferintele aceluiasi profesor, repetate in fisierele mai multor departamente, se numara o singura data
+            known = list(entry['Constrangeri'])
+            entry['Constrangeri'] += [constraint for constraint in details['Constrangeri'] if constraint not in known]
+
+    return {ZILE: list(days), INTERVALE: list(intervals), MATERII: courses, PROFESORI: teachers, SALI: rooms}
+
+
+def teacher_need(specs, teacher):
+    """
+    Cat depinde departamentul de profesor: pentru fiecare materie a departamentului predata de el, numarul de
+    studenti impartit la numarul profesorilor departamentului care o pot preda.
+    """
+    courses = specs[PROFESORI][teacher][MATERII]
+    return sum(students / sum(course in details[MATERII] for details in specs[PROFESORI].values())
+               for course, students in specs[MATERII].items() if course in courses)
+
+
+def teacher_shares(departments, limit):
+    """
+    Imparte limita de sloturi a fiecarui profesor comun intre departamentele lui, proportional cu cat depinde
+    fiecare de el (teacher_need), cu metoda celor mai mari resturi.
+
+    Args:
+        departments (dict): Nume departament -> specificatiile lui.
+        limit (dict): Limita de sloturi a fiecarui profesor in instanta comuna.
+
+    Returns:
+        dict: Nume departament -> {profesor comun: sloturile departamentului}.
+    """
+    shares = {name: {} for name in departments}
+    for teacher in shared_resources(departments)[0]:
+        needs = {name: teacher_need(specs, teacher) for name, specs in departments.items()
+                 if teacher in specs[PROFESORI]}
+        total = sum(needs.values())
+        quotas = {name: limit[teacher] * (need / total if total else 1 / len(needs)) for name, need in needs.items()}
+        share = {name: int(quota) for name, quota in quotas.items()}
+        remaining = limit[teacher] - sum(share.values())
+        for name in sorted(quotas, key=lambda name: share[name] - quotas[name])[:remaining]:
+            share[name] += 1
+        for name, slots in share.items():
+            shares[name][teacher] = slots
+    return shares
+
+
+def department_components(departments, limit):
+    """
+    Componentele departamentelor, cu numele din instanta comuna, pentru rezolvarea in paralel: salile, profesorii
+    si materiile fiecaruia si sloturile profesorilor comuni care ii revin (teacher_shares). Asa departamentele nu
+    pot depasi impreuna limita unui profesor comun; un departament caruia nu ii revine niciun slot al unui
+    profesor comun nu il foloseste. Salile comune raman ale tuturor departamentelor care le folosesc.
+
+    Returns:
+        list: Componentele (sali, profesori, materii, {profesor comun: sloturi}), in ordinea departamentelor.
+    """
+    shares = teacher_shares(departments, limit)
+    return [(list(specs[SALI]), [teacher for teacher in specs[PROFESORI] if shares[name].get(teacher, 1)],
+             [course_key(name, course) for course in specs[MATERII]], shares[name])
+            for name, specs in departments.items()]
+
+
+def department_state(state, component):
+    """
+    Starea restransa la un departament: salile si profesorii comuni pastreaza doar materiile departamentului,
+    iar fiecare profesor comun are doar sloturile departamentului.
+    """
+    rooms, teachers, courses, shares = component
+    department = sub_state(state, (rooms, teachers, courses))
+    info = department.info
+    rooms = {room: dict(details, Materii=[course for course in details[MATERII] if course in info.courses])
+             for room, details in info.classrooms.items()}
+    teachers = {teacher: dict(details, Materii=[course for course in details[MATERII] if course in info.courses])
+                for teacher, details in info.teachers.items()}
+    for teacher, slots in shares.items():
+        if teacher in teachers:
+            teachers[teacher]['Sloturi'] = slots
+    return state_from_timetable(Info((rooms, teachers, info.courses), info.days), department.timetable, state.seed)
+
+
+def shared_resources(departments):
+    """
+    Returns:
+        list: Profesorii care apar in mai multe departamente.
+        list: Salile care apar in mai multe departamente.
+    """
+    teachers, rooms = {}, {}
+    for specs in departments.values():
+        for teacher in specs[PROFESORI]:
+            teachers[teacher] = teachers.get(teacher, 0) + 1
+        for room in specs[SALI]:
+            rooms[room] = rooms.get(room, 0) + 1
+    return [teacher for teacher, count in teachers.items() if count > 1], [room for room, count in rooms.items() if count > 1]
+
+
+def department_timetable(timetable, name, specs):
+    """
+    Orarul departamentului, extras din orarul instantei comune: orele materiilor lui, in salile lui, cu numele
+    originale ale materiilor. O sala comuna ocupata de alt departament apare libera.
+    """
+    prefix = course_key(name, '')
+    return {day: {interval: {room: (lesson[0], lesson[1][len(prefix):])
+                             if lesson and lesson[1].startswith(prefix) else None
+                             for room, lesson in ((room, timetable[day][interval].get(room)) for room in specs[SALI])}
+                  for interval in timetable[day]} for day in timetable}
+
+
+def resolve_clashes(state, timetables):
+    """
+    Reuneste orarele departamentelor si rezolva explicit suprapunerile pe resursele comune: daca mai multe
+    departamente ocupa aceeasi sala comuna sau acelasi profesor comun in acelasi interval, ramane ora materiei
+    cu cea mai mare lipsa de locuri, iar celelalte ore se scot (materiile lor se acopera din nou la reparare).
+    La egalitate ramane ora primului departament.
+
+    Args:
+        state (State): Starea instantei comune (pentru zile, intervale si sali).
+        timetables (list): Orarele departamentelor, in ordinea departamentelor.
+
+    Returns:
+        dict: Orarul reunit, fara sali sau profesori ocupati de doua ori in acelasi interval.
+    """
+    info = state.info
+    merged = merge(state, [])
+    coverage = dict.fromkeys(info.courses, 0)
+    for timetable in timetables:
+        for day in timetable:
+            for interval in timetable[day]:
+                for room, lesson in timetable[day][interval].items():
+                    if lesson:
+                        coverage[lesson[1]] += info.classrooms[room]['Capacitate']
+
+    for day in merged:
+        for interval in merged[day]:
+            lessons = [(room, lesson) for timetable in timetables
+                       for room, lesson in timetable[day][interval].items() if lesson]
+            # Materiile cu cele mai putine locuri fata de numarul de studenti au prioritate
+            lessons.sort(key=lambda item: coverage[item[1][1]] - info.courses[item[1][1]])
+            busy = set()
+            for room, lesson in lessons:
+                if merged[day][interval][room] is None and lesson[0] not in busy:
+                    merged[day][interval][room] = lesson
+                    busy.add(lesson[0])
+                else:
+                    coverage[lesson[1]] -= info.classrooms[room]['Capacitate']
+    return merged
+
+
+def faculty_steps(initial_state, components, algorithm, workers=None):
+    """
+    Rezolva instanta comuna a mai multor departamente. Fiecare departament este rezolvat in procesul lui, pe
+    starea restransa la salile, profesorii si materiile lui, cu partea lui din sloturile profesorilor comuni.
+    Cand s-au terminat toate, procesul principal coordoneaza resursele comune: reuneste orarele, scoate orele
+    care se suprapun in salile comune sau programeaza un profesor comun simultan in doua departamente
+    (resolve_clashes) si acopera din nou prin reparare ce a ramas neacoperit (cu toate sloturile ramase libere ale profesorilor
+    comuni), apoi continua cautarea pe toata instanta comuna.
+
+    Args:
+        initial_state (State): Starea initiala a instantei comune.
+        components (list): Componentele departamentelor (department_components).
+        algorithm (str): Algoritmul folosit pentru departamente si pentru instanta comuna.
+        workers (int, optional): Numarul total de procese, impartit intre departamente (component_workers).
+            Implicit, cel mult numarul de procesoare, iar algoritmul isi alege singur numarul de procese.
+
+    Yields:
+        ProgressEvent: Un eveniment la fiecare departament rezolvat, periodic intre ele, apoi evenimentele
+        cautarii pe instanta comuna.
+    """
+    start = time.time()
+    info = initial_state.info
+    states = [department_state(initial_state, component) for component in components]
+    timetables = [state.timetable for state in states]
+    evaluations = 0
+    best_state = initial_state
+    cost = initial_state.get_conflicts()
+
+    stop = multiprocessing.Event()
+    pool, budget = component_workers(len(components), workers)
+    executor = ProcessPoolExecutor(max_workers=pool, initializer=init_worker, initargs=(stop,))
+    futures = {executor.submit(solve_component, (algorithm, state, budget, None)): idx
+               for idx, state in enumerate(states)}
+    pending = set(futures)
+
+    iteration = 0
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=HEARTBEAT, return_when=FIRST_COMPLETED)
+            for future in done:
+                timetables[futures[future]], count = future.result()
+                evaluations += count
+
+            iteration += 1
+            yield ProgressEvent(algorithm, iteration, evaluations, cost, cost, time.time() - start, best_state, False)
+    finally:
+        stop.set()
+        executor.shutdown(cancel_futures=True)
+
+    # Coordonarea resurselor comune: suprapunerile in salile comune si la profesorii comuni se rezolva explicit,
+    # iar reparatia acopera apoi ce au lasat neacoperit orele scoase
+    state = state_from_timetable(info, resolve_clashes(initial_state, timetables), initial_state.seed)
+    if not state.is_valid():
+        state = state_from_timetable(info, repair_timetable(state.timetable, instance_specs(state)),
+                                     initial_state.seed)
+    # Orarul coordonat inlocuieste cea mai buna stare doar daca are un cost mai mic
+    improved = state.get_conflicts() < cost
+    if improved:
+        best_state, cost = state, state.get_conflicts()
+    iteration += 1
+    yield ProgressEvent(algorithm, iteration, evaluations, cost, cost, time.time() - start, best_state, improved)
+    if cost == 0:
+        return
+
+    events = algorithm_steps(algorithm, best_state, workers)
+    try:
+        for event in events:
+            improved = event.best_cost < cost
+            if improved:
+                best_state, cost = event.best_state, event.best_cost
+            yield ProgressEvent(algorithm, iteration + event.iteration, evaluations + event.evaluations, event.cost,
+                                cost, time.time() - start, best_state, improved)
+    finally:
+        events.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate the timetables of several departments that share teachers and rooms, solved as one coupled instance.')
+    parser.add_argument('algorithm', type=str, help='Algorithm used for each department and for the coupled instance')
+    parser.add_argument('input_files', type=str, nargs='+', help='Input YAML files, one per department; teachers and rooms with the same name are shared')
+    parser.add_argument('--output-dir', type=str, default='outputs', help='Directory for the department timetables (<department>.txt)')
+    parser.add_argument('--target-cost', type=int, default=None, help='Stop as soon as a timetable with at most this cost is found')
+    parser.add_argument('--stall', type=int, default=None, help='Stop after this many iterations without improvement')
+    parser.add_argument('--time-limit', type=float, default=None, help='Time budget in seconds')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: one per department, at most the number of CPUs)')
+    args = parser.parse_args()
+    # Numele algoritmului se verifica dupa parsare: entry points se citesc doar pentru un algoritm care nu este inclus
+    if not solver_exists(args.algorithm):
+        parser.error(f"argument algorithm: invalid choice: '{args.algorithm}' (choose from {', '.join(map(repr, available_solvers()))})")
+
+    departments = {}
+    for input_file in args.input_files:
+        name = department_name(input_file)
+        if name in departments or SEPARATOR in name:
+            parser.error(f'department names must be unique and must not contain "{SEPARATOR}": {input_file}')
+        departments[name] = read_yaml_file(input_file)
+
+    try:
+        timetable_specs = couple(departments)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    initial_state = build_initial_state(timetable_specs)
+
+    from bounds import instance_bounds
+    bounds = instance_bounds(initial_state)
+    if not bounds.feasible():
+        print("Instanta comuna nu are nicio solutie care sa respecte constrangerile obligatorii:", file=sys.stderr)
+        for reason in bounds.reasons:
+            print(f"  - {reason}", file=sys.stderr)
+        sys.exit(1)
+
+    components = department_components(departments, teacher_slots(timetable_specs))
+    target_cost = bounds.lower_bound() if args.target_cost is None else max(args.target_cost, bounds.lower_bound())
+    event = last(until(faculty_steps(initial_state, components, args.algorithm, args.workers), target_cost,
+                       args.stall, args.time_limit, require_valid=target_cost == bounds.lower_bound()))
+    final_state = event.best_state
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, specs in departments.items():
+        timetable = department_timetable(final_state.timetable, name, specs)
+        print(f"{name}:")
+        write_timetable(timetable, specs, sys.stdout)
+        print()
+        with open(os.path.join(args.output_dir, f"{name}.txt"), 'w') as f:
+            write_timetable(timetable, specs, f)
+
+    teachers, rooms = shared_resources(departments)
+    print(f"Shared teachers: {len(teachers)}, shared rooms: {len(rooms)}", file=sys.stderr)
+    print(f"Solver: {event.solver}, cost: {event.best_cost}", file=sys.stderr)
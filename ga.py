@@ -0,0 +1,318 @@
+import multiprocessing
+import random
+import time
+from ast import literal_eval
+
+import numpy as np
+
+from orar import HARD_PENALTY, instance_specs, state_from_timetable
+from check_constraints import parse_interval, CAPACITATE, CONSTRANGERI, INTERVALE, MATERII, PROFESORI, SALI, ZILE
+from repair import repair_timetable, teacher_slots
+from progress import ProgressEvent
+
+
+POPULATION = 40  # Indivizi pe insula
+ELITE = 2  # Cei mai buni indivizi, copiati neschimbati in generatia urmatoare
+TOURNAMENT = 3  # Dimensiunea turneului de selectie
+MUTATION_RATE = 0.3  # Probabilitatea ca un copil sa fie mutat
+MUTATION_SLOTS = 0.1  # Fractiunea de sloturi golite si reconstruite de o mutatie
+EPOCH = 5  # Generatii intre doua migrari (si intre doua evenimente de progres)
+MIGRANTS = 2  # Indivizi trimisi de fiecare insula celei urmatoare
+
+
+class Compiled:
+    def __init__(self, specs):
+        """
+        Instanta sub forma de tablouri NumPy, pentru evaluarea unei populatii intregi deodata.
+
+        Un individ este un tablou de intregi zi x interval x sala, cu 0 pentru un slot liber si
+        profesor * numar_materii + materie + 1 pentru o ora (aceeasi codificare ca in shared.py);
+        populatia este un singur tablou contiguu populatie x zi x interval x sala.
+
+        Args:
+            specs (dict): Specificatiile instantei (forma citita din fisierul YAML).
+        """
+        self.specs = specs
+        self.days = list(specs[ZILE])
+        self.intervals = [literal_eval(interval) for interval in specs[INTERVALE]]
+        self.rooms = list(specs[SALI])
+        self.teachers = list(specs[PROFESORI])
+        self.courses = list(specs[MATERII])
+        self.shape = (len(self.days), len(self.intervals), len(self.rooms))
+
+        rooms, profs = specs[SALI], specs[PROFESORI]
+        self.capacity = np.array([rooms[room][CAPACITATE] for room in self.rooms], dtype=np.int64)
+        self.demand = np.array([specs[MATERII][course] for course in self.courses], dtype=np.int64)
+        self.room_course = np.array([[course in rooms[room][MATERII] for course in self.courses]
+                                     for room in self.rooms], dtype=bool).reshape(len(self.rooms), len(self.courses))
+        limit = teacher_slots(specs)
+        self.slots = np.array([limit[prof] for prof in self.teachers], dtype=np.int64)
+        self.teacher_course = np.array([[course in profs[prof][MATERII] for course in self.courses]
+                                        for prof in self.teachers], dtype=bool).reshape(len(self.teachers), len(self.courses))
+
+        # Preferintele, numarate ca in check_optional_constraints: o constrangere '!zi' sau '!interval' incalcata
+        # pentru fiecare ora a profesorului din ziua sau intervalul respectiv
+        self.forbidden_day = np.zeros((len(self.teachers), len(self.days)), dtype=np.int64)
+        self.forbidden_interval = np.zeros((len(self.teachers), len(self.intervals)), dtype=np.int64)
+        for t, prof in enumerate(self.teachers):
+            for const in profs[prof].get(CONSTRANGERI, []):
+                if const[0] != '!':
+                    continue
+                const = const[1:]
+                if const in self.days:
+                    self.forbidden_day[t, self.days.index(const)] += 1
+                elif '-' in const:
+                    start, end = parse_interval(const)
+                    for hour in range(start, end, 2):
+                        if (hour, hour + 2) in self.intervals:
+                            self.forbidden_interval[t, self.intervals.index((hour, hour + 2))] += 1
+
+        self.teacher_idx = {prof: t for t, prof in enumerate(self.teachers)}
+        self.course_idx = {course: c for c, course in enumerate(self.courses)}
+
+    def encode(self, timetable):
+        individual = np.zeros(self.shape, dtype=np.int32)
+        for d, day in enumerate(self.days):
+            for i, interval in enumerate(self.intervals):
+                for r, room in enumerate(self.rooms):
+                    lesson = timetable[day][interval].get(room)
+                    if lesson:
+                        individual[d, i, r] = self.teacher_idx[lesson[0]] * len(self.courses) + \
+                            self.course_idx[lesson[1]] + 1
+        return individual
+
+    def decode(self, individual):
+        timetable = {}
+        for d, day in enumerate(self.days):
+            timetable[day] = {}
+            for i, interval in enumerate(self.intervals):
+                timetable[day][interval] = {}
+                for r, room in enumerate(self.rooms):
+                    code = int(individual[d, i, r]) - 1
+                    timetable[day][interval][room] = None if code < 0 else \
+                        (self.teachers[code // len(self.courses)], self.courses[code % len(self.courses)])
+        return timetable
+
+    def evaluate(self, population):
+        """
+        Numara constrangerile incalcate de fiecare individ, cu aceeasi semantica precum check_mandatory_constraints
+        si check_optional_constraints, prin reduceri NumPy peste toata populatia.
+
+        Args:
+            population (ndarray): Populatia, de forma (populatie, zi, interval, sala).
+
+        Returns:
+            ndarray: Constrangerile obligatorii incalcate de fiecare individ.
+            ndarray: Constrangerile optionale incalcate de fiecare individ.
+            ndarray: Studentii neacoperiti ai fiecarui individ.
+        """
+        size = len(population)
+        nr_days, nr_intervals, nr_rooms = self.shape
+        nr_teachers, nr_courses = len(self.teachers), len(self.courses)
+
+        occupied = population > 0
+        teacher, course = np.divmod(np.where(occupied, population - 1, 0), nr_courses)
+
+        # Materia nu se preda in sala / profesorul nu preda materia
+        rooms = np.broadcast_to(np.arange(nr_rooms), population.shape)
+        wrong_room = (occupied & ~self.room_course[rooms, course]).sum(axis=(1, 2, 3))
+        wrong_teacher = (occupied & ~self.teacher_course[teacher, course]).sum(axis=(1, 2, 3))
+
+        # Numarul de ore ale fiecarui profesor in fiecare interval al fiecarui individ
+        periods = np.arange(size * nr_days * nr_intervals).reshape(size, nr_days, nr_intervals, 1)
+        counts = np.bincount((periods * nr_teachers + teacher)[occupied],
+                             minlength=size * nr_days * nr_intervals * nr_teachers)
+        counts = counts.reshape(size, nr_days, nr_intervals, nr_teachers)
+        double_booked = np.maximum(counts - 1, 0).sum(axis=(1, 2, 3))
+        overtime = (counts.sum(axis=(1, 2)) > self.slots).sum(axis=1)
+
+        # Acoperirea fiecarei materii
+        individuals = np.arange(size).reshape(size, 1, 1, 1)
+        coverage = np.bincount((individuals * nr_courses + course)[occupied],
+                               weights=np.broadcast_to(self.capacity, population.shape)[occupied],
+                               minlength=size * nr_courses).reshape(size, nr_courses)
+        uncovered = (coverage < self.demand).sum(axis=1)
+        shortfall = np.maximum(self.demand - coverage, 0).sum(axis=1).astype(np.int64)
+
+        days = np.arange(nr_days).reshape(1, nr_days, 1, 1)
+        intervals = np.arange(nr_intervals).reshape(1, 1, nr_intervals, 1)
+        optional = np.where(occupied, self.forbidden_day[teacher, days] + self.forbidden_interval[teacher, intervals],
+                            0).sum(axis=(1, 2, 3))
+
+        mandatory = wrong_room + wrong_teacher + double_booked + overtime + uncovered
+        return mandatory, optional, shortfall
+
+    def fitness(self, population):
+        """
+        Valoarea minimizata de algoritm: constrangerile obligatorii penalizate puternic, apoi studentii neacoperiti
+        (ca ghidaj catre acoperire) si constrangerile optionale. Pentru un orar valid este chiar costul starii.
+        """
+        mandatory, optional, shortfall = self.evaluate(population)
+        return HARD_PENALTY * mandatory + shortfall + optional
+
+
+class Island:
+    def __init__(self, compiled, seeds, size, seed):
+        """
+        O populatie care evolueaza independent: selectie prin turnir, incrucisare pe sloturi (fiecare interval
+        zi - ora este luat in intregime de la unul dintre parinti), mutatie prin distrugere si reparare si elitism.
+
+        Args:
+            compiled (Compiled): Instanta compilata.
+            seeds (list): Orarele de pornire; restul populatiei se construieste greedy, cu alegeri aleatoare.
+            size (int): Dimensiunea populatiei.
+            seed (int): Valoarea pentru initializarea generatoarelor de numere aleatoare.
+        """
+        self.compiled = compiled
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+
+        individuals = [compiled.encode(timetable) for timetable in seeds[:size]]
+        empty = compiled.decode(np.zeros(compiled.shape, dtype=np.int32))
+        while len(individuals) < size:
+            individuals.append(self.mutate(compiled.encode(empty)))
+        self.population = np.stack(individuals)
+        self.fitness = compiled.fitness(self.population)
+        self.evaluations = size
+
+    def mutate(self, individual):
+        """
+        Goleste o fractiune aleatoare din sloturi si repara orarul (repair.repair_timetable), cu sloturile
+        reconstruite in ordine aleatoare.
+        """
+        compiled = self.compiled
+        destroyed = self.rng.random(compiled.shape) < MUTATION_SLOTS
+        individual = np.where(destroyed, 0, individual)
+        timetable = compiled.decode(individual)
+        # Ordinea sloturilor libere, pe care fill_uncovered le parcurge, variaza de la o mutatie la alta
+        for day in timetable:
+            for interval in timetable[day]:
+                rooms = list(timetable[day][interval].items())
+                self.random.shuffle(rooms)
+                timetable[day][interval] = dict(rooms)
+        return compiled.encode(repair_timetable(timetable, compiled.specs))
+
+    def select(self, count):
+        candidates = self.rng.integers(len(self.population), size=(count, TOURNAMENT))
+        winners = candidates[np.arange(count), np.argmin(self.fitness[candidates], axis=1)]
+        return self.population[winners]
+
+    def generation(self):
+        compiled = self.compiled
+        size = len(self.population)
+        order = np.argsort(self.fitness, kind='stable')
+        elite = self.population[order[:ELITE]]
+
+        count = size - len(elite)
+        first, second = self.select(count), self.select(count)
+        take_first = self.rng.random((count, compiled.shape[0], compiled.shape[1], 1)) < 0.5
+        children = np.where(take_first, first, second)
+
+        for idx in np.flatnonzero(self.rng.random(count) < MUTATION_RATE):
+            children[idx] = self.mutate(children[idx])
+
+        self.population = np.ascontiguousarray(np.concatenate([elite, children]))
+        self.fitness = compiled.fitness(self.population)
+        self.evaluations += count
+
+    def evolve(self, generations, migrants=None):
+        """
+        Primeste migrantii (in locul celor mai slabi indivizi) si ruleaza generatiile date.
+
+        Returns:
+            ndarray: Cei mai buni MIGRANTS indivizi, in ordinea fitness-ului.
+            ndarray: Fitness-ul lor.
+            int: Numarul total de indivizi evaluati pe insula.
+        """
+        if migrants is not None and len(migrants):
+            worst = np.argsort(self.fitness, kind='stable')[-len(migrants):]
+            self.population[worst] = migrants
+            self.fitness[worst] = self.compiled.fitness(migrants)
+        for _ in range(generations):
+            self.generation()
+        best = np.argsort(self.fitness, kind='stable')[:MIGRANTS]
+        return self.population[best], self.fitness[best], self.evaluations
+
+
+def island_worker(connection, specs, seed_timetable, size, seed):
+    """
+    Procesul unei insule: ruleaza epocile cerute de procesul principal, pana primeste None. Specificatiile se
+    trimit o singura data, la pornire (nu prin shared.py, care pastreaza constrangerile '!' fara multiplicitate).
+    """
+    island = Island(Compiled(specs), [seed_timetable], size, seed)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        connection.send(island.evolve(*message))
+
+
+def ga_steps(initial, generations=200, population=POPULATION, islands=1, workers=None):
+    """
+    Algoritm genetic cu populatia tinuta intr-un singur tablou NumPy si evaluata vectorizat. Cu mai multe insule,
+    fiecare evolueaza in procesul ei, iar la fiecare EPOCH generatii cei mai buni indivizi ai fiecarei insule
+    migreaza in insula urmatoare (inel).
+
+    Args:
+        initial (State): Starea initiala; orarul ei reparat este primul individ al fiecarei insule.
+        generations (int): Numarul maxim de generatii.
+        population (int): Dimensiunea populatiei fiecarei insule.
+        islands (int): Numarul de insule.
+        workers (int, optional): Cu 1 worker, insulele evolueaza in procesul curent; altfel, fiecare in procesul ei.
+
+    Yields:
+        ProgressEvent: Progresul cautarii, dupa fiecare epoca.
+    """
+    start = time.time()
+    specs = instance_specs(initial)
+    compiled = Compiled(specs)
+    seed_timetable = repair_timetable(initial.timetable, specs)
+
+    best_state = state_from_timetable(initial.info, seed_timetable, initial.seed)
+    best_cost = best_state.get_conflicts()
+    yield ProgressEvent('ga', 0, 1, best_cost, best_cost, time.time() - start, best_state,
+                        best_cost < initial.get_conflicts())
+
+    connections, processes = [], []
+    if islands > 1 and workers != 1:
+        for idx in range(islands):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=island_worker, args=(child, specs, seed_timetable, population,
+                                                                          initial.seed + idx), daemon=True)
+            process.start()
+            connections.append(parent)
+            processes.append(process)
+        local = None
+    else:
+        local = [Island(compiled, [seed_timetable], population, initial.seed + idx) for idx in range(islands)]
+
+    try:
+        migrants = [None] * islands
+        generation = 0
+        while generation < generations and best_cost > 0:
+            epoch = min(EPOCH, generations - generation)
+            generation += epoch
+            if local is not None:
+                results = [island.evolve(epoch, incoming) for island, incoming in zip(local, migrants)]
+            else:
+                for connection, incoming in zip(connections, migrants):
+                    connection.send((epoch, incoming))
+                results = [connection.recv() for connection in connections]
+            # Migrantii trec in insula urmatoare din inel; o singura insula nu primeste inapoi propriii indivizi
+            if islands > 1:
+                migrants = [results[idx - 1][0] for idx in range(islands)]
+
+            elites, fitness, _ = min(results, key=lambda result: result[1][0])
+            state = state_from_timetable(initial.info, compiled.decode(elites[0]), initial.seed)
+            cost = state.get_conflicts()
+            improved = cost < best_cost
+            if improved:
+                best_state, best_cost = state, cost
+
+            yield ProgressEvent('ga', generation, sum(result[2] for result in results), cost, best_cost,
+                                time.time() - start, best_state, improved)
+    finally:
+        for connection in connections:
+            connection.send(None)
+        for process in processes:
+            process.join()
@@ -1,53 +1,224 @@
-from orar import State, Info
-from utils import read_yaml_file, create_timetable
-from copy import deepcopy  # Importăm funcția deepcopy din modulul copy
-import random  # Importăm modulul random
+from orar import State, build_initial_state
+from utils import read_yaml_file
+import heapq
+import itertools
+import time
+from progress import ProgressEvent, until, last
+from neighborhoods import NEIGHBORHOODS, UNITS, move_delta, move_footprint, apply_move
 
-def hill_climbing(initial: State, max_iters: int = 1000):
+
+class DeltaCache:
+    def __init__(self):
+        """
+        Diferentele de cost ale mutarilor deja evaluate, impreuna cu un index de la fiecare parte a starii
+        (neighborhoods.move_footprint) la mutarile care depind de ea. Dupa aplicarea unei mutari se invalideaza
+        doar mutarile care ating aceleasi sloturi, profesori sau materii.
+        """
+        self.deltas = {}  # Mutare -> (diferenta de cost, cheile de care depinde)
+        self.index = {}  # Cheie -> mutarile din cache care depind de ea
+
+    def delta(self, state, move):
+        """
+        Diferenta de cost a mutarii, din cache sau calculata acum.
+
+        Returns:
+            int: Diferenta de cost.
+            bool: True daca diferenta a fost calculata acum.
+        """
+        entry = self.deltas.get(move)
+        if entry is not None:
+            return entry[0], False
+        keys = move_footprint(state, move)
+        delta = move_delta(state, move)
+        self.deltas[move] = (delta, keys)
+        for key in keys:
+            self.index.setdefault(key, set()).add(move)
+        return delta, True
+
+    def forget(self, move):
+        _, keys = self.deltas.pop(move, (None, ()))
+        for key in keys:
+            moves = self.index.get(key)
+            if moves is not None:
+                moves.discard(move)
+                if not moves:
+                    del self.index[key]
+
+    def retain(self, moves):
+        """
+        Pastreaza doar mutarile date (vecinatatea curenta); celelalte nu mai sunt posibile.
+        """
+        for move in self.deltas.keys() - moves:
+            self.forget(move)
+
+    def invalidate(self, keys):
+        """
+        Sterge mutarile care depind de partile date ale starii.
+
+        Returns:
+            list: Mutarile sterse.
+        """
+        forgotten = []
+        for key in keys:
+            for move in list(self.index.get(key, ())):
+                self.forget(move)
+                forgotten.append(move)
+        return forgotten
+
+
+class MoveIndex:
+    def __init__(self, names=None):
+        """
+        Vecinatatea curenta, intretinuta incremental: mutarile fiecarei unitati din fiecare vecinatate
+        (neighborhoods.UNITS). Dupa aplicarea unei mutari se regenereaza doar unitatile care depind de cheile
+        schimbate de ea (neighborhoods.move_footprint), nu toata vecinatatea.
+
+        Args:
+            names (list, optional): Numele vecinatatilor folosite (implicit, toate din neighborhoods.NEIGHBORHOODS).
+        """
+        self.names = list(names or NEIGHBORHOODS)
+        self.units = {}  # (vecinatate, unitate) -> mutarile unitatii
+        self.count = {}  # Mutare -> numarul de unitati care o genereaza (o mutare poate aparea in mai multe vecinatati)
+
+    def regenerate(self, state, keys=None):
+        """
+        Regenereaza unitatile afectate de cheile date (toate, daca keys este None).
+
+        Returns:
+            list: Mutarile aparute in vecinatate.
+            list: Mutarile disparute din vecinatate.
+        """
+        live = {}  # Mutare -> daca era in vecinatate inainte de regenerare
+        for name in self.names:
+            units, unit_moves = UNITS[name]
+            for unit in units(state, keys):
+                old = self.units.pop((name, unit), {})
+                new = dict.fromkeys(unit_moves(state, unit))  # Multime ordonata: ordinea mutarilor e determinista
+                if new:
+                    self.units[(name, unit)] = new
+                for move in old:
+                    if move not in new:
+                        live.setdefault(move, True)
+                        self.count[move] -= 1
+                        if not self.count[move]:
+                            del self.count[move]
+                for move in new:
+                    if move not in old:
+                        live.setdefault(move, move in self.count)
+                        self.count[move] = self.count.get(move, 0) + 1
+
+        added = [move for move, before in live.items() if not before and move in self.count]
+        removed = [move for move, before in live.items() if before and move not in self.count]
+        return added, removed
+
+
+def hill_climbing_steps(initial: State, max_iters: int = 1000, neighborhoods=None):
     """
-    Algoritmul Hill Climbing pentru generarea unui orar optim.
-    
+    Algoritmul Hill Climbing (steepest ascent), sub forma de generator: emite un eveniment dupa fiecare iteratie.
+
+    Vecinii nu mai sunt construiti ca stari separate: fiecare mutare din vecinatati este evaluata prin diferenta
+    de cost calculata incremental, iar cea mai buna mutare se aplica pe loc. Astfel cautarea continua si dupa ce
+    orarul nu mai are intervale libere (mutari, schimburi, reatribuiri de profesori, lanturi Kempe).
+
+    Nici vecinatatea, nici diferentele de cost nu se recalculeaza complet la fiecare iteratie. Dupa aplicarea unei
+    mutari se regenereaza doar unitatile vecinatatii care depind de partile schimbate ale starii (MoveIndex) si se
+    reevalueaza doar mutarile noi si cele a caror diferenta depinde de ele (DeltaCache). Diferentele stau intr-un
+    heap, asa ca cea mai buna mutare se gaseste fara parcurgerea vecinatatii; intrarile depasite se sar la extragere.
+
     Args:
         initial (State): Starea initiala a problemei.
         max_iters (int): Numarul maxim de iteratii permise.
-        
-    Returns:
-        State: Starea finala obtinuta de algoritm.
-        int: Numarul total de iteratii efectuate.
-        int: Numarul total de stari generate.
+        neighborhoods (list, optional): Numele vecinatatilor folosite (implicit, toate din neighborhoods.NEIGHBORHOODS).
+
+    Yields:
+        ProgressEvent: Progresul cautarii; ultimul eveniment contine starea finala si contoarele finale.
+            Starea din evenimente este starea curenta a cautarii, modificata pe loc la iteratiile urmatoare.
     """
-    iters, states = 0, 0  # Initializez contoarele pentru numarul de iteratii si stari generate
+    start = time.time()
+    iters, states = 0, 0  # Initializez contoarele pentru numarul de iteratii si mutari evaluate
     state = initial.copy()  # Creez o copie a starii initiale pentru a nu modifica starea initiala
-    best_state = state  # Initializez cea mai buna stare cu starea initiala
+    best_cost = state.get_conflicts()
+    cache = DeltaCache()
+    moves = MoveIndex(neighborhoods)
+    heap, entries = [], {}  # Heap-ul (diferenta, rang, mutare) si intrarea valida a fiecarei mutari
+    # La diferente egale castiga mutarea aparuta prima in vecinatate, indiferent de cand a fost reevaluata
+    ranks, order = {}, itertools.count()
+
+    def push(move):
+        nonlocal states
+        delta, evaluated = cache.delta(state, move)
+        states += evaluated
+        entries[move] = entry = (delta, ranks[move], move)
+        heapq.heappush(heap, entry)
+
+    added, _ = moves.regenerate(state)
+    for move in added:
+        ranks[move] = next(order)
+        push(move)
+
+    yield ProgressEvent('hc', iters, states, best_cost, best_cost, time.time() - start, state, False)
 
     while iters < max_iters:
         iters += 1
+        while heap and entries.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
 
-        states_gen = list(state.get_next_state())  # Generez starile vecine ale starii curente
-        states += len(states_gen)
+        # Pastrez mutarea care scade cel mai mult costul
+        improved = bool(heap) and heap[0][0] < 0
+        if improved:
+            best_delta, _, best_move = heap[0]
+            keys = move_footprint(state, best_move)
+            forgotten = cache.invalidate(keys)
+            apply_move(state, best_move)
+            best_cost += best_delta
 
-        if states_gen:  # Verific daca au fost generate stari vecine
-            best_neighbor = min(states_gen, key=lambda neigh: neigh.get_conflicts())  # Gasesc cea mai buna stare vecina
-            if best_neighbor.get_conflicts() < best_state.get_conflicts():  # Verific daca starea vecina este mai buna decat cea mai buna stare curenta
-                best_state = best_neighbor
-                state = best_neighbor
-            else:
-                break  # Ies din bucla daca nu mai pot imbunatati starea
-        else:
-            break  # Ies din bucla daca nu mai am stari vecine
+            added, removed = moves.regenerate(state, keys)
+            for move in removed:
+                cache.forget(move)
+                entries.pop(move, None)
+                del ranks[move]
+            for move in forgotten:
+                if move in moves.count:
+                    push(move)
+            for move in added:
+                ranks[move] = next(order)
+                push(move)
 
-    return best_state, iters, states
+            # Heap-ul se reconstruieste cand intrarile depasite ajung majoritare
+            if len(heap) > 2 * len(entries) + 64:
+                heap = list(entries.values())
+                heapq.heapify(heap)
+
+        yield ProgressEvent('hc', iters, states, best_cost, best_cost, time.time() - start, state, improved)
+
+        if not improved:
+            break  # Ies din bucla daca nu mai pot imbunatati starea
+
+
+def hill_climbing(initial: State, max_iters: int = 1000, callback=None):
+    """
+    Algoritmul Hill Climbing pentru generarea unui orar optim.
+    
+    Args:
+        initial (State): Starea initiala a problemei.
+        max_iters (int): Numarul maxim de iteratii permise.
+        callback (callable, optional): Functie apelata dupa fiecare iteratie cu (iters, states, best_state).
+            Daca intoarce True, cautarea se opreste (anulare sau buget de timp depasit).
+        
+    Returns:
+        State: Starea finala obtinuta de algoritm.
+        int: Numarul total de iteratii efectuate.
+        int: Numarul total de mutari evaluate.
+    """
+    stop = None if callback is None else lambda event: callback(event.iteration, event.evaluations, event.best_state)
+    event = last(until(hill_climbing_steps(initial, max_iters), callback=stop))
+    return event.best_state, event.iteration, event.evaluations
 
 if __name__ == "__main__":
     yaml_file = read_yaml_file('inputs/orar_mare_relaxat.yaml')
-    timetable = create_timetable(yaml_file)
-    info = Info((yaml_file['Sali'], yaml_file['Profesori'], yaml_file['Materii']))
-
-    teachers_counts = {teacher: 0 for teacher in yaml_file['Profesori']}
-    courses_counts = {course: 0 for course in yaml_file['Materii']}
 
     # Creez starea initiala a problemei
-    initial_state = State(info, timetable, (teachers_counts, courses_counts))
+    initial_state = build_initial_state(yaml_file)
     print(f"Initial state conflicts: {initial_state.get_conflicts()}")
 
     final_state, iters, states = hill_climbing(initial_state, 1000)
@@ -0,0 +1,444 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from orar import HARD_PENALTY, LESSON_PENALTY, instance_specs, state_from_timetable
+from repair import copy_timetable, repair_timetable
+from progress import ProgressEvent
+from shared import publish_instance, attach_instance
+
+
+DESTROY_OPERATORS = ['day', 'room', 'teacher', 'course']
+REPAIR_OPERATORS = ['greedy', 'exact']
+REACTION = 0.2  # Cat de repede se adapteaza ponderile operatorilor la rezultatele recente
+MIN_WEIGHT = 0.1  # Niciun operator nu este abandonat complet
+REWARD_BEST, REWARD_BETTER, REWARD_ACCEPTED = 3, 2, 1
+EXACT_NODE_LIMIT = 5000  # Numarul maxim de noduri explorate de reparatia exacta
+
+_shared = None  # Instanta partajata (shared.SharedInstance) pe care se genereaza candidatii
+
+
+# Operatorii lucreaza pe orarul codificat al instantei partajate (shared.SharedInstance): o lista de coduri,
+# una pentru fiecare celula zi x interval x sala, cu 0 pentru un slot liber si profesor * nr_materii + materie + 1
+# pentru o ora. Datele instantei se citesc direct din tablourile blocului partajat.
+
+#################### DISTRUGERE ####################
+def destroy_day(instance, codes, rng):
+    """
+    Toate celulele unei zile alese aleator.
+    """
+    size = len(instance.intervals) * len(instance.rooms)
+    day = rng.randrange(len(instance.days))
+    return list(range(day * size, (day + 1) * size))
+
+
+def destroy_room(instance, codes, rng):
+    """
+    Coloana unei sali alese aleator: toate zilele si intervalele.
+    """
+    return list(range(rng.randrange(len(instance.rooms)), len(codes), len(instance.rooms)))
+
+
+def lessons_by(codes, key):
+    """
+    Celulele ocupate, grupate dupa cheia calculata din codul orei (fara 1).
+    """
+    lessons = {}
+    for idx, code in enumerate(codes):
+        if code:
+            lessons.setdefault(key(code - 1), []).append(idx)
+    return lessons
+
+
+def destroy_teacher(instance, codes, rng):
+    """
+    Toate orele unui profesor ales aleator dintre cei care au ore in orar.
+    """
+    lessons = lessons_by(codes, lambda code: code // len(instance.courses))
+    return lessons[rng.choice(sorted(lessons))] if lessons else []
+
+
+def destroy_course(instance, codes, rng):
+    """
+    Toate plasarile unei materii alese aleator dintre cele care apar in orar.
+    """
+    lessons = lessons_by(codes, lambda code: code % len(instance.courses))
+    return lessons[rng.choice(sorted(lessons))] if lessons else []
+
+
+DESTROY = {'day': destroy_day, 'room': destroy_room, 'teacher': destroy_teacher, 'course': destroy_course}
+
+
+#################### REPARARE ####################
+def lesson_counts(instance, codes):
+    """
+    Orele fiecarui profesor si acoperirea fiecarei materii in orarul codificat.
+    """
+    capacity, nr_rooms, nr_courses = instance.array('capacity'), len(instance.rooms), len(instance.courses)
+    hours, coverage = [0] * len(instance.teachers), [0] * nr_courses
+    for idx, code in enumerate(codes):
+        if code:
+            teacher, course = divmod(code - 1, nr_courses)
+            hours[teacher] += 1
+            coverage[course] += capacity[idx % nr_rooms]
+    return hours, coverage
+
+
+def busy_teachers(instance, codes, cells):
+    """
+    Profesorii ocupati in fiecare interval (zi * nr_intervale + interval) al celulelor date.
+    """
+    nr_rooms, nr_courses = len(instance.rooms), len(instance.courses)
+    busy = {}
+    for idx in cells:
+        time = idx // nr_rooms
+        if time not in busy:
+            busy[time] = {(code - 1) // nr_courses for code in codes[time * nr_rooms:(time + 1) * nr_rooms] if code}
+    return busy
+
+
+def course_teachers(instance):
+    """
+    Profesorii care pot preda fiecare materie.
+    """
+    teacher_course, nr_courses = instance.array('teacher_course'), len(instance.courses)
+    return [[teacher for teacher in range(len(instance.teachers)) if teacher_course[teacher * nr_courses + course]]
+            for course in range(nr_courses)]
+
+
+def fill_uncovered(instance, codes, hours, coverage, cells, rng):
+    """
+    Completeaza greedy celulele libere date cu materiile care nu au acoperirea necesara, dupa aceleasi reguli ca
+    repair.fill_uncovered: se alege materia cu cea mai mare lipsa raportata la capacitatea libera in care poate fi
+    predata, iar pentru ea plasarea care nu incalca preferintele profesorului si acopera lipsa cu cea mai mica risipa.
+    """
+    capacity, demand, room_course = instance.array('capacity'), instance.array('demand'), instance.array('room_course')
+    limit = instance.array('teacher_slots')
+    forbidden_day, forbidden_interval = instance.array('forbidden_day'), instance.array('forbidden_interval')
+    nr_days, nr_intervals = len(instance.days), len(instance.intervals)
+    nr_rooms, nr_courses = len(instance.rooms), len(instance.courses)
+
+    cells = list(cells)
+    rng.shuffle(cells)
+    busy = busy_teachers(instance, codes, cells)
+    teachers = course_teachers(instance)
+    blocked = set()
+
+    while True:
+        missing = [course for course in range(nr_courses) if coverage[course] < demand[course] and course not in blocked]
+        if not missing:
+            break
+
+        free_cells = [idx for idx in cells if not codes[idx]]
+
+        free = {course: 0 for course in missing}
+        for idx in free_cells:
+            room = idx % nr_rooms
+            for course in missing:
+                if room_course[room * nr_courses + course]:
+                    free[course] += capacity[room]
+
+        course = max(missing, key=lambda c: (demand[c] - coverage[c]) / free[c] if free[c] else float('inf'))
+        shortfall = demand[course] - coverage[course]
+
+        best, best_key = None, None
+        for idx in free_cells:
+            time, room = divmod(idx, nr_rooms)
+            if not room_course[room * nr_courses + course]:
+                continue
+
+            day, interval = divmod(time, nr_intervals)
+            fits = capacity[room] >= shortfall
+            for teacher in teachers[course]:
+                if hours[teacher] >= limit[teacher] or teacher in busy[time]:
+                    continue
+
+                unwanted = bool(forbidden_day[teacher * nr_days + day]
+                                or forbidden_interval[teacher * nr_intervals + interval])
+                key = (unwanted, not fits, capacity[room] if fits else -capacity[room], hours[teacher])
+                if best_key is None or key < best_key:
+                    best, best_key = (idx, teacher), key
+
+        if best is None:
+            blocked.add(course)
+            continue
+
+        idx, teacher = best
+        codes[idx] = teacher * nr_courses + course + 1
+        busy[idx // nr_rooms].add(teacher)
+        hours[teacher] += 1
+        coverage[course] += capacity[idx % nr_rooms]
+
+
+def repair_greedy(instance, codes, cells, rng):
+    """
+    Completeaza greedy materiile neacoperite intai in celulele distruse, apoi, pentru ce a ramas neacoperit,
+    in celelalte celule libere din orar. Celulele ocupate din afara regiunii distruse nu se modifica.
+    """
+    hours, coverage = lesson_counts(instance, codes)
+    fill_uncovered(instance, codes, hours, coverage, cells, rng)
+    fill_uncovered(instance, codes, hours, coverage, range(len(codes)), rng)
+
+
+def repair_exact(instance, codes, cells, rng, node_limit=EXACT_NODE_LIMIT):
+    """
+    Completeaza celulele distruse printr-o cautare branch and bound care minimizeaza studentii neacoperiti
+    plus preferintele incalcate; restul orarului ramane fix, deci acesta este chiar costul local al regiunii.
+    Cautarea se opreste dupa node_limit noduri cu cea mai buna completare gasita, iar ce ramane neacoperit
+    se completeaza greedy (repair_greedy), intai in celulele distruse ramase libere, apoi in restul orarului.
+    """
+    capacity, demand, room_course = instance.array('capacity'), instance.array('demand'), instance.array('room_course')
+    limit = instance.array('teacher_slots')
+    forbidden_day, forbidden_interval = instance.array('forbidden_day'), instance.array('forbidden_interval')
+    nr_days, nr_intervals = len(instance.days), len(instance.intervals)
+    nr_rooms, nr_courses = len(instance.rooms), len(instance.courses)
+
+    hours, coverage = lesson_counts(instance, codes)
+    busy = busy_teachers(instance, codes, cells)
+    teachers = course_teachers(instance)
+
+    cells = [idx for idx in cells if not codes[idx]]
+    cells.sort(key=lambda idx: -capacity[idx % nr_rooms])
+    remaining_capacity = [0] * (len(cells) + 1)
+    for pos in range(len(cells) - 1, -1, -1):
+        remaining_capacity[pos] = remaining_capacity[pos + 1] + capacity[cells[pos] % nr_rooms]
+
+    shortfall = sum(max(0, demand[course] - coverage[course]) for course in range(nr_courses))
+    best = [shortfall, []]
+    assignment = []
+    nodes = [0]
+
+    def search(pos, soft, shortfall):
+        nodes[0] += 1
+        if nodes[0] > node_limit or soft + max(0, shortfall - remaining_capacity[pos]) >= best[0]:
+            return
+        if pos == len(cells) or shortfall == 0:
+            best[0], best[1] = soft + shortfall, list(assignment)
+            return
+
+        idx = cells[pos]
+        time, room = divmod(idx, nr_rooms)
+        day, interval = divmod(time, nr_intervals)
+        room_capacity = capacity[room]
+        options = []
+        for course in range(nr_courses):
+            if not room_course[room * nr_courses + course] or coverage[course] >= demand[course]:
+                continue
+            for teacher in teachers[course]:
+                if hours[teacher] < limit[teacher] and teacher not in busy[time]:
+                    penalty = forbidden_day[teacher * nr_days + day] + forbidden_interval[teacher * nr_intervals + interval]
+                    options.append((penalty, rng.random(), teacher, course))
+        options.sort()
+
+        for penalty, _, teacher, course in options:
+            gain = min(room_capacity, demand[course] - coverage[course])
+            hours[teacher] += 1
+            coverage[course] += room_capacity
+            busy[time].add(teacher)
+            assignment.append((idx, teacher * nr_courses + course + 1))
+
+            search(pos + 1, soft + penalty, shortfall - gain)
+
+            assignment.pop()
+            busy[time].discard(teacher)
+            coverage[course] -= room_capacity
+            hours[teacher] -= 1
+
+        search(pos + 1, soft, shortfall)
+
+    search(0, 0, shortfall)
+
+    for idx, code in best[1]:
+        codes[idx] = code
+    repair_greedy(instance, codes, cells, rng)
+
+
+REPAIR = {'greedy': repair_greedy, 'exact': repair_exact}
+
+
+def encoded_cost(instance, codes):
+    """
+    Costul orarului codificat, egal cu State.get_conflicts pentru orarul decodificat: orele care incalca
+    sala sau specializarea profesorului, profesorii cu doua ore in acelasi interval sau peste limita de ore
+    (LESSON_PENALTY), materiile neacoperite (HARD_PENALTY), studentii neacoperiti si preferintele incalcate.
+    """
+    capacity, demand, room_course = instance.array('capacity'), instance.array('demand'), instance.array('room_course')
+    teacher_course, limit = instance.array('teacher_course'), instance.array('teacher_slots')
+    forbidden_day, forbidden_interval = instance.array('forbidden_day'), instance.array('forbidden_interval')
+    nr_days, nr_intervals = len(instance.days), len(instance.intervals)
+    nr_rooms, nr_courses = len(instance.rooms), len(instance.courses)
+
+    hours, coverage = [0] * len(instance.teachers), [0] * nr_courses
+    hard = soft = 0
+    for time in range(nr_days * nr_intervals):
+        day, interval = divmod(time, nr_intervals)
+        busy = set()
+        for room in range(nr_rooms):
+            code = codes[time * nr_rooms + room]
+            if not code:
+                continue
+            teacher, course = divmod(code - 1, nr_courses)
+            hard += (not room_course[room * nr_courses + course]) + (not teacher_course[teacher * nr_courses + course])
+            if teacher in busy:
+                hard += 1
+            busy.add(teacher)
+            hours[teacher] += 1
+            coverage[course] += capacity[room]
+            soft += forbidden_day[teacher * nr_days + day] + forbidden_interval[teacher * nr_intervals + interval]
+
+    hard += sum(max(0, hours[teacher] - limit[teacher]) for teacher in range(len(hours)))
+    shortfall = sum(max(0, demand[course] - coverage[course]) for course in range(nr_courses))
+    uncovered = sum(coverage[course] < demand[course] for course in range(nr_courses))
+    return LESSON_PENALTY * hard + HARD_PENALTY * uncovered + shortfall + soft
+
+
+#################### WORKERI ####################
+def init_worker(name):
+    """
+    Initializarea unui proces worker: se ataseaza la instanta publicata in memoria partajata. Nici instanta,
+    nici orarul curent nu se trimit cu fiecare candidat si nici nu se reconstruiesc ca dictionare: candidatii
+    se genereaza si se evalueaza direct pe tablourile blocului comun.
+    """
+    global _shared
+    _shared = attach_instance(name)
+
+
+def init_local(shared):
+    """
+    Initializarea evaluarii candidatilor in procesul curent, pe instanta pe care tocmai a publicat-o.
+    """
+    global _shared
+    _shared = shared
+
+
+def destroy_and_repair(task):
+    """
+    Genereaza un candidat: distruge o regiune a orarului curent si o reconstruieste. Singura copie este
+    lista de coduri a candidatului.
+
+    Args:
+        task (tuple): (operator de distrugere, operator de reparare, seed).
+
+    Returns:
+        list: Celulele modificate fata de orarul curent, ca (celula, cod).
+        int: Costul candidatului.
+    """
+    destroy, repair, seed = task
+    rng = random.Random(seed)
+
+    current = _shared.array('timetable')
+    candidate = current.tolist()
+    cells = DESTROY[destroy](_shared, candidate, rng)
+    for idx in cells:
+        candidate[idx] = 0
+    REPAIR[repair](_shared, candidate, cells, rng)
+
+    changes = [(idx, code) for idx, code in enumerate(candidate) if code != current[idx]]
+    return changes, encoded_cost(_shared, candidate)
+
+
+def apply_changes(shared, timetable, changes):
+    """
+    Orarul candidat: orarul curent cu celulele modificate de destroy_and_repair, decodificate.
+    """
+    candidate = copy_timetable(timetable)
+    for idx, code in changes:
+        day, interval, room = shared.slots[idx]
+        candidate[day][interval][room] = shared.decode(code)
+    return candidate
+
+
+#################### ALGORITM ####################
+def choose(weights, rng):
+    """
+    Alege un operator proportional cu ponderea lui.
+    """
+    names = list(weights)
+    return rng.choices(names, weights=[weights[name] for name in names])[0]
+
+
+def reward(weights, name, value):
+    weights[name] = max(MIN_WEIGHT, (1 - REACTION) * weights[name] + REACTION * value)
+
+
+def lns_steps(initial, max_iters=200, candidates=None, workers=None):
+    """
+    Large Neighborhood Search: la fiecare iteratie se genereaza in paralel mai multi candidati prin distrugerea
+    unei regiuni structurate a orarului (o zi, o sala, orele unui profesor sau ale unei materii) si reconstruirea ei
+    greedy sau exact. Cel mai bun candidat este acceptat daca nu este mai slab decat orarul curent.
+
+    Operatorii sunt alesi adaptiv: ponderea fiecaruia urmareste recompensele primite recent (cea mai buna solutie,
+    o imbunatatire sau un candidat acceptat).
+
+    Args:
+        initial (State): Starea initiala; orarul ei este intai reparat greedy.
+        max_iters (int): Numarul maxim de iteratii.
+        candidates (int, optional): Numarul de candidati evaluati la fiecare iteratie. Implicit, numarul de workeri.
+        workers (int, optional): Numarul de procese worker. Implicit, numarul de procesoare; cu 1 worker
+            candidatii se evalueaza in procesul curent.
+
+    Yields:
+        ProgressEvent: Progresul cautarii.
+    """
+    start = time.time()
+    rng = random.Random(initial.seed)
+    workers = workers or os.cpu_count()
+    candidates = candidates or workers
+
+    specs = instance_specs(initial)
+    current = repair_timetable(initial.timetable, specs)
+    current_cost = state_from_timetable(initial.info, current).get_conflicts()
+    best_state = state_from_timetable(initial.info, current, initial.seed)
+    best_cost = current_cost
+    evaluations = 1
+
+    yield ProgressEvent('lns', 0, evaluations, current_cost, best_cost, time.time() - start, best_state,
+                        best_cost < initial.get_conflicts())
+
+    destroy_weights = {name: 1.0 for name in DESTROY_OPERATORS}
+    repair_weights = {name: 1.0 for name in REPAIR_OPERATORS}
+
+    # Instanta si orarul curent se publica o singura data in memoria partajata; un task contine doar operatorii
+    # si seed-ul, iar rezultatul doar celulele modificate, care se scriu apoi in bloc daca sunt acceptate
+    shared = publish_instance(state_from_timetable(initial.info, current))
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(shared.name,))
+        evaluate = executor.map
+    else:
+        executor = None
+        init_local(shared)
+        evaluate = map
+
+    try:
+        for iteration in range(1, max_iters + 1):
+            if best_cost == 0:
+                break
+
+            picks = [(choose(destroy_weights, rng), choose(repair_weights, rng)) for _ in range(candidates)]
+            tasks = [(destroy, repair, rng.getrandbits(32)) for destroy, repair in picks]
+            results = list(evaluate(destroy_and_repair, tasks))
+            evaluations += len(results)
+
+            for (destroy, repair), (_, cost) in zip(picks, results):
+                value = REWARD_BEST if cost < best_cost else REWARD_BETTER if cost < current_cost \
+                    else REWARD_ACCEPTED if cost == current_cost else 0
+                reward(destroy_weights, destroy, value)
+                reward(repair_weights, repair, value)
+
+            changes, cost = min(results, key=lambda result: result[1])
+            if cost <= current_cost:
+                current, current_cost = apply_changes(shared, current, changes), cost
+                shared.store_cells(changes)
+
+            improved = current_cost < best_cost
+            if improved:
+                best_state = state_from_timetable(initial.info, current, initial.seed)
+                best_cost = current_cost
+
+            yield ProgressEvent('lns', iteration, evaluations, current_cost, best_cost, time.time() - start,
+                                best_state, improved)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        shared.close()
@@ -1,83 +1,120 @@
 import random
 import math
+import time
+from progress import ProgressEvent, until, last
+
+
+MAX_NODES = 100000  # Numarul implicit maxim de noduri pastrate in arbore
+PRUNE_FRACTION = 0.5  # La atingerea bugetului, arborele este redus la aceasta fractiune din buget
 
 class Node:
-    def __init__(self, state, parent=None):
+    __slots__ = ('move', 'parent', 'children', 'visits', 'score', 'expanded')
+
+    def __init__(self, move=None, parent=None):
         """
         Initializarea unui nod al arborelui de cautare.
 
+        Nodul nu pastreaza o copie a starii, ci doar mutarea prin care s-a ajuns in el din parinte.
+        Starea nodului se obtine refacand mutarile de pe drumul de la radacina intr-o stare de lucru.
+
         Args:
-            state (State): Starea asociata nodului.
+            move (tuple): Mutarea (zi, interval, sala, profesor, materie) aplicata in parinte; None pentru radacina.
             parent (Node): Nodul parinte.
         """
-        self.state = state
+        self.move = move
         self.parent = parent
         self.children = []
         self.visits = 0
         self.score = 0
+        self.expanded = False
 
-    def add_child(self, child_state):
+    def add_child(self, move):
         """
         Adaugarea unui copil pentru nodul curent.
 
         Args:
-            child_state (State): Starea copilului.
+            move (tuple): Mutarea care duce in copil.
 
         Returns:
             Node: Nodul copil creat.
         """
-        child = Node(child_state, parent=self)
+        child = Node(move, parent=self)
         self.children.append(child)
         return child
 
-def select_node(node):
+def select_node(node, state):
     """
-    Selecteaza un nod in functie de politica de selectie Monte Carlo.
+    Selecteaza un nod in functie de politica de selectie Monte Carlo, aplicand in starea de lucru
+    mutarile de pe drumul parcurs.
 
     Args:
         node (Node): Nodul din care incepe selectia.
+        state (State): Starea de lucru, aflata in starea nodului de start.
 
     Returns:
         Node: Nodul selectat.
+        list: Mutarile aplicate in starea de lucru.
     """
+    path = []
     while node.children:
-        if not all(child.visits for child in node.children):
-            return random.choice([child for child in node.children if not child.visits])
-        node = max(node.children, key=lambda x: x.score / x.visits + 1.4 * (2 * math.log(node.visits) / x.visits) ** 0.5)
-    return node
-
-
-def expand_node(node):
+        unvisited = [child for child in node.children if not child.visits]
+        if unvisited:
+            node = random.choice(unvisited)
+        else:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda x: x.score / x.visits + 1.4 * (2 * log_visits / x.visits) ** 0.5)
+        state.do_move(*node.move)
+        path.append(node.move)
+        if not node.visits:
+            break
+    return node, path
+
+
+def expand_node(node, state):
     """
-    Extinde un nod prin adaugarea de copii (stari vecine).
+    Extinde un nod prin adaugarea de copii (mutarile posibile din starea lui).
 
     Args:
         node (Node): Nodul care va fi extins.
-    """
-    if node.state.is_terminal():
-        return
+        state (State): Starea de lucru, aflata in starea nodului.
 
-    next_states = node.state.generate_next_states()
+    Returns:
+        int: Numarul de copii adaugati.
+    """
+    node.expanded = True
+    if state.is_terminal():
+        return 0
 
-    for state in next_states:
-        child_node = node.add_child(state)
+    for move in state.generate_moves():
+        node.add_child(move)
+    return len(node.children)
 
-def simulate(node):
+def rollout(state):
     """
-    Simuleaza o tranzitie a starii pana la o stare terminala si intoarce rezultatul simularii.
+    Aplica mutari aleatoare in starea de lucru pana la o stare terminala sau fara mutari posibile.
 
     Args:
-        node (Node): Nodul pentru care se simuleaza tranzitia.
+        state (State): Starea de lucru din care porneste simularea.
 
     Returns:
-        int: Rezultatul simularii.
+        list: Mutarile aplicate, pentru a putea fi anulate.
     """
-    current_state = node.state
-    while not current_state.is_terminal():
-        possible_actions = current_state.generate_next_states()
+    moves = []
+    while not state.is_terminal():
+        possible_actions = state.generate_moves()
+        if not possible_actions:
+            break
         action = random.choice(possible_actions)
-        current_state = current_state.apply_move(*action)
-    return -current_state.get_conflicts()
+        state.do_move(*action)
+        moves.append(action)
+    return moves
+
+def undo_moves(state, moves):
+    """
+    Anuleaza, in ordine inversa, mutarile aplicate in starea de lucru.
+    """
+    for move in reversed(moves):
+        state.undo_move(*move)
 
 def backpropagate(node, result):
     """
@@ -92,48 +129,125 @@ def backpropagate(node, result):
         node.score += result
         node = node.parent
 
-def best_child(node):
+def count_nodes(node):
+    """
+    Numara nodurile din subarborele unui nod (inclusiv nodul).
     """
-    Selecteaza cel mai bun copil al unui nod.
+    count, stack = 0, [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+def prune_tree(root_node, nodes, target):
+    """
+    Elimina subarborii cei mai putin vizitati pana cand arborele are cel mult target noduri.
+    Nodurile taiate isi pastreaza statisticile si pot fi extinse din nou daca sunt selectate.
 
     Args:
-        node (Node): Nodul pentru care se cauta cel mai bun copil.
+        root_node (Node): Radacina arborelui.
+        nodes (int): Numarul curent de noduri.
+        target (int): Numarul de noduri dorit dupa taiere.
 
     Returns:
-        Node: Cel mai bun copil al nodului.
+        int: Numarul de noduri ramase.
     """
-    if node.children:
-        return max(node.children, key=lambda x: x.visits)
-    else:
-        return None
-
-def monte_carlo_tree_search(root_node, num_simulations):
+    candidates, stack = [], list(root_node.children)
+    while stack:
+        node = stack.pop()
+        if node.children:
+            candidates.append(node)
+            stack.extend(node.children)
+
+    candidates.sort(key=lambda x: x.visits)
+    for node in candidates:
+        if nodes <= target:
+            break
+        if node.children:
+            nodes -= count_nodes(node) - 1
+            node.children = []
+            node.expanded = False
+    return nodes
+
+def monte_carlo_steps(root_state, num_simulations, max_nodes=MAX_NODES):
     """
-    Implementarea algoritmului de cautare Monte Carlo Tree Search.
+    Monte Carlo Tree Search sub forma de generator: emite un eveniment dupa fiecare simulare.
+    Cea mai buna stare raportata este cea mai buna stare finala a unei simulari (un orar complet).
+
+    Toate simularile folosesc o singura stare de lucru: mutarile de pe drumul selectat si cele din simulare
+    se aplica pe loc si se anuleaza la final. Starea se copiaza doar cand o simulare gaseste un orar mai bun.
 
     Args:
-        root_node (Node): Nodul radacina al arborelui.
+        root_state (State): Starea de la radacina arborelui (nu este modificata).
         num_simulations (int): Numarul de simulari care vor fi efectuate.
+        max_nodes (int, optional): Bugetul de noduri al arborelui; None pentru un arbore nelimitat.
 
-    Returns:
-        State or None: Starea finala optima sau None daca nu s-a gasit o solutie.
+    Yields:
+        ProgressEvent: Progresul cautarii.
     """
-    for _ in range(num_simulations):
-        node_to_simulate = select_node(root_node)
+    start = time.time()
+    root_node = Node()
+    state = root_state.copy()
+    nodes, states = 1, 0
+    best_state = root_state
+    best_cost = best_state.get_conflicts()
+
+    for simulation in range(num_simulations):
+        node_to_simulate, path = select_node(root_node, state)
         
-        if not node_to_simulate.state.is_terminal():
-            expand_node(node_to_simulate)
-            node_to_simulate = random.choice(node_to_simulate.children)
+        if not node_to_simulate.expanded and not state.is_terminal():
+            added = expand_node(node_to_simulate, state)
+            nodes += added
+            states += added
+            if node_to_simulate.children:
+                node_to_simulate = random.choice(node_to_simulate.children)
+                state.do_move(*node_to_simulate.move)
+                path.append(node_to_simulate.move)
         
-        simulation_result = simulate(node_to_simulate)
+        moves = rollout(state)
+        states += len(moves)
+        cost = state.get_conflicts()
+
+        improved = cost < best_cost
+        if improved:
+            best_state, best_cost = state.copy(), cost
+
+        undo_moves(state, moves)
+        undo_moves(state, path)
         
-        backpropagate(node_to_simulate, simulation_result)
-    
-    best_child_node = best_child(root_node)
-    if best_child_node:
-        return best_child_node.state
-    else:
-        return None
+        backpropagate(node_to_simulate, -cost)
+
+        if max_nodes is not None and nodes > max_nodes:
+            nodes = prune_tree(root_node, nodes, int(max_nodes * PRUNE_FRACTION))
+
+        yield ProgressEvent('mtcs', simulation + 1, states, cost, best_cost, time.time() - start, best_state, improved)
+
+def monte_carlo_solver(initial_state, num_simulations=1000, max_nodes=MAX_NODES):
+    """
+    Punctul de intrare folosit de registry: MCTS construieste orarul plasand pe rand ore in intervale libere,
+    asa ca porneste de la orarul gol al starii initiale. Bugetul de noduri se poate da prin parametrii
+    algoritmului (orar.algorithm_steps, options={'max_nodes': ...}).
+    """
+    return monte_carlo_steps(initial_state.cleared(), num_simulations=num_simulations, max_nodes=max_nodes)
+
+def monte_carlo_tree_search(root_state, num_simulations, callback=None, max_nodes=MAX_NODES):
+    """
+    Implementarea algoritmului de cautare Monte Carlo Tree Search.
+
+    Args:
+        root_state (State): Starea de la radacina arborelui.
+        num_simulations (int): Numarul de simulari care vor fi efectuate.
+        callback (callable, optional): Functie apelata dupa fiecare simulare cu (simulari, stari generate, cea mai buna stare).
+            Daca intoarce True, cautarea se opreste (anulare sau buget de timp depasit).
+        max_nodes (int, optional): Bugetul de noduri al arborelui; None pentru un arbore nelimitat.
+
+    Returns:
+        State: Cel mai bun orar gasit de simulari (starea radacinii daca nu s-a facut nicio simulare).
+    """
+    stop = None if callback is None else lambda event: callback(event.iteration, event.evaluations, event.best_state)
+    event = last(until(monte_carlo_steps(root_state, num_simulations, max_nodes), callback=stop))
+    return root_state if event is None else event.best_state
 
 class State:
     def __init__(self, info, timetable, case, seed=42):
@@ -0,0 +1,395 @@
+# O mutare este un tuplu de atribuiri (slot, ora), unde slot = (zi, interval, sala), iar ora = (profesor, materie)
+# sau None pentru un slot eliberat. Atribuirile se aplica in ordine, fiecare prin State.remove_lesson si
+# State.add_lesson, care actualizeaza costul incremental; astfel costul unei mutari se calculeaza in timp
+# proportional cu numarul de sloturi atinse (constant pentru toate vecinatatile in afara de lanturile Kempe).
+
+
+def apply_move(state, move):
+    """
+    Aplica pe loc o mutare.
+
+    Args:
+        state (State): Starea modificata.
+        move (tuple): Atribuirile (slot, ora).
+
+    Returns:
+        tuple: Mutarea inversa, care readuce starea la forma anterioara.
+    """
+    inverse = []
+    for slot in move:
+        (day, interval, room), lesson = slot
+        current = state.timetable[day][interval][room]
+        inverse.append(((day, interval, room), current))
+        if current is not None:
+            state.remove_lesson(day, interval, room)
+        if lesson is not None:
+            state.add_lesson(day, interval, room, *lesson)
+    inverse.reverse()
+    return tuple(inverse)
+
+
+def move_delta(state, move):
+    """
+    Calculeaza diferenta de cost produsa de o mutare, aplicand-o si anulandu-o pe loc.
+
+    Returns:
+        int: Costul dupa mutare minus costul curent.
+    """
+    before = state.get_conflicts()
+    inverse = apply_move(state, move)
+    after = state.get_conflicts()
+    apply_move(state, inverse)
+    return after - before
+
+
+def move_footprint(state, move):
+    """
+    Partile starii de care depinde diferenta de cost a unei mutari (si pe care le modifica aplicarea ei):
+    sloturile atinse, prezenta profesorilor implicati in intervalele atinse, numarul de ore al profesorilor si
+    acoperirea materiilor care se schimba in urma mutarii. Preferintele si compatibilitatea sala-materie-profesor
+    nu depind de stare.
+
+    Returns:
+        set: Cheile ('slot', zi, interval, sala), ('busy', zi, interval, profesor), ('teacher', profesor)
+            si ('course', materie).
+    """
+    classrooms = state.info.classrooms
+    keys, teachers, courses = set(), {}, {}
+    for (day, interval, room), lesson in move:
+        keys.add(('slot', day, interval, room))
+        capacity = classrooms[room]['Capacitate']
+        for sign, current in ((-1, state.timetable[day][interval][room]), (1, lesson)):
+            if current is not None:
+                teacher, course = current
+                keys.add(('busy', day, interval, teacher))
+                teachers[teacher] = teachers.get(teacher, 0) + sign
+                courses[course] = courses.get(course, 0) + sign * capacity
+    keys.update(('teacher', teacher) for teacher, change in teachers.items() if change)
+    keys.update(('course', course) for course, change in courses.items() if change)
+    return keys
+
+
+def slots(state):
+    """
+    Toate sloturile (zi, interval, sala) ale orarului, impreuna cu ora din fiecare.
+    """
+    timetable = state.timetable
+    return [((day, interval, room), timetable[day][interval][room])
+            for day in timetable for interval in timetable[day] for room in timetable[day][interval]]
+
+
+def periods(state):
+    """
+    Toate intervalele (zi, interval) ale orarului.
+    """
+    return [(day, interval) for day in state.timetable for interval in state.timetable[day]]
+
+
+# Fiecare vecinatate este impartita in unitati: grupuri de mutari care depind de aceleasi parti ale starii. Pentru
+# fiecare vecinatate, <nume>_units(state, keys) da unitatile ale caror mutari se pot schimba cand se schimba partile
+# date prin cheile lui move_footprint (toate unitatile, daca keys este None), iar <nume>_unit_moves(state, unit) da
+# mutarile unei unitati. Cheile ('slot', zi, interval, sala) acopera si sloturile libere ale intervalului, cu
+# clasele lor de simetrie, si profesorii ocupati in el; ('course', materie) acopera acoperirea materiei (deci daca
+# este neacoperita), iar ('teacher', profesor) numarul de ore al profesorului (deci limita lui si alegerea
+# reprezentantului clasei lui de simetrie).
+
+def changed_slots(state, keys):
+    """
+    Sloturile schimbate, in ordinea din orar (unitatile se genereaza intr-o ordine determinista).
+    """
+    changed = {key[1:] for key in keys if key[0] == 'slot'}
+    return [slot for slot, _ in slots(state) if slot in changed]
+
+
+def changed_periods(state, keys):
+    """
+    Intervalele cu sloturi schimbate, in ordinea din orar.
+    """
+    changed = {key[1:3] for key in keys if key[0] == 'slot'}
+    return [period for period in periods(state) if period in changed]
+
+
+def empty_slots(state, day, interval):
+    """
+    Sloturile libere ale unui interval, fara cele echivalente: dintre salile libere din aceeasi clasa de simetrie
+    se pastreaza doar prima.
+    """
+    room_class = state.info.room_class
+    seen = set()
+    empty = []
+    for room, lesson in state.timetable[day][interval].items():
+        if lesson is None and room_class[room] not in seen:
+            seen.add(room_class[room])
+            empty.append((day, interval, room))
+    return empty
+
+
+def place_units(state, keys=None):
+    """
+    Unitatile (zi, interval, materie): depind de sloturile intervalului, de acoperirea materiei si de orele
+    profesorilor care o predau.
+    """
+    info = state.info
+    if keys is None:
+        return [(day, interval, course) for day, interval in periods(state) for course in info.courses]
+    courses = {key[1] for key in keys if key[0] == 'course'}
+    courses.update(course for key in keys if key[0] == 'teacher' for course in info.teacher_courses[key[1]])
+    changed = set(changed_periods(state, keys))
+    return [(day, interval, course) for day, interval in periods(state) for course in info.courses
+            if (day, interval) in changed or course in courses]
+
+
+def place_unit_moves(state, unit):
+    day, interval, course = unit
+    info = state.info
+    if state.courses_counts[course] >= info.courses[course]:
+        return
+    teachers = state.canonical_teachers(info.course_teacher_classes[course], state.busy[day][interval])
+    for slot in empty_slots(state, day, interval):
+        if course in info.room_courses[slot[2]]:
+            for teacher in teachers:
+                yield ((slot, (teacher, course)),)
+
+
+def place_moves(state):
+    """
+    Plaseaza o materie neacoperita intr-un slot liber (mutarea initiala a algoritmului).
+    """
+    for unit in place_units(state):
+        yield from place_unit_moves(state, unit)
+
+
+def remove_units(state, keys=None):
+    """
+    Unitatile sunt sloturile: mutarea unui slot depinde doar de el.
+    """
+    return [slot for slot, _ in slots(state)] if keys is None else changed_slots(state, keys)
+
+
+def remove_unit_moves(state, slot):
+    day, interval, room = slot
+    if state.timetable[day][interval][room] is not None:
+        yield ((slot, None),)
+
+
+def remove_moves(state):
+    """
+    Elibereaza un slot ocupat.
+    """
+    for unit in remove_units(state):
+        yield from remove_unit_moves(state, unit)
+
+
+def relocate_units(state, keys=None):
+    """
+    Unitatile (slot sursa ocupat, interval tinta): depind de slotul sursa si de sloturile intervalului tinta.
+    """
+    all_periods = periods(state)
+    occupied = [slot for slot, lesson in slots(state) if lesson is not None]
+    if keys is None:
+        return [(slot, period) for slot in occupied for period in all_periods]
+    units = [(slot, period) for slot in changed_slots(state, keys) for period in all_periods]
+    units += [(slot, period) for period in changed_periods(state, keys) for slot in occupied]
+    return list(dict.fromkeys(units))
+
+
+def relocate_unit_moves(state, unit):
+    slot, (day, interval) = unit
+    lesson = state.timetable[slot[0]][slot[1]][slot[2]]
+    if lesson is None:
+        return
+    room_class = state.info.room_class
+    for target in empty_slots(state, day, interval):
+        # Mutarea intr-o sala echivalenta din acelasi interval nu schimba costul
+        if target[:2] != slot[:2] or room_class[target[2]] != room_class[slot[2]]:
+            yield ((slot, None), (target, lesson))
+
+
+def relocate_moves(state):
+    """
+    Muta o ora intr-un slot liber (alta zi, alt interval sau alta sala).
+    """
+    for unit in relocate_units(state):
+        yield from relocate_unit_moves(state, unit)
+
+
+def swap_units(state, keys=None):
+    """
+    Unitatile sunt perechile de sloturi ocupate (in ordinea din orar): depind doar de cele doua sloturi.
+    """
+    all_slots = slots(state)
+    occupied = [slot for slot, lesson in all_slots if lesson is not None]
+    if keys is None:
+        return [(first, second) for i, first in enumerate(occupied) for second in occupied[i + 1:]]
+    order = {slot: i for i, (slot, _) in enumerate(all_slots)}
+    return list(dict.fromkeys((slot, other) if order[slot] < order[other] else (other, slot)
+                              for slot in changed_slots(state, keys) for other in occupied if other != slot))
+
+
+def swap_unit_moves(state, unit):
+    first, second = unit
+    first_lesson = state.timetable[first[0]][first[1]][first[2]]
+    second_lesson = state.timetable[second[0]][second[1]][second[2]]
+    if first_lesson is None or second_lesson is None or first_lesson == second_lesson:
+        return
+    # Schimbul intre doua sali echivalente din acelasi interval nu schimba costul
+    room_class = state.info.room_class
+    if first[:2] != second[:2] or room_class[first[2]] != room_class[second[2]]:
+        yield ((first, second_lesson), (second, first_lesson))
+
+
+def swap_moves(state):
+    """
+    Schimba intre ele doua ore diferite, aflate in sloturi diferite.
+    """
+    for unit in swap_units(state):
+        yield from swap_unit_moves(state, unit)
+
+
+def reassign_units(state, keys=None):
+    """
+    Unitatile sunt sloturile: mutarile unui slot depind de ora din el, de profesorii ocupati in interval si de
+    orele profesorilor care predau materia.
+    """
+    if keys is None:
+        return [slot for slot, _ in slots(state)]
+    courses = {course for key in keys if key[0] == 'teacher' for course in state.info.teacher_courses[key[1]]}
+    changed = set(changed_periods(state, keys))
+    # Sloturile schimbate sunt incluse in intervalele lor
+    return [slot for slot, lesson in slots(state)
+            if slot[:2] in changed or (lesson is not None and lesson[1] in courses)]
+
+
+def reassign_unit_moves(state, slot):
+    lesson = state.timetable[slot[0]][slot[1]][slot[2]]
+    if lesson is None:
+        return
+    teacher, course = lesson
+    busy = state.busy[slot[0]][slot[1]]
+    counts = state.teacher_counts
+    for members in state.info.course_teacher_classes[course]:
+        others = [other for other in members if other != teacher]
+        if others:
+            other = min(others, key=lambda other: (other in busy, counts[other]))
+            yield ((slot, (other, course)),)
+
+
+def reassign_moves(state):
+    """
+    Schimba profesorul unei ore cu un alt profesor care preda materia, cate unul din fiecare clasa de simetrie:
+    cel liber in interval, cu cele mai putine ore.
+    """
+    for unit in reassign_units(state):
+        yield from reassign_unit_moves(state, unit)
+
+
+def kempe_chain(timetable, first, second, room):
+    """
+    Calculeaza lantul Kempe care porneste din sala data intre doua intervale: multimea minima de sali ale caror ore
+    trebuie schimbate intre cele doua intervale astfel incat niciun profesor sa nu ajunga sa aiba doua ore in acelasi
+    interval din cauza schimbului.
+
+    Args:
+        timetable (dict): Orarul.
+        first (tuple): Primul interval (zi, interval).
+        second (tuple): Al doilea interval (zi, interval).
+        room (str): Sala din care porneste lantul.
+
+    Returns:
+        frozenset: Salile din lant.
+    """
+    rooms_first = timetable[first[0]][first[1]]
+    rooms_second = timetable[second[0]][second[1]]
+    teacher_rooms_first, teacher_rooms_second = {}, {}
+    for other, lesson in rooms_first.items():
+        if lesson:
+            teacher_rooms_first.setdefault(lesson[0], []).append(other)
+    for other, lesson in rooms_second.items():
+        if lesson:
+            teacher_rooms_second.setdefault(lesson[0], []).append(other)
+
+    chain, stack = {room}, [room]
+    while stack:
+        current = stack.pop()
+        # Profesorul care ajunge in celalalt interval trage dupa el orele pe care le are deja acolo
+        for lesson, teacher_rooms in ((rooms_first.get(current), teacher_rooms_second),
+                                      (rooms_second.get(current), teacher_rooms_first)):
+            if lesson:
+                for other in teacher_rooms.get(lesson[0], ()):
+                    if other not in chain:
+                        chain.add(other)
+                        stack.append(other)
+    return frozenset(chain)
+
+
+def kempe_units(state, keys=None):
+    """
+    Unitatile sunt perechile de intervale (in ordinea din orar): depind doar de sloturile celor doua intervale.
+    """
+    all_periods = periods(state)
+    if keys is None:
+        return [(first, second) for i, first in enumerate(all_periods) for second in all_periods[i + 1:]]
+    order = {period: i for i, period in enumerate(all_periods)}
+    return list(dict.fromkeys((period, other) if order[period] < order[other] else (other, period)
+                              for period in changed_periods(state, keys) for other in all_periods if other != period))
+
+
+def kempe_unit_moves(state, unit):
+    first, second = unit
+    timetable = state.timetable
+    rooms_first = timetable[first[0]][first[1]]
+    rooms_second = timetable[second[0]][second[1]]
+    seen = set()
+    for room in rooms_first:
+        if rooms_first[room] is None and rooms_second[room] is None:
+            continue
+        chain = kempe_chain(timetable, first, second, room)
+        if chain in seen:
+            continue
+        seen.add(chain)
+        yield tuple(((first[0], first[1], other), rooms_second[other]) for other in chain) + \
+            tuple(((second[0], second[1], other), rooms_first[other]) for other in chain)
+
+
+def kempe_moves(state):
+    """
+    Schimba intre doua intervale orele dintr-un lant Kempe de sali.
+    """
+    for unit in kempe_units(state):
+        yield from kempe_unit_moves(state, unit)
+
+
+NEIGHBORHOODS = {
+    'place': place_moves,
+    'remove': remove_moves,
+    'relocate': relocate_moves,
+    'swap': swap_moves,
+    'reassign': reassign_moves,
+    'kempe': kempe_moves,
+}
+
+
+# Unitatile fiecarei vecinatati, pentru intretinerea incrementala a vecinatatii (hill_climbing.MoveIndex)
+UNITS = {
+    'place': (place_units, place_unit_moves),
+    'remove': (remove_units, remove_unit_moves),
+    'relocate': (relocate_units, relocate_unit_moves),
+    'swap': (swap_units, swap_unit_moves),
+    'reassign': (reassign_units, reassign_unit_moves),
+    'kempe': (kempe_units, kempe_unit_moves),
+}
+
+
+def neighborhood(state, names=None):
+    """
+    Genereaza mutarile din vecinatatile date (implicit, din toate).
+
+    Args:
+        state (State): Starea curenta.
+        names (list, optional): Numele vecinatatilor folosite.
+
+    Yields:
+        tuple: Mutarile posibile.
+    """
+    for name in names or NEIGHBORHOODS:
+        yield from NEIGHBORHOODS[name](state)
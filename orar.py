@@ -1,23 +1,56 @@
-from copy import copy, deepcopy
-from utils import *
+from copy import deepcopy
+from utils import read_yaml_file, create_timetable, write_timetable, INTERVALE, MATERII, PROFESORI, SALI, ZILE
+from check_constraints import get_forbidden_slots
+from progress import until, last
+from registry import available as available_solvers, exists as solver_exists, load as load_solver
 import random
 import argparse
-from hill_climbing import *
-from monte_carlo import *
+import inspect
+import sys
+
+
+MAX_TEACHER_SLOTS = 7
+HARD_PENALTY = 1000  # Costul unei constrangeri obligatorii incalcate (de exemplu, o materie neacoperita)
+# Costul unei constrangeri obligatorii incalcate de o ora plasata: mai mare decat cel al materiei pe care ar lasa-o
+# neacoperita, ca scoaterea unei ore invalide sa fie mereu o imbunatatire
+LESSON_PENALTY = 2 * HARD_PENALTY
 
 
 class Info:
-    def __init__(self, info) -> None:
+    def __init__(self, info, days) -> None:
         """
         Clasa pentru stocarea informatiilor despre sali, profesori si materii.
 
         Args:
             info (tuple): Un tuplu continand informatiile despre sali, profesori si materii.
+            days (list): Zilele orarului; o constrangere '!X' se refera la o zi doar daca X este una dintre ele.
         """
         # Extrag informatiile din fisier
         self.classrooms, self.teachers, self.courses = info
+        self.days = list(days)
         # Sortez materiile in functie de numarul de studenti
         self.sorted_courses = self.courses_sorted()
+        # Zilele si intervalele nedorite de fiecare profesor
+        self.forbidden = self.forbidden_slots()
+        # Profesorii fiecarei materii si materiile permise in fiecare sala / predate de fiecare profesor
+        self.course_teachers = {course: self.teacher_has_course(course) for course in self.courses}
+        self.room_courses = {room: set(self.classrooms[room]['Materii']) for room in self.classrooms}
+        self.teacher_courses = {teacher: set(self.teachers[teacher]['Materii']) for teacher in self.teachers}
+        # Numarul maxim de sloturi al fiecarui profesor: MAX_TEACHER_SLOTS, daca nu are o limita proprie ('Sloturi')
+        self.teacher_slots = {teacher: self.teachers[teacher].get('Sloturi', MAX_TEACHER_SLOTS)
+                              for teacher in self.teachers}
+        # Componentele independente ale grafului de compatibilitate profesor-materie-sala
+        self.components = self.independent_components()
+        # Clasele de simetrie: salile cu aceeasi capacitate si aceleasi materii, respectiv profesorii cu aceleasi
+        # materii si aceleasi preferinte sunt interschimbabili; fiecare este asociat primului din clasa lui
+        self.room_class = self.symmetry_classes(self.classrooms, lambda room: (
+            self.classrooms[room]['Capacitate'], frozenset(self.room_courses[room])))
+        self.teacher_class = self.symmetry_classes(self.teachers, lambda teacher: (
+            frozenset(self.teacher_courses[teacher]), frozenset(self.forbidden[teacher][0]),
+            frozenset(self.forbidden[teacher][1]), self.teacher_slots[teacher]))
+        # Profesorii fiecarei materii, grupati pe clase de simetrie
+        self.course_teacher_classes = {course: self.group_by_class(self.course_teachers[course], self.teacher_class)
+                                       for course in self.courses}
 
     def courses_sorted(self):
         """
@@ -44,46 +77,112 @@ class Info:
                 teachers.append(teacher)
         return teachers
     
-    def teacher_constr(self, teacher, interval, day):
+    def forbidden_slots(self):
+        """
+        Extrage, pentru fiecare profesor, zilele si intervalele in care nu doreste sa predea (constrangerile cu '!'),
+        cu aceeasi semantica precum verificarea constrangerilor (check_constraints.get_forbidden_slots).
+
+        Returns:
+            dict: Dictionar profesor -> (set de zile, set de intervale).
+        """
+        return get_forbidden_slots({PROFESORI: self.teachers, ZILE: self.days})
+
+    def independent_components(self):
+        """
+        Imparte instanta in componentele conexe ale grafului de compatibilitate, in care fiecare materie este legata
+        de profesorii care o predau si de salile in care se poate preda. Doua componente diferite nu au niciun
+        profesor si nicio sala in comun, deci pot fi rezolvate separat.
+
+        Returns:
+            list: Componentele, ca tupluri (sali, profesori, materii); salile si profesorii fara nicio materie
+                din instanta nu apar in nicio componenta.
+        """
+        course_rooms = {course: [room for room in self.classrooms if course in self.room_courses[room]]
+                        for course in self.courses}
+        components = []
+        seen = set()
+        for start in self.courses:
+            if start in seen:
+                continue
+            rooms, teachers, courses = set(), set(), []
+            seen.add(start)
+            stack = [start]
+            while stack:
+                course = stack.pop()
+                courses.append(course)
+                neighbors = set()
+                for teacher in self.course_teachers[course]:
+                    if teacher not in teachers:
+                        teachers.add(teacher)
+                        neighbors |= self.teacher_courses[teacher]
+                for room in course_rooms[course]:
+                    if room not in rooms:
+                        rooms.add(room)
+                        neighbors |= self.room_courses[room]
+                for other in neighbors:
+                    if other in self.courses and other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            components.append(([room for room in self.classrooms if room in rooms],
+                               [teacher for teacher in self.teachers if teacher in teachers],
+                               [course for course in self.courses if course in courses]))
+        return components
+
+    def symmetry_classes(self, items, key):
+        """
+        Imparte elementele in clase de simetrie dupa cheia data.
+
+        Args:
+            items (iterable): Salile sau profesorii.
+            key (callable): Functia care da caracteristicile unui element; elementele cu aceeasi cheie sunt
+                interschimbabile.
+
+        Returns:
+            dict: Element -> reprezentantul clasei lui (primul element cu aceeasi cheie).
+        """
+        representatives = {}
+        return {item: representatives.setdefault(key(item), item) for item in items}
+
+    def group_by_class(self, items, classes):
+        """
+        Grupeaza elementele date dupa clasa lor de simetrie, pastrand ordinea.
+
+        Returns:
+            list: Listele de elemente din aceeasi clasa.
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(classes[item], []).append(item)
+        return list(groups.values())
+
+    def teacher_constr(self, teacher, day, interval):
         """
         Verifica daca un profesor are constrangeri legate de zi si interval.
 
         Args:
             teacher (str): Numele profesorului.
-            interval (str): Intervalul orar.
             day (str): Ziua saptamanii.
+            interval (tuple): Intervalul orar.
 
         Returns:
-            int: Punctajul obtinut in urma verificarii constrangerilor.
+            int: Numarul de constrangeri optionale incalcate daca profesorul preda in ziua si intervalul date.
         """
-        points = 0
+        days, intervals = self.forbidden[teacher]
+        return (day in days) + (interval in intervals)
 
-        # Constrangerea: Un profesor poate tine o singura materie intr-un interval orar intr-o sala.
-        # Verific daca intervalul si sala sunt disponibile pentru profesor
-        if self.timetable[day][interval] is None:
-            if self.teachers[teacher]['Constrangeri']['Interaval'] is None or interval in self.teachers[teacher]['Constrangeri']['Interval']:
-                if self.teachers[teacher]['Constrangeri']['Sala'] is None or self.teachers[teacher]['Constrangeri']['Sala'] in self.info.classrooms:
-                    points += 1
-
-        # Constrangerea: Un profesor poate tine ore in maxim 7 intervale pe saptamana.
-        # Verific daca profesorul a depasit numarul maxim de ore pe saptamana
-        if self.teacher_counts[teacher] < 7:
-            points += 1
-
-        # Constrangerea: Toti profesorii predau doar materiile pe care sunt specializati.
-        # Verific daca materia este in lista materiilor predate de profesor
-        if self.teachers[teacher]['Materii'] is None or self.teachers[teacher]['Materii'] in self.info.teachers[teacher]:
-            points += 1
-
-        # Prefera anumite zile sau nu doresc sa predea intr-o zi anume.
-        if day in self.teachers[teacher]['Constrangeri']['Zi']:
-            points += 1
-        # Prefera sau nu doresc anumite intervale orare, in oricare dintre zile
-        if interval in self.teachers[teacher]['Constrangeri']['Interval']:
-            points += 1
+    def lesson_constr(self, room, teacher, course):
+        """
+        Verifica constrangerile obligatorii care depind doar de ora si de sala in care este plasata.
 
-        return points
+        Args:
+            room (str): Sala de clasa.
+            teacher (str): Profesorul care preda materia.
+            course (str): Materia predata.
 
+        Returns:
+            int: Numarul de constrangeri incalcate (materia nu se preda in sala, profesorul nu preda materia).
+        """
+        return (course not in self.room_courses[room]) + (course not in self.teacher_courses[teacher])
 
 
 class State:
@@ -101,18 +200,20 @@ class State:
         self.timetable = timetable
         self.seed = seed
         self.teacher_counts, self.courses_counts = case
+        self.busy = self.busy_teachers()
         self.nr_conflicts = self.conflicts()
-        self.nr_soft_conflicts = 0
-        self.nr_hard_conflicts = 0
+        self.nr_uncovered = self.uncovered_courses()
+        self.nr_soft_conflicts = self.soft_conflicts()
+        self.nr_hard_conflicts = self.hard_conflicts()
         
     def copy(self):
         """
-        Creeaza o copie a starii actuale.
+        Creeaza o copie a starii actuale. Obiectul Info este doar citit, asa ca este partajat intre copii.
 
         Returns:
             State: Copia starii actuale.
         """
-        return deepcopy(self)
+        return deepcopy(self, {id(self.info): self.info})
         
     def conflicts(self):
         """
@@ -126,7 +227,192 @@ class State:
             if self.courses_counts[course] < self.info.courses[course]:
                 points += self.info.courses[course] - self.courses_counts[course]
         return points
+
+    def uncovered_courses(self):
+        """
+        Calculeaza numarul materiilor care nu au acoperirea necesara; fiecare este o constrangere obligatorie
+        incalcata, ca in check_mandatory_constraints.
+
+        Returns:
+            int: Numarul materiilor neacoperite.
+        """
+        return sum(self.courses_counts[course] < self.info.courses[course] for course in self.courses_counts)
+
+    def soft_conflicts(self):
+        """
+        Calculeaza numarul de constrangeri optionale incalcate de orele din orar.
+
+        Returns:
+            int: Numarul de constrangeri optionale incalcate.
+        """
+        points = 0
+        for day in self.timetable:
+            for interval in self.timetable[day]:
+                for lesson in self.timetable[day][interval].values():
+                    if lesson:
+                        points += self.info.teacher_constr(lesson[0], day, interval)
+        return points
+
+    def busy_teachers(self):
+        """
+        Numara, pentru fiecare zi si interval, cate ore are fiecare profesor.
+
+        Returns:
+            dict: Dictionar zi -> interval -> profesor -> numarul de ore din interval.
+        """
+        busy = {}
+        for day in self.timetable:
+            busy[day] = {}
+            for interval in self.timetable[day]:
+                busy[day][interval] = counts = {}
+                for lesson in self.timetable[day][interval].values():
+                    if lesson:
+                        counts[lesson[0]] = counts.get(lesson[0], 0) + 1
+        return busy
+
+    def hard_conflicts(self):
+        """
+        Calculeaza numarul de constrangeri obligatorii incalcate de orele din orar, fara conditia de acoperire
+        (aceasta este masurata separat de conflicts()). Depasirea limitei de sloturi a unui profesor se numara pe fiecare slot in plus,
+        iar un profesor cu n ore in acelasi interval incalca n - 1 constrangeri.
+
+        Returns:
+            int: Numarul de constrangeri obligatorii incalcate.
+        """
+        points = 0
+        for day in self.timetable:
+            for interval in self.timetable[day]:
+                for room, lesson in self.timetable[day][interval].items():
+                    if lesson:
+                        points += self.info.lesson_constr(room, *lesson)
+                points += sum(count - 1 for count in self.busy[day][interval].values() if count > 1)
+        return points + sum(max(0, count - self.info.teacher_slots[teacher])
+                            for teacher, count in self.teacher_counts.items())
+
+    def get_conflicts(self):
+        """
+        Costul starii: constrangerile obligatorii incalcate de ore (LESSON_PENALTY) si materiile neacoperite
+        (HARD_PENALTY), apoi studentii neacoperiti (ca ghidaj catre acoperire) si constrangerile optionale incalcate.
+        Cat timp preferintele incalcate sunt mai putine decat HARD_PENALTY, orice orar valid costa mai putin decat
+        orice orar invalid.
+
+        Returns:
+            int: Costul starii curente.
+        """
+        return LESSON_PENALTY * self.nr_hard_conflicts + HARD_PENALTY * self.nr_uncovered + self.nr_conflicts + \
+            self.nr_soft_conflicts
+
+    def is_terminal(self):
+        """
+        Verifica daca toate materiile sunt acoperite.
+
+        Returns:
+            bool: True daca starea este terminala, False in caz contrar.
+        """
+        return self.nr_conflicts == 0
+
+    def is_valid(self):
+        """
+        Verifica daca nicio constrangere obligatorie nu este incalcata: toate materiile sunt acoperite,
+        iar orele respecta salile, specializarile si disponibilitatea profesorilor.
+
+        Returns:
+            bool: True daca orarul este valid, False in caz contrar.
+        """
+        return self.nr_conflicts == 0 and self.nr_hard_conflicts == 0
     
+    def add_lesson(self, day, interval, room, teacher, course):
+        """
+        Plaseaza o ora intr-un slot liber, actualizand incremental contoarele si toate componentele costului.
+
+        Args:
+            day (str): Ziua saptamanii.
+            interval (tuple): Intervalul orar.
+            room (str): Sala de clasa.
+            teacher (str): Profesorul care preda materia.
+            course (str): Materia de predat.
+        """
+        info = self.info
+        self.timetable[day][interval][room] = (teacher, course)
+
+        hard = info.lesson_constr(room, teacher, course)
+        busy = self.busy[day][interval]
+        count = busy.get(teacher, 0)
+        busy[teacher] = count + 1
+        if count:
+            hard += 1
+        self.teacher_counts[teacher] += 1
+        if self.teacher_counts[teacher] > info.teacher_slots[teacher]:
+            hard += 1
+        self.nr_hard_conflicts += hard
+
+        target, covered = info.courses[course], self.courses_counts[course]
+        self.courses_counts[course] = covered + info.classrooms[room]['Capacitate']
+        self.nr_conflicts += max(0, target - self.courses_counts[course]) - max(0, target - covered)
+        self.nr_uncovered += (self.courses_counts[course] < target) - (covered < target)
+        self.nr_soft_conflicts += info.teacher_constr(teacher, day, interval)
+
+    def remove_lesson(self, day, interval, room):
+        """
+        Elibereaza un slot ocupat, actualizand incremental contoarele si toate componentele costului.
+
+        Args:
+            day (str): Ziua saptamanii.
+            interval (tuple): Intervalul orar.
+            room (str): Sala de clasa.
+
+        Returns:
+            tuple: Ora scoasa (profesor, materie).
+        """
+        info = self.info
+        lesson = teacher, course = self.timetable[day][interval][room]
+        self.timetable[day][interval][room] = None
+
+        hard = info.lesson_constr(room, teacher, course)
+        busy = self.busy[day][interval]
+        busy[teacher] -= 1
+        if busy[teacher]:
+            hard += 1
+        else:
+            del busy[teacher]
+        if self.teacher_counts[teacher] > info.teacher_slots[teacher]:
+            hard += 1
+        self.teacher_counts[teacher] -= 1
+        self.nr_hard_conflicts -= hard
+
+        target, covered = info.courses[course], self.courses_counts[course]
+        self.courses_counts[course] = covered - info.classrooms[room]['Capacitate']
+        self.nr_conflicts += max(0, target - self.courses_counts[course]) - max(0, target - covered)
+        self.nr_uncovered += (self.courses_counts[course] < target) - (covered < target)
+        self.nr_soft_conflicts -= info.teacher_constr(teacher, day, interval)
+        return lesson
+
+    def do_move(self, day, interval, room, teacher, course):
+        """
+        Aplica o mutare direct in starea curenta (fara copiere). Intervalul trebuie sa fie liber.
+
+        Args:
+            day (str): Ziua saptamanii.
+            interval (tuple): Intervalul orar.
+            room (str): Sala de clasa.
+            teacher (str): Profesorul care preda materia.
+            course (str): Materia de predat.
+        """
+        self.add_lesson(day, interval, room, teacher, course)
+
+    def undo_move(self, day, interval, room, teacher, course):
+        """
+        Anuleaza o mutare aplicata anterior cu do_move.
+
+        Args:
+            day (str): Ziua saptamanii.
+            interval (tuple): Intervalul orar.
+            room (str): Sala de clasa.
+            teacher (str): Profesorul care preda materia.
+            course (str): Materia de predat.
+        """
+        self.remove_lesson(day, interval, room)
+
     def apply_move(self, day, interval, room, teacher, course):
         """
         Aplica o mutare in starea curenta.
@@ -141,45 +427,89 @@ class State:
         Returns:
             State: Starea rezultata dupa aplicarea mutarii.
         """
-        new_state = deepcopy(self)
-        new_state.timetable[day][interval][room] = (teacher, course)
-        new_state.teacher_counts[teacher] += 1
-        new_state.courses_counts[course] += self.info.classrooms[room]['Capacitate']
-        new_state.nr_conflicts = new_state.conflicts()
-        new_state.nr_soft_conflicts += new_state.info.teacher_constr(teacher, day, interval, room, course)
-        new_state.nr_hard_conflicts += self.check_hard_constraints(day, interval, room, teacher, course)
+        new_state = self.copy()
+        new_state.do_move(day, interval, room, teacher, course)
         return new_state
-    
-    def get_next_state(self):
+
+    def cleared(self):
         """
-        Genereaza toate starile vecine posibile prin completarea unui interval cu o materie neacoperita.
+        Creeaza o stare cu aceleasi informatii si acelasi orar, dar cu toate intervalele libere.
 
         Returns:
-            list: Lista de stari vecine posibile.
+            State: Starea cu orarul gol.
+        """
+        timetable = {day: {interval: {room: None for room in self.timetable[day][interval]}
+                           for interval in self.timetable[day]} for day in self.timetable}
+        return State(self.info, timetable, ({teacher: 0 for teacher in self.teacher_counts},
+                                            {course: 0 for course in self.courses_counts}), self.seed)
+
+    def generate_moves(self):
+        """
+        Genereaza toate mutarile valide care completeaza un interval liber cu o materie neacoperita.
+
+        Returns:
+            list: Lista de mutari (zi, interval, sala, profesor, materie).
         """
         uncovered_courses = [course for course, students in self.info.sorted_courses.items() if self.courses_counts[course] < students]
 
         random.shuffle(uncovered_courses)
 
-        next_states = []
+        moves = []
 
         for uncovered_course in uncovered_courses:
-            teachers = self.info.teacher_has_course(uncovered_course)
+            teacher_classes = self.info.course_teacher_classes[uncovered_course]
             # Iterez prin fiecare zi - interval - sala
             for day in self.timetable:
                 for interval in self.timetable[day]:
+                    # Profesorii care pot preda materia in intervalul respectiv, cate unul din fiecare clasa de simetrie
+                    teachers = self.canonical_teachers(teacher_classes, self.busy[day][interval])
+                    room_classes = set()
                     for room in self.timetable[day][interval]:
-                        # Daca intervalul este liber
-                        if self.timetable[day][interval][room] is None:
-                            # Iterez prin fiecare profesor si verific daca poate preda materia in intervalul respectiv
+                        # Daca intervalul este liber si materia se poate preda in sala
+                        if self.timetable[day][interval][room] is None and uncovered_course in self.info.room_courses[room]:
+                            # Salile libere din aceeasi clasa de simetrie dau stari echivalente, deci se incearca doar prima
+                            if self.info.room_class[room] in room_classes:
+                                continue
+                            room_classes.add(self.info.room_class[room])
                             for teacher in teachers:
-                                # Verific daca profesorul nu are alte cursuri in acelasi interval
-                                if self.teacher_counts[teacher] < 7:
-                                    # Verific constrangerile pentru acest move
-                                    if self.info.teacher_constr(teacher, day, interval):
-                                        next_states.append(self.apply_move(day, interval, room, teacher, uncovered_course))
+                                moves.append((day, interval, room, teacher, uncovered_course))
 
-        return next_states
+        return moves
+
+    def canonical_teachers(self, teacher_classes, busy):
+        """
+        Alege cate un reprezentant din fiecare clasa de simetrie de profesori: dintre cei care nu au alte cursuri
+        in interval si nu au atins limita de ore, pe cel cu cele mai putine ore (primul, la egalitate).
+
+        Args:
+            teacher_classes (list): Clasele de simetrie ale profesorilor unei materii.
+            busy (dict): Profesorii ocupati in interval.
+
+        Returns:
+            list: Reprezentantii claselor care au cel putin un profesor disponibil.
+        """
+        teachers = []
+        for members in teacher_classes:
+            free = [teacher for teacher in members
+                    if teacher not in busy and self.teacher_counts[teacher] < self.info.teacher_slots[teacher]]
+            if free:
+                teachers.append(min(free, key=self.teacher_counts.__getitem__))
+        return teachers
+    
+    def get_next_state(self):
+        """
+        Genereaza toate starile vecine posibile prin completarea unui interval cu o materie neacoperita.
+
+        Returns:
+            list: Lista de stari vecine posibile.
+        """
+        return [self.apply_move(*move) for move in self.generate_moves()]
+
+    def generate_next_states(self):
+        """
+        Numele folosit de Monte Carlo Tree Search pentru get_next_state.
+        """
+        return self.get_next_state()
 
 class NoSolutionState:
     """
@@ -187,45 +517,196 @@ class NoSolutionState:
     """
     pass
 
-import argparse
+
+def instance_specs(state):
+    """
+    Specificatiile instantei starii date, in forma citita din fisierul YAML.
+    """
+    info = state.info
+    days = list(state.timetable)
+    return {ZILE: days, INTERVALE: [str(interval) for interval in state.timetable[days[0]]],
+            SALI: info.classrooms, PROFESORI: info.teachers, MATERII: info.courses}
+
+
+def build_initial_state(timetable_specs):
+    """
+    Construieste starea initiala a problemei pornind de la specificatiile citite din fisierul YAML.
+
+    Args:
+        timetable_specs (dict): Continutul fisierului de intrare.
+
+    Returns:
+        State: Starea initiala.
+    """
+    timetable = create_timetable(timetable_specs)
+    info = Info((timetable_specs[SALI], timetable_specs[PROFESORI], timetable_specs[MATERII]), timetable_specs[ZILE])
+
+    return state_from_timetable(info, timetable)
+
+
+def state_from_timetable(info, timetable, seed=42):
+    """
+    Construieste starea corespunzatoare unui orar dat, numarand orele deja plasate in el.
+
+    Args:
+        info (Info): Informatiile despre sali, profesori si materii.
+        timetable (dict): Orarul (zile -> intervale -> sali -> (profesor, materie) sau None).
+        seed (int, optional): Valoarea pentru initializarea generatorului de numere aleatoare.
+
+    Returns:
+        State: Starea corespunzatoare orarului.
+    """
+    teacher_counts = {teacher: 0 for teacher in info.teachers}
+    courses_counts = {course: 0 for course in info.courses}
+    for day in timetable:
+        for interval in timetable[day]:
+            for room, lesson in timetable[day][interval].items():
+                if lesson:
+                    teacher_counts[lesson[0]] += 1
+                    courses_counts[lesson[1]] += info.classrooms[room]['Capacitate']
+
+    return State(info, timetable, (teacher_counts, courses_counts), seed)
+
+
+def algorithm_steps(algorithm, initial_state, workers=None, options=None):
+    """
+    Returneaza generatorul de evenimente (ProgressEvent) al algoritmului ales.
+
+    Args:
+        algorithm (str): Numele algoritmului din registry (registry.available()).
+        initial_state (State): Starea initiala.
+        workers (int, optional): Numarul de procese pe care le poate folosi algoritmul. Se transmite doar
+            algoritmilor care au un parametru workers; implicit, fiecare algoritm isi alege singur numarul.
+        options (dict, optional): Parametrii proprii algoritmului (de exemplu {'islands': 4} pentru ga).
+
+    Returns:
+        generator: Generatorul care ruleaza cautarea pas cu pas.
+    """
+    # Modulul algoritmului se importa abia acum, prin registry
+    solver = load_solver(algorithm)
+    options = dict(options or {})
+    if workers is not None and 'workers' in inspect.signature(solver).parameters:
+        options['workers'] = workers
+    return solver(initial_state, **options)
+
+
+def solver_steps(algorithm, initial_state, decompose=False, trajectory=None, workers=None, options=None):
+    """
+    Generatorul de evenimente al algoritmului ales, rulat pe intreaga instanta sau pe componentele ei independente,
+    optional cu jurnalul traiectoriei scris in fisierul dat.
+    """
+    if decompose:
+        from decompose import decomposed_steps
+        events = decomposed_steps(initial_state, algorithm, workers, options)
+    else:
+        events = algorithm_steps(algorithm, initial_state, workers, options)
+    if trajectory:
+        from trajectory import record_trajectory
+        events = record_trajectory(events, trajectory)
+    return events
+
+
+def run_algorithm(algorithm, initial_state, callback=None, target_cost=None, stall=None, time_limit=None,
+                  decompose=False, trajectory=None, workers=None, options=None):
+    """
+    Ruleaza algoritmul ales pe starea initiala, pana la terminare sau pana la indeplinirea unei conditii de oprire.
+
+    Args:
+        algorithm (str): Numele algoritmului din registry (registry.available()).
+        initial_state (State): Starea initiala.
+        callback (callable, optional): Functie apelata cu fiecare ProgressEvent; daca intoarce True, cautarea se opreste.
+        target_cost (int, optional): Costul la care cautarea se opreste.
+        stall (int, optional): Numarul de iteratii fara imbunatatire dupa care cautarea se opreste.
+        time_limit (float, optional): Bugetul de timp, in secunde.
+        decompose (bool, optional): Daca True, componentele independente ale instantei se rezolva separat, in paralel.
+        trajectory (str, optional): Fisierul in care se scrie jurnalul binar al traiectoriei (vezi trajectory.py).
+        workers (int, optional): Numarul de procese pe care le poate folosi cautarea (vezi algorithm_steps).
+        options (dict, optional): Parametrii proprii algoritmului (vezi algorithm_steps).
+
+    Returns:
+        State: Cea mai buna stare gasita.
+        int: Numarul de iteratii efectuate.
+        int: Numarul de stari generate.
+    """
+    # Nicio stare valida nu poate avea un cost sub marginea inferioara a instantei, asa ca acolo cautarea se opreste
+    from bounds import instance_bounds
+    bound = instance_bounds(initial_state).lower_bound()
+    target_cost = bound if target_cost is None else max(target_cost, bound)
+
+    events = until(solver_steps(algorithm, initial_state, decompose, trajectory, workers, options), target_cost,
+                   stall, time_limit, callback, require_valid=target_cost == bound)
+    event = last(events)
+    return event.best_state, event.iteration, event.evaluations
+
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Generate a timetable using Hill Climbing or Monte Carlo Tree Search algorithm.')
-    parser.add_argument('algorithm', type=str, choices=['hc', 'mtcs'], help='Algorithm to use: "hc" for Hill Climbing, "mtcs" for Monte Carlo Tree Search')
+    parser = argparse.ArgumentParser(description='Generate a timetable using Hill Climbing, Monte Carlo Tree Search, Large Neighborhood Search or any registered solver.')
+    parser.add_argument('algorithm', type=str, help='Algorithm to use: "hc" for Hill Climbing, "mtcs" for Monte Carlo Tree Search, "lns" for Large Neighborhood Search, "portfolio" to race all of them in parallel, or a solver registered through the "orar.solvers" entry points')
     parser.add_argument('input_file', type=str, help='Input YAML file containing timetable specifications')
     parser.add_argument('output_file', nargs='?', default=None, type=str, help='Output text file to save the final timetable')
+    parser.add_argument('--target-cost', type=int, default=None, help='Stop as soon as a timetable with at most this cost is found')
+    parser.add_argument('--stall', type=int, default=None, help='Stop after this many iterations without improvement')
+    parser.add_argument('--time-limit', type=float, default=None, help='Time budget in seconds')
+    parser.add_argument('--decompose', action='store_true', help='Solve independent teacher-course-room components in parallel')
+    parser.add_argument('--warm-start', action='store_true', help='Start from the best stored timetable of this or the most similar instance and store improved timetables')
+    parser.add_argument('--store', type=str, default='.orar_store', help='Directory of the solution store used by --warm-start')
+    parser.add_argument('--islands', type=int, default=None, help='Number of islands of the "ga" solver, each evolving in its own process')
+    parser.add_argument('--trajectory', type=str, default=None, help='Write a binary log of the search trajectory to this file (replay it with trajectory.py)')
     args = parser.parse_args()
+    # Numele algoritmului se verifica dupa parsare: entry points se citesc doar pentru un algoritm care nu este inclus
+    if not solver_exists(args.algorithm):
+        parser.error(f"argument algorithm: invalid choice: '{args.algorithm}' (choose from {', '.join(map(repr, available_solvers()))})")
 
     algorithm = args.algorithm
     input_file = args.input_file
     output_file = args.output_file
 
-    timetable_specs = read_yaml_file(input_file)
-    timetable = create_timetable(timetable_specs)
-    info = Info((timetable_specs[SALI], timetable_specs[PROFESORI], timetable_specs[MATERII]))
+    options = {}
+    if args.islands is not None:
+        if algorithm != 'ga' or args.islands < 1:
+            parser.error('--islands needs the "ga" algorithm and at least one island')
+        options['islands'] = args.islands
 
-    teacher_counts = {teacher: 0 for teacher in info.teachers}
-    courses_counts = {course: 0 for course in info.courses}
-
-    initial_state = State(info, timetable, (teacher_counts, courses_counts))
-
-    if algorithm == 'hc':
-        final_state, iters, states = hill_climbing(initial_state)
-    elif algorithm == 'mtcs':
-        final_state = monte_carlo_tree_search(initial_state, num_simulations=1000)
+    timetable_specs = read_yaml_file(input_file)
+    initial_state = build_initial_state(timetable_specs)
+
+    from bounds import instance_bounds
+    bounds = instance_bounds(initial_state)
+    if not bounds.feasible():
+        print("Instanta nu are nicio solutie care sa respecte constrangerile obligatorii:", file=sys.stderr)
+        for reason in bounds.reasons:
+            print(f"  - {reason}", file=sys.stderr)
+        sys.exit(1)
+
+    store = None
+    if args.warm_start:
+        from store import SolutionStore
+        store = SolutionStore(args.store)
+        timetable = store.warm_start(timetable_specs)
+        if timetable is not None:
+            initial_state = state_from_timetable(initial_state.info, timetable)
+
+    target_cost = bounds.lower_bound() if args.target_cost is None else max(args.target_cost, bounds.lower_bound())
+    events = solver_steps(algorithm, initial_state, args.decompose, args.trajectory, options=options)
+    event = last(until(events, target_cost, args.stall, args.time_limit,
+                       require_valid=target_cost == bounds.lower_bound()))
+    final_state, iters, states = event.best_state, event.iteration, event.evaluations
 
     if isinstance(final_state, NoSolutionState):
         print("Nu s-a găsit o soluție adecvată.")
     else:
-        final_timetable_str = pretty_print_timetable(final_state.timetable, input_file)
-        print(final_timetable_str)
+        write_timetable(final_state.timetable, timetable_specs, sys.stdout)
 
         if output_file:
             output_path = f"outputs/{output_file}"
             with open(output_path, 'w') as f:
-                f.write(final_timetable_str)
-            
-            with open(output_path, 'a') as f:
+                write_timetable(final_state.timetable, timetable_specs, f)
                 f.write(f"\n\nFinal state: {final_state}")
                 f.write(f"\nNumber of iterations: {iters}")
                 f.write(f"\nNumber of states generated: {states}")
+                f.write(f"\nSolver: {event.solver}")
+
+        print(f"Solver: {event.solver}, cost: {event.best_cost}", file=sys.stderr)
+
+        if store is not None:
+            store.save(timetable_specs, final_state)
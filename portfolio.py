@@ -0,0 +1,168 @@
+import multiprocessing
+import queue
+import time
+
+from bounds import instance_bounds
+from orar import algorithm_steps, state_from_timetable
+from progress import ProgressEvent, until, last
+from registry import available
+
+
+HEARTBEAT = 0.5  # Secunde intre doua evenimente emise cand niciun algoritm nu gaseste o solutie mai buna
+JOIN_TIMEOUT = 5  # Secunde acordate unui algoritm oprit pentru a-si termina iteratia curenta
+
+
+def race(algorithm, initial_state, best, bound, stop, messages, workers=None):
+    """
+    Ruleaza un algoritm din portofoliu intr-un proces separat.
+
+    Cea mai buna solutie gasita de oricare algoritm (daca este valida si costul ei) este tinuta in memorie partajata;
+    un algoritm trimite orarul sau procesului principal doar cand o depaseste. Un orar valid castiga in fata oricarui
+    orar invalid, iar un orar valid cu costul egal cu marginea inferioara a instantei ii opreste pe toti.
+
+    Args:
+        algorithm (str): Numele algoritmului.
+        initial_state (State): Starea initiala.
+        best (Array): (1 daca cea mai buna solutie cunoscuta este valida, costul ei), partajat intre procese.
+        bound (int): Marginea inferioara a costului unui orar valid (bounds.InstanceBounds.lower_bound).
+        stop (Event): Evenimentul care opreste toti algoritmii.
+        messages (Queue): Coada prin care se trimit imbunatatirile si terminarea.
+        workers (int, optional): Numarul de procese pe care le poate folosi algoritmul.
+    """
+    evaluations = 0
+
+    def report(event):
+        nonlocal evaluations
+        evaluations = event.evaluations
+        if event.improved:
+            valid = event.best_state.is_valid()
+            with best.get_lock():
+                better = (valid, -event.best_cost) > (bool(best[0]), -best[1])
+                if better:
+                    best[0], best[1] = valid, event.best_cost
+            if better:
+                messages.put(('improved', algorithm, event.best_cost, event.evaluations, event.best_state.timetable,
+                              valid))
+            if valid and event.best_cost <= bound:
+                stop.set()
+        return stop.is_set()
+
+    try:
+        last(until(algorithm_steps(algorithm, initial_state, workers), callback=report))
+    finally:
+        messages.put(('done', algorithm, None, evaluations, None, False))
+
+
+def interleaved_steps(initial_state, algorithms, bound):
+    """
+    Portofoliul intr-un singur proces: algoritmii avanseaza pe rand, cate un eveniment fiecare, pana cand unul
+    gaseste un orar valid cu costul egal cu marginea inferioara data sau pana se opresc toti singuri.
+    """
+    start = time.time()
+    runs = {algorithm: algorithm_steps(algorithm, initial_state, 1) for algorithm in algorithms}
+    solver, best_state, cost = 'portfolio', initial_state, initial_state.get_conflicts()
+    best_valid = initial_state.is_valid()
+    evaluations = {algorithm: 0 for algorithm in algorithms}
+    iteration = 0
+
+    yield ProgressEvent(solver, iteration, 0, cost, cost, time.time() - start, best_state, False)
+
+    try:
+        while runs:
+            for algorithm, events in list(runs.items()):
+                event = next(events, None)
+                if event is None:
+                    del runs[algorithm]
+                    continue
+
+                evaluations[algorithm] = event.evaluations
+                valid = event.best_state.is_valid()
+                improved = (valid, -event.best_cost) > (best_valid, -cost)
+                if improved:
+                    # Starea unui algoritm se poate modifica pe loc la iteratiile lui urmatoare
+                    solver, cost, best_valid = algorithm, event.best_cost, valid
+                    best_state = event.best_state.copy()
+
+                iteration += 1
+                yield ProgressEvent(solver, iteration, sum(evaluations.values()), cost, cost, time.time() - start,
+                                    best_state, improved)
+                if best_valid and cost <= bound:
+                    return
+    finally:
+        for events in runs.values():
+            events.close()
+
+
+def portfolio_steps(initial_state, algorithms=None, workers=None):
+    """
+    Ruleaza simultan mai multi algoritmi, fiecare in procesul lui, si emite un eveniment la fiecare imbunatatire
+    a celei mai bune solutii comune (cu numele algoritmului care a gasit-o) si periodic, cat timp nu apare niciuna.
+
+    Cursa se termina cand un algoritm gaseste un orar valid cu costul egal cu marginea inferioara a instantei
+    (bounds.py), cand toti algoritmii se opresc singuri sau cand consumatorul inchide generatorul (de exemplu la
+    expirarea bugetului de timp); in toate cazurile algoritmii ramasi sunt opriti. Pana atunci, un orar valid
+    castiga in fata oricarui orar invalid, iar intre doua orare la fel de valide castiga cel mai ieftin.
+
+    Args:
+        initial_state (State): Starea initiala, comuna tuturor algoritmilor.
+        algorithms (list, optional): Numele algoritmilor din portofoliu. Implicit, toti algoritmii din registry.
+        workers (int, optional): Numarul total de procese, impartit intre algoritmi. Cu 1 worker, algoritmii
+            ruleaza pe rand in procesul curent (interleaved_steps). Implicit, fiecare algoritm are procesul lui
+            si isi alege singur cate procese mai foloseste.
+
+    Yields:
+        ProgressEvent: Progresul cursei; campul solver indica algoritmul care a produs cea mai buna stare.
+    """
+    algorithms = algorithms or [name for name in available() if name != 'portfolio']
+    bound = instance_bounds(initial_state).lower_bound()
+    if workers == 1:
+        yield from interleaved_steps(initial_state, algorithms, bound)
+        return
+
+    budget = None if workers is None else max(1, workers // len(algorithms))
+    start = time.time()
+    best = multiprocessing.Array('q', [initial_state.is_valid(), initial_state.get_conflicts()])
+    stop = multiprocessing.Event()
+    messages = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=race, name=f'portfolio-{algorithm}',
+                                         args=(algorithm, initial_state, best, bound, stop, messages, budget))
+                 for algorithm in algorithms]
+    for process in processes:
+        process.start()
+
+    solver, best_state, cost = 'portfolio', initial_state, initial_state.get_conflicts()
+    best_valid = initial_state.is_valid()
+    evaluations = {algorithm: 0 for algorithm in algorithms}
+    iteration, running = 0, len(processes)
+
+    yield ProgressEvent(solver, iteration, 0, cost, cost, time.time() - start, best_state, False)
+
+    try:
+        while running:
+            try:
+                kind, algorithm, new_cost, count, timetable, valid = messages.get(timeout=HEARTBEAT)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                kind = 'heartbeat'
+
+            improved = False
+            if kind == 'done':
+                running -= 1
+                evaluations[algorithm] = count
+                continue
+            elif kind == 'improved' and (valid, -new_cost) > (best_valid, -cost):
+                # Un orar valid castiga in fata oricarui orar invalid, chiar daca acesta costa mai putin
+                solver, cost, best_valid, improved = algorithm, new_cost, valid, True
+                evaluations[algorithm] = count
+                best_state = state_from_timetable(initial_state.info, timetable, initial_state.seed)
+
+            iteration += 1
+            yield ProgressEvent(solver, iteration, sum(evaluations.values()), cost, cost, time.time() - start,
+                                best_state, improved)
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,99 @@
+class ProgressEvent:
+    __slots__ = ('solver', 'iteration', 'evaluations', 'cost', 'best_cost', 'elapsed', 'best_state', 'improved')
+
+    def __init__(self, solver, iteration, evaluations, cost, best_cost, elapsed, best_state, improved):
+        """
+        Eveniment emis de un algoritm de cautare dupa fiecare iteratie.
+
+        Args:
+            solver (str): Numele algoritmului.
+            iteration (int): Numarul iteratiei.
+            evaluations (int): Numarul total de stari evaluate pana acum.
+            cost (int): Costul starii curente.
+            best_cost (int): Costul celei mai bune stari gasite pana acum.
+            elapsed (float): Secunde trecute de la pornirea cautarii.
+            best_state (State): Referinta (nu o copie) la cea mai buna stare gasita pana acum.
+            improved (bool): True daca in aceasta iteratie s-a gasit o stare mai buna.
+        """
+        self.solver = solver
+        self.iteration = iteration
+        self.evaluations = evaluations
+        self.cost = cost
+        self.best_cost = best_cost
+        self.elapsed = elapsed
+        self.best_state = best_state
+        self.improved = improved
+
+    def as_dict(self):
+        """
+        Returneaza evenimentul fara referinta la stare, de exemplu pentru a fi trimis ca JSON.
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'best_state'}
+
+
+def until(events, target_cost=None, stall=None, time_limit=None, callback=None, require_valid=False):
+    """
+    Transmite mai departe evenimentele unui algoritm si il opreste la indeplinirea unei conditii.
+    Generatorul algoritmului este inchis, asa ca nu se mai face nicio iteratie dupa oprire.
+
+    Args:
+        events (generator): Generatorul de evenimente al algoritmului.
+        target_cost (int, optional): Costul considerat suficient de bun.
+        stall (int, optional): Numarul de iteratii consecutive fara imbunatatire dupa care se renunta.
+        time_limit (float, optional): Bugetul de timp, in secunde.
+        callback (callable, optional): Functie apelata cu fiecare eveniment; daca intoarce True, cautarea se opreste.
+        require_valid (bool, optional): Daca True, costul tinta opreste cautarea doar cand cea mai buna stare
+            este si valida (de exemplu cand tinta este marginea inferioara a instantei).
+
+    Yields:
+        ProgressEvent: Evenimentele algoritmului, pana la cel care a declansat oprirea (inclusiv).
+    """
+    last_improvement = 0
+    try:
+        for event in events:
+            yield event
+
+            if event.improved:
+                last_improvement = event.iteration
+            if target_cost is not None and event.best_cost <= target_cost \
+                    and (not require_valid or event.best_state.is_valid()):
+                break
+            if stall is not None and event.iteration - last_improvement >= stall:
+                break
+            if time_limit is not None and event.elapsed >= time_limit:
+                break
+            if callback is not None and callback(event):
+                break
+    finally:
+        events.close()
+
+
+def last(events):
+    """
+    Consuma evenimentele si il returneaza pe ultimul (None daca nu a fost niciunul).
+    """
+    event = None
+    for event in events:
+        pass
+    return event
+
+
+async def stream(events):
+    """
+    Adaptor asincron: avanseaza generatorul algoritmului intr-un thread, fara a bloca bucla asyncio.
+
+    Yields:
+        ProgressEvent: Evenimentele algoritmului.
+    """
+    import asyncio  # Doar consumatorii asincroni au nevoie de asyncio
+
+    loop = asyncio.get_running_loop()
+    done = object()
+    try:
+        while True:
+            event = await loop.run_in_executor(None, next, events, done)
+            if event is done:
+                return
+            yield event
+    finally:
+        events.close()
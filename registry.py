@@ -0,0 +1,70 @@
+from importlib import import_module
+
+
+ENTRY_POINT_GROUP = 'orar.solvers'
+
+# Algoritmii inclusi: nume -> 'modul:functie'. Functia primeste starea initiala si intoarce generatorul de
+# evenimente (ProgressEvent) al cautarii; modulul se importa doar cand algoritmul este folosit.
+SOLVERS = {
+    'hc': 'hill_climbing:hill_climbing_steps',
+    'mtcs': 'monte_carlo:monte_carlo_solver',
+    'lns': 'lns:lns_steps',
+    'ga': 'ga:ga_steps',
+    'portfolio': 'portfolio:portfolio_steps',
+}
+
+_entry_points = None
+
+
+def entry_points():
+    """
+    Algoritmii adaugati de alte pachete prin grupul de entry points 'orar.solvers', de exemplu:
+
+        [project.entry-points."orar.solvers"]
+        tabu = "orar_tabu:tabu_steps"
+
+    Metadatele pachetelor instalate se citesc o singura data, la prima cerere.
+
+    Returns:
+        dict: Nume -> EntryPoint.
+    """
+    global _entry_points
+    if _entry_points is None:
+        from importlib.metadata import entry_points as installed
+        _entry_points = {entry.name: entry for entry in installed(group=ENTRY_POINT_GROUP)
+                         if entry.name not in SOLVERS}
+    return _entry_points
+
+
+def available():
+    """
+    Returns:
+        list: Numele tuturor algoritmilor: intai cei inclusi, apoi cei din entry points, in ordine alfabetica.
+    """
+    return list(SOLVERS) + sorted(entry_points())
+
+
+def exists(name):
+    """
+    Verifica daca exista un algoritm cu numele dat; entry points se citesc doar pentru numele care nu sunt
+    ale algoritmilor inclusi.
+    """
+    return name in SOLVERS or name in entry_points()
+
+
+def load(name):
+    """
+    Importa algoritmul cu numele dat.
+
+    Args:
+        name (str): Numele algoritmului.
+
+    Returns:
+        callable: Functia care primeste starea initiala si intoarce generatorul de evenimente.
+    """
+    if name in SOLVERS:
+        module, function = SOLVERS[name].split(':')
+        return getattr(import_module(module), function)
+    if name in entry_points():
+        return entry_points()[name].load()
+    raise ValueError(f'Algoritm necunoscut: {name}')
@@ -0,0 +1,196 @@
+from check_constraints import get_forbidden_slots, MATERII, PROFESORI, SALI, CAPACITATE
+
+
+MAX_SLOTURI_PROFESOR = 7
+SLOTURI = 'Sloturi'
+
+
+def teacher_slots(timetable_specs : dict) -> dict:
+    '''
+    Numărul maxim de sloturi al fiecărui profesor: limita proprie ('Sloturi'), dacă o are, altfel MAX_SLOTURI_PROFESOR.
+    '''
+    return {prof : details.get(SLOTURI, MAX_SLOTURI_PROFESOR) for prof, details in timetable_specs[PROFESORI].items()}
+
+
+def copy_timetable(timetable : dict) -> dict:
+    '''
+    Copiază structura orarului (zile -> intervale -> săli); tuplurile (profesor, materie) sunt imutabile și se partajează.
+    '''
+    return {day : {interval : dict(timetable[day][interval]) for interval in timetable[day]} for day in timetable}
+
+
+def remove_invalid_lessons(timetable : dict, timetable_specs : dict):
+    '''
+    Se scot din orar orele care încalcă direct o constrângere obligatorie:
+    materia nu se predă în sală, profesorul nu predă materia sau profesorul are deja o oră în același interval.
+
+    Returnează numărul de sloturi ocupate de fiecare profesor și acoperirea fiecărei materii după curățare.
+    '''
+
+    rooms = timetable_specs[SALI]
+    profs = timetable_specs[PROFESORI]
+    subjects = timetable_specs[MATERII]
+
+    hours = {prof : 0 for prof in profs}
+    coverage = {subject : 0 for subject in subjects}
+
+    for day in timetable:
+        for interval in timetable[day]:
+            busy = set()
+            for room in timetable[day][interval]:
+                lesson = timetable[day][interval][room]
+                if not lesson:
+                    continue
+
+                prof, subject = lesson
+                if prof not in profs or subject not in subjects or room not in rooms \
+                        or subject not in rooms[room][MATERII] or subject not in profs[prof][MATERII] or prof in busy:
+                    timetable[day][interval][room] = None
+                    continue
+
+                busy.add(prof)
+                hours[prof] += 1
+                coverage[subject] += rooms[room][CAPACITATE]
+
+    return hours, coverage
+
+
+def remove_surplus_lessons(timetable : dict, timetable_specs : dict, hours : dict, coverage : dict):
+    '''
+    Se scot orele profesorilor care depășesc limita de sloturi și orele care nu mai sunt necesare pentru acoperire.
+    Întâi se scot orele care încalcă preferințele profesorilor, apoi cele din sălile mici.
+    '''
+
+    rooms = timetable_specs[SALI]
+    target = timetable_specs[MATERII]
+    forbidden = get_forbidden_slots(timetable_specs)
+    limit = teacher_slots(timetable_specs)
+
+    lessons = []
+    for day in timetable:
+        for interval in timetable[day]:
+            for room, lesson in timetable[day][interval].items():
+                if lesson:
+                    prof = lesson[0]
+                    unwanted = day in forbidden[prof][0] or interval in forbidden[prof][1]
+                    lessons.append((not unwanted, rooms[room][CAPACITATE], day, interval, room))
+
+    lessons.sort(key=lambda x: (x[0], x[1]))
+
+    for _, capacity, day, interval, room in lessons:
+        prof, subject = timetable[day][interval][room]
+        if hours[prof] > limit[prof] or coverage[subject] - capacity >= target[subject]:
+            timetable[day][interval][room] = None
+            hours[prof] -= 1
+            coverage[subject] -= capacity
+
+
+def count_lessons(timetable : dict, timetable_specs : dict):
+    '''
+    Se numără sloturile ocupate de fiecare profesor și acoperirea fiecărei materii, fără a modifica orarul.
+    '''
+
+    rooms = timetable_specs[SALI]
+    hours = {prof : 0 for prof in timetable_specs[PROFESORI]}
+    coverage = {subject : 0 for subject in timetable_specs[MATERII]}
+
+    for day in timetable:
+        for interval in timetable[day]:
+            for room, lesson in timetable[day][interval].items():
+                if lesson:
+                    hours[lesson[0]] += 1
+                    coverage[lesson[1]] += rooms[room][CAPACITATE]
+
+    return hours, coverage
+
+
+def fill_uncovered(timetable : dict, timetable_specs : dict, hours : dict, coverage : dict, slots : list = None, rng = None):
+    '''
+    Se completează greedy sloturile libere cu materiile care nu au acoperirea necesară.
+
+    La fiecare pas se alege materia cu cea mai mare lipsă raportată la capacitatea liberă în care poate fi predată,
+    iar pentru ea plasarea care nu încalcă preferințele profesorului și care acoperă lipsa cu cea mai mică risipă.
+    Materiile pentru care nu mai există nicio plasare validă rămân neacoperite.
+
+    Dacă se dă o listă de sloturi (zi, interval, sală), se completează doar acestea. Dacă se dă un generator
+    de numere aleatoare, plasările echivalente sunt alese aleator în loc de prima găsită.
+    '''
+
+    rooms = timetable_specs[SALI]
+    profs = timetable_specs[PROFESORI]
+    target = timetable_specs[MATERII]
+    forbidden = get_forbidden_slots(timetable_specs)
+    limit = teacher_slots(timetable_specs)
+
+    if slots is None:
+        slots = [(day, interval, room) for day in timetable for interval in timetable[day] for room in timetable[day][interval]]
+    slots = list(slots)
+    if rng is not None:
+        rng.shuffle(slots)
+
+    busy = {day : {interval : {lesson[0] for lesson in timetable[day][interval].values() if lesson}
+                   for interval in timetable[day]} for day in timetable}
+    subject_profs = {subject : [prof for prof in profs if subject in profs[prof][MATERII]] for subject in target}
+    blocked = set()
+
+    while True:
+        missing = [subject for subject in target if coverage[subject] < target[subject] and subject not in blocked]
+        if not missing:
+            break
+
+        free_slots = [(day, interval, room) for day, interval, room in slots if timetable[day][interval][room] is None]
+
+        free = {subject : 0 for subject in missing}
+        for day, interval, room in free_slots:
+            for subject in missing:
+                if subject in rooms[room][MATERII]:
+                    free[subject] += rooms[room][CAPACITATE]
+
+        subject = max(missing, key=lambda s: (target[s] - coverage[s]) / free[s] if free[s] else float('inf'))
+        shortfall = target[subject] - coverage[subject]
+
+        best, best_key = None, None
+        for day, interval, room in free_slots:
+            if subject not in rooms[room][MATERII]:
+                continue
+
+            capacity = rooms[room][CAPACITATE]
+            for prof in subject_profs[subject]:
+                if hours[prof] >= limit[prof] or prof in busy[day][interval]:
+                    continue
+
+                unwanted = day in forbidden[prof][0] or interval in forbidden[prof][1]
+                fits = capacity >= shortfall
+                key = (unwanted, not fits, capacity if fits else -capacity, hours[prof])
+                if best_key is None or key < best_key:
+                    best, best_key = (day, interval, room, prof), key
+
+        if best is None:
+            blocked.add(subject)
+            continue
+
+        day, interval, room, prof = best
+        timetable[day][interval][room] = (prof, subject)
+        busy[day][interval].add(prof)
+        hours[prof] += 1
+        coverage[subject] += rooms[room][CAPACITATE]
+
+
+def repair_timetable(timetable : dict, timetable_specs : dict) -> dict:
+    '''
+    Repară un orar existent: scoate orele invalide sau în plus și acoperă greedy materiile rămase.
+
+    Orarul primit nu este modificat; se returnează un orar nou, cu aceeași structură (zile -> intervale -> săli).
+    '''
+
+    repaired = copy_timetable(timetable)
+    for day in repaired:
+        for interval in repaired[day]:
+            for room in timetable_specs[SALI]:
+                repaired[day][interval].setdefault(room, None)
+
+    hours, coverage = remove_invalid_lessons(repaired, timetable_specs)
+    remove_surplus_lessons(repaired, timetable_specs, hours, coverage)
+    fill_uncovered(repaired, timetable_specs, hours, coverage)
+
+    return repaired
@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+import yaml
+
+from store import STORE_DIR
+from utils import render_timetable
+
+
+SOCKET_PATH = 'orar.sock'
+JOB_KINDS = ['solve', 'validate', 'repair']
+TERMINAL_EVENTS = ['done', 'cancelled', 'error']
+PROGRESS_PERIOD = 0.25  # Secunde intre doua evenimente de progres trimise de acelasi job
+
+
+#################### WORKERI ####################
+def solve_job(job_id, path, specs, params, events, cancel):
+    """
+    Ruleaza un algoritm de cautare pe instanta data, raportand progresul prin coada de evenimente.
+
+    Args:
+        job_id (int): Identificatorul jobului.
+        path (str): Calea fisierului YAML.
+        specs (dict): Specificatiile instantei.
+        params (dict): Parametrii jobului ("algorithm", "time_limit", "target_cost", "stall", "decompose",
+            "warm_start", "store", "workers"). Poolul serviciului ruleaza deja mai multe joburi in paralel, asa ca
+            implicit cautarea unui job foloseste un singur proces ("workers": 1).
+        events (Queue): Coada partajata prin care se trimit evenimentele catre serviciu.
+        cancel (Event): Evenimentul partajat setat de serviciu la anularea jobului.
+
+    Returns:
+        dict: Orarul gasit, statisticile cautarii si rezultatul verificarii constrangerilor.
+    """
+    from orar import build_initial_state, run_algorithm
+    from bounds import instance_bounds
+    from check_constraints import validate_timetable
+
+    initial_state = build_initial_state(specs)
+    bounds = instance_bounds(initial_state)
+    if not bounds.feasible():
+        raise ValueError('Instanta nu are solutie: ' + '; '.join(bounds.reasons))
+
+    store = None
+    if params.get('warm_start'):
+        from orar import state_from_timetable
+        from store import SolutionStore
+        store = SolutionStore(params.get('store', STORE_DIR))
+        timetable = store.warm_start(specs)
+        if timetable is not None:
+            initial_state = state_from_timetable(initial_state.info, timetable)
+
+    algorithm = params.get('algorithm', 'hc')
+    last_report = [0.0]
+
+    def callback(event):
+        if event.improved or event.elapsed - last_report[0] >= PROGRESS_PERIOD:
+            last_report[0] = event.elapsed
+            events.put((job_id, dict(event.as_dict(), event='progress')))
+        return cancel.is_set()
+
+    start = time.time()
+    final_state, iters, states = run_algorithm(algorithm, initial_state, callback=callback,
+                                               target_cost=params.get('target_cost'), stall=params.get('stall'),
+                                               time_limit=params.get('time_limit'),
+                                               decompose=params.get('decompose', False),
+                                               workers=params.get('workers', 1))
+
+    result = {'algorithm': algorithm, 'iterations': iters, 'states': states, 'elapsed': time.time() - start,
+              'cancelled': cancel.is_set(), 'cost': final_state.get_conflicts(), 'lower_bound': bounds.lower_bound()}
+    if store is not None:
+        result['stored'] = store.save(specs, final_state)
+    mandatory, optional, _ = validate_timetable(final_state.timetable, specs)
+    result.update(timetable=render_timetable(final_state.timetable, specs), mandatory=mandatory, optional=optional)
+    return result
+
+
+def validate_job(job_id, path, specs, params, events, cancel):
+    """
+    Verifica un orar primit ca text (formatul fisierelor din outputs/).
+
+    Returns:
+        dict: Numarul de constrangeri incalcate si mesajele verificarii.
+    """
+    from check_constraints import parse_timetable_lines, validate_timetable
+
+    timetable = parse_timetable_lines(specs, params['timetable'].splitlines())
+    mandatory, optional, messages = validate_timetable(timetable, specs)
+    return {'mandatory': mandatory, 'optional': optional, 'messages': messages}
+
+
+def repair_job(job_id, path, specs, params, events, cancel):
+    """
+    Repara un orar primit ca text si intoarce orarul reparat impreuna cu verificarea lui.
+
+    Returns:
+        dict: Orarul reparat si numarul de constrangeri incalcate inainte si dupa reparare.
+    """
+    from check_constraints import parse_timetable_lines, validate_timetable
+    from repair import repair_timetable
+
+    timetable = parse_timetable_lines(specs, params['timetable'].splitlines())
+    before, _, _ = validate_timetable(timetable, specs)
+    repaired = repair_timetable(timetable, specs)
+    mandatory, optional, _ = validate_timetable(repaired, specs)
+    return {'timetable': render_timetable(repaired, specs), 'mandatory_before': before,
+            'mandatory': mandatory, 'optional': optional}
+
+
+JOB_HANDLERS = {'solve': solve_job, 'validate': validate_job, 'repair': repair_job}
+
+
+def run_job(job_id, kind, path, specs, params, events, cancel):
+    """
+    Punctul de intrare al proceselor worker.
+    """
+    if cancel.is_set():
+        return {'cancelled': True}
+    events.put((job_id, {'event': 'started', 'pid': os.getpid()}))
+    return JOB_HANDLERS[kind](job_id, path, specs, params, events, cancel)
+
+
+#################### SERVICIU ####################
+class Instance:
+    def __init__(self, path):
+        """
+        Instanta compilata: specificatiile citite o singura data si pastrate in memorie.
+
+        Args:
+            path (str): Calea fisierului YAML.
+        """
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, 'rb') as file:
+            raw = file.read()
+        self.fingerprint = hashlib.sha1(raw).hexdigest()
+        self.specs = yaml.safe_load(raw)
+
+
+class Job:
+    def __init__(self, job_id, kind, instance, params):
+        """
+        Un job trimis serviciului.
+
+        Args:
+            job_id (int): Identificatorul jobului.
+            kind (str): Tipul jobului ("solve", "validate" sau "repair").
+            instance (Instance): Instanta pe care ruleaza jobul.
+            params (dict): Parametrii jobului.
+        """
+        self.id = job_id
+        self.kind = kind
+        self.instance = instance
+        self.params = params
+        self.state = 'queued'
+        self.events = []
+        self.watchers = []
+        self.future = None
+        self.cancel = None
+
+    def summary(self):
+        return {'job': self.id, 'kind': self.kind, 'state': self.state, 'instance': self.instance.fingerprint,
+                'result': self.events[-1].get('result') if self.state in TERMINAL_EVENTS else None}
+
+
+class SolverService:
+    def __init__(self, workers=None):
+        """
+        Serviciu local care pastreaza instantele compilate in memorie si ruleaza joburile pe un pool de procese.
+
+        Args:
+            workers (int, optional): Numarul maxim de joburi rulate simultan. Implicit, numarul de procesoare.
+        """
+        self.workers = workers or os.cpu_count()
+        self.instances = {}
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.tasks = set()
+
+    async def start(self, path=SOCKET_PATH, port=None):
+        """
+        Porneste poolul de procese si asculta pe un socket Unix sau, daca se da un port, pe 127.0.0.1.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.manager = multiprocessing.Manager()
+        self.events = self.manager.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.pump = threading.Thread(target=self.pump_events, daemon=True)
+        self.pump.start()
+        self.stopped = asyncio.Event()
+
+        if port is None:
+            if os.path.exists(path):
+                os.remove(path)
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host='127.0.0.1', port=port)
+
+    async def serve(self, path=SOCKET_PATH, port=None):
+        """
+        Porneste serviciul si ruleaza pana la primirea unei cereri "shutdown".
+        """
+        await self.start(path, port)
+        try:
+            await self.stopped.wait()
+        finally:
+            await self.close()
+            if port is None and os.path.exists(path):
+                os.remove(path)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for job in self.jobs.values():
+            if job.state not in TERMINAL_EVENTS:
+                job.cancel.set()
+        await self.loop.run_in_executor(None, self.pool.shutdown)
+        self.events.put(None)
+        self.pump.join()
+        self.manager.shutdown()
+
+    def pump_events(self):
+        """
+        Firul care muta evenimentele trimise de workeri in bucla asyncio.
+        """
+        while True:
+            item = self.events.get()
+            if item is None:
+                break
+            job_id, event = item
+            self.loop.call_soon_threadsafe(self.publish, self.jobs[job_id], event)
+
+    def publish(self, job, event):
+        """
+        Inregistreaza un eveniment al jobului si il trimite tuturor clientilor abonati.
+        """
+        if job.state in TERMINAL_EVENTS:
+            return
+
+        event = dict(event, job=job.id, time=time.time())
+        if event['event'] == 'started' or event['event'] in TERMINAL_EVENTS:
+            job.state = 'running' if event['event'] == 'started' else event['event']
+
+        job.events.append(event)
+        for queue in job.watchers:
+            queue.put_nowait(event)
+
+    def load(self, path):
+        """
+        Returneaza instanta compilata pentru fisierul dat, recitind-o doar daca fisierul s-a modificat.
+        """
+        path = os.path.abspath(path)
+        instance = self.instances.get(path)
+        if instance is None or instance.mtime != os.path.getmtime(path):
+            instance = self.instances[path] = Instance(path)
+        return instance
+
+    def submit(self, kind, path, params):
+        """
+        Adauga un job in coada poolului.
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f'Tip de job necunoscut: {kind}')
+        if kind != 'solve' and 'timetable' not in params:
+            raise ValueError(f'Jobul {kind} are nevoie de un orar ("timetable")')
+
+        instance = self.load(path)
+        job = Job(next(self.job_ids), kind, instance, params)
+        job.cancel = self.manager.Event()
+        self.jobs[job.id] = job
+
+        job.future = self.pool.submit(run_job, job.id, kind, instance.path, instance.specs, params, self.events, job.cancel)
+        self.publish(job, {'event': 'queued'})
+
+        task = asyncio.ensure_future(self.finish(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+
+    async def finish(self, job):
+        """
+        Asteapta terminarea jobului si publica evenimentul final.
+        """
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except (CancelledError, asyncio.CancelledError):
+            self.publish(job, {'event': 'cancelled', 'result': None})
+        except Exception as e:
+            self.publish(job, {'event': 'error', 'error': repr(e)})
+        else:
+            self.publish(job, {'event': 'cancelled' if result.get('cancelled') else 'done', 'result': result})
+
+    def cancel(self, job):
+        """
+        Anuleaza un job: daca nu a pornit inca, este scos din coada; altfel, cautarea se opreste la urmatoarea iteratie
+        si intoarce cea mai buna stare gasita pana atunci.
+        """
+        job.cancel.set()
+        job.future.cancel()
+
+    async def watch(self, job, writer):
+        """
+        Trimite clientului istoricul evenimentelor jobului si apoi evenimentele noi, pana la cel final.
+        """
+        queue = asyncio.Queue()
+        for event in job.events:
+            queue.put_nowait(event)
+        if job.state not in TERMINAL_EVENTS:
+            job.watchers.append(queue)
+
+        try:
+            while True:
+                event = await queue.get()
+                await send(writer, event)
+                if event['event'] in TERMINAL_EVENTS:
+                    break
+        finally:
+            if queue in job.watchers:
+                job.watchers.remove(queue)
+
+    async def handle_request(self, request, writer):
+        op = request.get('op')
+
+        if op == 'load':
+            instance = self.load(request['path'])
+            return {'ok': True, 'instance': instance.fingerprint, 'path': instance.path}
+        elif op == 'submit':
+            job = self.submit(request['kind'], request['path'], request.get('params', {}))
+            return {'ok': True, 'job': job.id}
+        elif op == 'watch':
+            await self.watch(self.jobs[request['job']], writer)
+            return None
+        elif op == 'cancel':
+            self.cancel(self.jobs[request['job']])
+            return {'ok': True}
+        elif op == 'status':
+            return dict(self.jobs[request['job']].summary(), ok=True)
+        elif op == 'jobs':
+            return {'ok': True, 'jobs': [job.summary() for job in self.jobs.values()]}
+        elif op == 'shutdown':
+            self.stopped.set()
+            return {'ok': True}
+        raise ValueError(f'Operatie necunoscuta: {op}')
+
+    async def handle_client(self, reader, writer):
+        """
+        Trateaza cererile unui client: cate un obiect JSON pe linie, cate un raspuns JSON pe linie.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    response = await self.handle_request(json.loads(line), writer)
+                except KeyError as e:
+                    response = {'ok': False, 'error': f'Lipseste sau nu exista: {e}'}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+
+                if response is not None:
+                    await send(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def send(writer, message):
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local timetable solver service (solve, validate and repair jobs).')
+    parser.add_argument('--socket', type=str, default=SOCKET_PATH, help='Unix socket path to listen on')
+    parser.add_argument('--port', type=int, default=None, help='Listen on 127.0.0.1:PORT instead of a Unix socket')
+    parser.add_argument('--workers', type=int, default=None, help='Maximum number of jobs running at the same time')
+    args = parser.parse_args()
+
+    asyncio.run(SolverService(args.workers).serve(args.socket, args.port))
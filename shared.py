@@ -0,0 +1,176 @@
+import json
+import struct
+from multiprocessing import shared_memory
+
+
+HEADER = struct.Struct('I')  # Lungimea antetului JSON de la inceputul blocului
+ITEM_SIZE = 4  # Tablourile sunt de intregi pe 32 de biti
+
+
+class SharedInstance:
+    def __init__(self, memory, header, owner):
+        """
+        Instanta compilata intr-un bloc de memorie partajata: capacitatile salilor, matricile de compatibilitate
+        sala-materie si profesor-materie, mastile preferintelor profesorilor, numarul de studenti al fiecarei materii
+        si orarul curent. Procesul care o publica (publish_instance) scrie orarul; workerii se ataseaza dupa nume
+        (attach_instance) si lucreaza direct pe tablourile din blocul comun (array), fara sa reconstruiasca
+        specificatiile sau orarul ca dictionare.
+
+        Orarul este codificat ca un tablou zi x interval x sala (celula (zi * nr_intervale + interval) * nr_sali + sala),
+        cu 0 pentru un slot liber si profesor * nr_materii + materie + 1 pentru o ora. Tablourile de compatibilitate
+        si preferinte sunt matrici liniarizate pe linii: room_course[sala * nr_materii + materie],
+        teacher_course[profesor * nr_materii + materie], forbidden_day[profesor * nr_zile + zi] si
+        forbidden_interval[profesor * nr_intervale + interval].
+
+        Args:
+            memory (SharedMemory): Blocul de memorie partajata.
+            header (dict): Numele salilor, profesorilor, materiilor, zilelor si intervalelor si pozitiile tablourilor.
+            owner (bool): True pentru procesul care a creat blocul si trebuie sa il elibereze.
+        """
+        self.memory = memory
+        self.header = header
+        self.owner = owner
+        self.name = memory.name
+        self.rooms = header['rooms']
+        self.teachers = header['teachers']
+        self.courses = header['courses']
+        self.days = header['days']
+        self.intervals = [tuple(interval) for interval in header['intervals']]
+        self.slots = [(day, interval, room) for day in self.days for interval in self.intervals for room in self.rooms]
+        self.views = {}
+
+    def array(self, name):
+        """
+        Tabloul cu numele dat, ca memoryview de intregi peste blocul partajat (fara copiere). Vederea se creeaza
+        o singura data si ramane valabila pana la close().
+        """
+        if name not in self.views:
+            offset, length = self.header['arrays'][name]
+            self.views[name] = self.memory.buf[offset:offset + length * ITEM_SIZE].cast('i')
+        return self.views[name]
+
+    def store_timetable(self, timetable):
+        """
+        Scrie orarul in blocul partajat (doar procesul care a publicat instanta).
+        """
+        cells = self.array('timetable')
+        teacher_idx = {teacher: t for t, teacher in enumerate(self.teachers)}
+        course_idx = {course: c for c, course in enumerate(self.courses)}
+        idx = 0
+        for day in self.days:
+            for interval in self.intervals:
+                for room in self.rooms:
+                    lesson = timetable[day][interval].get(room)
+                    cells[idx] = 0 if lesson is None else \
+                        teacher_idx[lesson[0]] * len(self.courses) + course_idx[lesson[1]] + 1
+                    idx += 1
+
+    def store_cells(self, changes):
+        """
+        Scrie in orarul partajat doar celulele date, ca (celula, cod).
+        """
+        cells = self.array('timetable')
+        for idx, code in changes:
+            cells[idx] = code
+
+    def decode(self, code):
+        code -= 1
+        return None if code < 0 else (self.teachers[code // len(self.courses)], self.courses[code % len(self.courses)])
+
+    def load_timetable(self):
+        """
+        Citeste orarul curent din blocul partajat.
+
+        Returns:
+            dict: Orarul (zile -> intervale -> sali -> (profesor, materie) sau None).
+        """
+        cells = self.array('timetable')
+        timetable = {}
+        idx = 0
+        for day in self.days:
+            timetable[day] = {}
+            for interval in self.intervals:
+                timetable[day][interval] = {}
+                for room in self.rooms:
+                    timetable[day][interval][room] = self.decode(cells[idx])
+                    idx += 1
+        return timetable
+
+    def close(self):
+        """
+        Detaseaza procesul de bloc; procesul care l-a publicat il si elibereaza.
+        """
+        for view in self.views.values():
+            view.release()
+        self.views.clear()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def publish_instance(state):
+    """
+    Compileaza instanta starii date si orarul ei intr-un bloc nou de memorie partajata.
+
+    Args:
+        state (State): Starea publicata.
+
+    Returns:
+        SharedInstance: Instanta partajata; blocul se elibereaza cu close().
+    """
+    info = state.info
+    rooms, teachers, courses = list(info.classrooms), list(info.teachers), list(info.courses)
+    days = list(state.timetable)
+    intervals = list(state.timetable[days[0]]) if days else []
+
+    arrays = {
+        'capacity': [info.classrooms[room]['Capacitate'] for room in rooms],
+        'demand': [info.courses[course] for course in courses],
+        'room_course': [int(course in info.room_courses[room]) for room in rooms for course in courses],
+        'teacher_course': [int(course in info.teacher_courses[teacher]) for teacher in teachers for course in courses],
+        'teacher_slots': [info.teacher_slots[teacher] for teacher in teachers],
+        'forbidden_day': [int(day in info.forbidden[teacher][0]) for teacher in teachers for day in days],
+        'forbidden_interval': [int(interval in info.forbidden[teacher][1])
+                               for teacher in teachers for interval in intervals],
+        'timetable': [0] * (len(days) * len(intervals) * len(rooms)),
+    }
+
+    # Pozitiile tablourilor depind de lungimea antetului, care le contine: antetul se masoara intai cu valori
+    # mai mari decat oricare pozitie reala
+    header = {'rooms': rooms, 'teachers': teachers, 'courses': courses, 'days': days,
+              'intervals': [list(interval) for interval in intervals],
+              'arrays': {name: [2 ** 40, 2 ** 40] for name in arrays}}
+    offset = HEADER.size + len(json.dumps(header).encode())
+    offset += -offset % ITEM_SIZE
+    for name, values in arrays.items():
+        header['arrays'][name] = [offset, len(values)]
+        offset += len(values) * ITEM_SIZE
+    encoded = json.dumps(header).encode()
+
+    memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    HEADER.pack_into(memory.buf, 0, len(encoded))
+    memory.buf[HEADER.size:HEADER.size + len(encoded)] = encoded
+
+    shared = SharedInstance(memory, header, owner=True)
+    for name, values in arrays.items():
+        view = shared.array(name)
+        for idx, value in enumerate(values):
+            view[idx] = value
+    shared.store_timetable(state.timetable)
+    return shared
+
+
+def attach_instance(name):
+    """
+    Ataseaza procesul curent la o instanta publicata de alt proces.
+
+    Args:
+        name (str): Numele blocului de memorie partajata (SharedInstance.name).
+
+    Returns:
+        SharedInstance: Instanta partajata.
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    (length,) = HEADER.unpack_from(memory.buf, 0)
+    header = json.loads(bytes(memory.buf[HEADER.size:HEADER.size + length]))
+    return SharedInstance(memory, header, owner=False)
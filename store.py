@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import time
+from ast import literal_eval
+
+from utils import INTERVALE, ZILE, MATERII, PROFESORI, SALI
+
+
+STORE_DIR = '.orar_store'
+MAX_AGE = 30 * 24 * 3600  # Secunde dupa care o solutie nefolosita este stearsa
+MAX_BYTES = 16 * 1024 * 1024  # Dimensiunea maxima a depozitului; se sterg intai solutiile cele mai vechi
+MIN_SIMILARITY = 0.5  # Asemanarea minima (Jaccard) pentru ca o solutie a altei instante sa fie folosita
+
+
+def instance_fingerprint(specs):
+    """
+    Amprenta instantei: nu depinde de formatarea fisierului YAML sau de ordinea cheilor.
+    """
+    return hashlib.sha1(json.dumps(specs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def instance_features(specs):
+    """
+    Caracteristicile dupa care se cauta o instanta asemanatoare: zilele, intervalele, materiile, salile si profesorii,
+    atat doar dupa nume, cat si cu detaliile lor (numar de studenti, capacitate, materii, constrangeri).
+
+    Returns:
+        set: Caracteristicile instantei.
+    """
+    features = {f'zi:{day}' for day in specs[ZILE]} | {f'interval:{interval}' for interval in specs[INTERVALE]}
+    for course, students in specs[MATERII].items():
+        features |= {f'materie:{course}', f'materie:{course}:{students}'}
+    for room, details in specs[SALI].items():
+        features |= {f'sala:{room}', f"sala:{room}:{details['Capacitate']}:{sorted(details['Materii'])}"}
+    for teacher, details in specs[PROFESORI].items():
+        features |= {f'profesor:{teacher}',
+                     f"profesor:{teacher}:{sorted(details['Materii'])}:{sorted(details['Constrangeri'])}"}
+    return features
+
+
+def similarity(first, second):
+    return len(first & second) / len(first | second) if first or second else 1.0
+
+
+def encode_timetable(timetable):
+    return [[day, list(interval), room, list(lesson)] for day in timetable for interval in timetable[day]
+            for room, lesson in timetable[day][interval].items() if lesson]
+
+
+def adapt_timetable(lessons, specs):
+    """
+    Orarul unei instante construit din orele unei solutii salvate: se pastreaza doar orele din zilele, intervalele
+    si salile instantei, cu profesori si materii care exista in ea.
+    """
+    timetable = {day: {literal_eval(interval): {room: None for room in specs[SALI]} for interval in specs[INTERVALE]}
+                 for day in specs[ZILE]}
+    for day, interval, room, (teacher, course) in lessons:
+        interval = tuple(interval)
+        if day in timetable and interval in timetable[day] and room in specs[SALI] \
+                and teacher in specs[PROFESORI] and course in specs[MATERII]:
+            timetable[day][interval][room] = (teacher, course)
+    return timetable
+
+
+class SolutionStore:
+    def __init__(self, path=STORE_DIR, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        """
+        Depozit local al celor mai bune orare gasite, cate unul pentru fiecare instanta (un fisier JSON
+        <amprenta>.json). O cautare noua poate porni de la orarul instantei identice sau, daca nu exista,
+        de la cel al instantei celei mai asemanatoare.
+
+        Args:
+            path (str): Directorul depozitului.
+            max_age (float): Secunde dupa care o solutie nefolosita este stearsa.
+            max_bytes (int): Dimensiunea maxima a depozitului.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def entry_path(self, fingerprint):
+        return os.path.join(self.path, f'{fingerprint}.json')
+
+    def entries(self):
+        """
+        Solutiile salvate, citite de pe disc (fisierele corupte sunt ignorate).
+
+        Yields:
+            str: Calea fisierului.
+            dict: Solutia: amprenta, caracteristicile, costul, momentul salvarii si orele orarului.
+        """
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                path = os.path.join(self.path, name)
+                try:
+                    with open(path) as file:
+                        yield path, json.load(file)
+                except (OSError, ValueError):
+                    continue
+
+    def lookup(self, specs):
+        """
+        Cauta solutia instantei date sau, daca nu exista, pe cea a instantei celei mai asemanatoare.
+
+        Returns:
+            dict: Solutia gasita (None daca nu exista niciuna destul de asemanatoare).
+            float: Asemanarea dintre instante (1 pentru instanta identica).
+        """
+        fingerprint = instance_fingerprint(specs)
+        path = self.entry_path(fingerprint)
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    entry = json.load(file)
+                os.utime(path)  # Solutia folosita nu mai este candidata la stergere dupa varsta
+                return entry, 1.0
+            except (OSError, ValueError):
+                pass
+
+        features = instance_features(specs)
+        best, best_path, best_similarity = None, None, MIN_SIMILARITY
+        for path, entry in self.entries():
+            score = similarity(features, set(entry['features']))
+            if score >= best_similarity:
+                best, best_path, best_similarity = entry, path, score
+        if best is None:
+            return None, 0.0
+        try:
+            os.utime(best_path)  # Si solutia unei instante asemanatoare este folosita
+        except OSError:
+            pass
+        return best, best_similarity
+
+    def warm_start(self, specs):
+        """
+        Orarul de la care poate porni cautarea: cel salvat pentru instanta identica, neschimbat, sau cel al
+        instantei celei mai asemanatoare, adaptat si reparat.
+
+        Returns:
+            dict: Orarul (None daca depozitul nu contine nicio instanta destul de asemanatoare).
+        """
+        entry, score = self.lookup(specs)
+        if entry is None:
+            return None
+        timetable = adapt_timetable(entry['timetable'], specs)
+        if score < 1.0:
+            from repair import repair_timetable
+            timetable = repair_timetable(timetable, specs)
+        return timetable
+
+    def save(self, specs, state):
+        """
+        Salveaza orarul starii date daca este mai bun decat cel salvat pentru aceeasi instanta, apoi aplica
+        politica de stergere.
+
+        Returns:
+            bool: True daca orarul a fost salvat si a ramas in depozit dupa stergere.
+        """
+        fingerprint = instance_fingerprint(specs)
+        path = self.entry_path(fingerprint)
+        cost = state.get_conflicts()
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    if json.load(file)['cost'] <= cost:
+                        return False
+            except (OSError, ValueError, KeyError):
+                pass
+
+        os.makedirs(self.path, exist_ok=True)
+        entry = {'fingerprint': fingerprint, 'features': sorted(instance_features(specs)), 'cost': cost,
+                 'saved': time.time(), 'timetable': encode_timetable(state.timetable)}
+        # Scrierea intr-un fisier temporar urmata de redenumire nu lasa niciodata o solutie scrisa pe jumatate
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(entry, file)
+        os.replace(temporary, path)
+        self.evict()
+        # O solutie mai mare decat max_bytes este stearsa chiar de politica de stergere
+        return os.path.exists(path)
+
+    def evict(self):
+        """
+        Sterge solutiile nefolosite de mai mult de max_age secunde, apoi pe cele mai vechi, pana cand
+        depozitul nu mai depaseste max_bytes.
+        """
+        if not os.path.isdir(self.path):
+            return
+        now = time.time()
+        files = []
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            if not name.endswith('.json'):
+                continue
+            stat = os.stat(path)
+            if now - stat.st_mtime > self.max_age:
+                os.remove(path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
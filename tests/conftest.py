@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def coverage_specs():
+    """
+    O zi, un interval, doua sali (25 si 5 locuri) si o materie cu 26 de studenti: orarul valid are nevoie de
+    ora lui Ana Pop din sala mica, desi ii incalca ambele preferinte. Orarul initial (utils.create_timetable)
+    este chiar acesta, deci costa 2, iar fara ora din sala mica ar lipsi un singur student.
+    """
+    return {
+        'Intervale': ['(8, 10)'],
+        'Zile': ['Luni'],
+        'Materii': {'A': 26},
+        'Profesori': {
+            'Ion Ionescu': {'Constrangeri': [], 'Materii': ['A']},
+            'Ana Pop': {'Constrangeri': ['!Luni', '!8-10'], 'Materii': ['A']},
+        },
+        'Sali': {
+            'EG1': {'Capacitate': 25, 'Materii': ['A']},
+            'EG2': {'Capacitate': 5, 'Materii': ['A']},
+        },
+    }
+
+
+@pytest.fixture
+def small_specs():
+    from utils import read_yaml_file
+    return read_yaml_file(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       'inputs', 'orar_mic_exact.yaml'))
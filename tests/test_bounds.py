@@ -0,0 +1,68 @@
+from bounds import max_flow, instance_bounds, SOURCE, SINK
+from orar import build_initial_state, run_algorithm, HARD_PENALTY
+
+
+def test_max_flow():
+    graph = {
+        SOURCE: {'a': 16, 'c': 13},
+        'a': {'b': 12},
+        'b': {'c': 9, SINK: 20},
+        'c': {'a': 4, 'd': 14},
+        'd': {'b': 7, SINK: 4},
+    }
+    assert max_flow(graph) == 23
+    # Reteaua primita nu este modificata
+    assert graph[SOURCE] == {'a': 16, 'c': 13}
+
+
+def test_max_flow_parallel_edges_and_no_path():
+    assert max_flow({SOURCE: {'a': 3}, 'a': {SINK: 5}}) == 3
+    assert max_flow({SOURCE: {'a': 3}, 'b': {SINK: 5}}) == 0
+
+
+def test_infeasible_by_capacity(coverage_specs):
+    # Salile au impreuna 30 de locuri intr-un singur interval
+    coverage_specs['Materii']['A'] = 31
+    bounds = instance_bounds(build_initial_state(coverage_specs))
+
+    assert not bounds.feasible()
+    assert bounds.student_shortfall == 1
+    assert bounds.lower_bound() == HARD_PENALTY
+
+
+def test_infeasible_by_teacher_hours(coverage_specs):
+    # 8 intervale si o sala, dar un singur profesor, care poate preda cel mult 7 ore
+    coverage_specs['Intervale'] = [f'({hour}, {hour + 2})' for hour in range(8, 24, 2)]
+    coverage_specs['Materii']['A'] = 8 * 25
+    coverage_specs['Sali'] = {'EG1': {'Capacitate': 25, 'Materii': ['A']}}
+    coverage_specs['Profesori'] = {'Ion Ionescu': {'Constrangeri': [], 'Materii': ['A']}}
+    bounds = instance_bounds(build_initial_state(coverage_specs))
+
+    assert not bounds.feasible()
+    assert bounds.lesson_shortfall == 1
+    assert bounds.lower_bound() == HARD_PENALTY
+
+
+def test_bound_is_reached_only_by_a_valid_timetable(coverage_specs):
+    initial = build_initial_state(coverage_specs)
+    bound = instance_bounds(initial).lower_bound()
+    state, _, _ = run_algorithm('hc', initial)
+
+    assert bound <= 2
+    assert state.is_valid()
+    assert state.get_conflicts() == 2
+
+
+def test_target_requires_a_valid_state(coverage_specs):
+    from progress import ProgressEvent, until
+
+    valid = build_initial_state(coverage_specs)
+    invalid = valid.copy()
+    invalid.remove_lesson('Luni', (8, 10), 'EG2')
+
+    def events():
+        for iteration, state in enumerate([invalid, valid, valid], 1):
+            yield ProgressEvent('test', iteration, iteration, 0, 0, 0.0, state, False)
+
+    assert [event.iteration for event in until(events(), target_cost=0, require_valid=True)] == [1, 2]
+    assert [event.iteration for event in until(events(), target_cost=0)] == [1]
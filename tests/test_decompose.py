@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import registry
+from decompose import decomposed_steps
+from orar import build_initial_state, state_from_timetable
+from progress import ProgressEvent, last
+
+
+def tuesday_steps(initial_state):
+    # Un algoritm slab: muta orele marti, unde profesorii nu vor sa predea
+    timetable = {day: {interval: {room: None for room in rooms} for interval, rooms in intervals.items()}
+                 for day, intervals in initial_state.timetable.items()}
+    for day, intervals in initial_state.timetable.items():
+        for interval, rooms in intervals.items():
+            for room, lesson in rooms.items():
+                if lesson:
+                    timetable['Marti'][interval][room] = lesson
+    state = state_from_timetable(initial_state.info, timetable, initial_state.seed)
+    yield ProgressEvent('tuesday', 1, 1, state.get_conflicts(), state.get_conflicts(), 0.0, state, False)
+
+
+@pytest.fixture
+def two_components():
+    """
+    Doua componente independente (Ion cu A in S1, Ana cu B in S2), cu orarul optim (doar luni) ca stare initiala.
+    """
+    specs = {
+        'Intervale': ['(8, 10)'],
+        'Zile': ['Luni', 'Marti'],
+        'Materii': {'A': 10, 'B': 10},
+        'Profesori': {
+            'Ion': {'Constrangeri': ['!Marti'], 'Materii': ['A']},
+            'Ana': {'Constrangeri': ['!Marti'], 'Materii': ['B']},
+        },
+        'Sali': {
+            'S1': {'Capacitate': 10, 'Materii': ['A']},
+            'S2': {'Capacitate': 10, 'Materii': ['B']},
+        },
+    }
+    state = build_initial_state(specs)
+    for room in state.timetable['Marti'][(8, 10)]:
+        if state.timetable['Marti'][(8, 10)][room]:
+            state.remove_lesson('Marti', (8, 10), room)
+    return state
+
+
+def test_worse_merged_timetable_does_not_replace_the_best_state(two_components, monkeypatch):
+    monkeypatch.setitem(registry.SOLVERS, 'tuesday', f'{__name__}:tuesday_steps')
+    assert len(two_components.info.components) == 2 and two_components.get_conflicts() == 0
+
+    event = last(decomposed_steps(two_components, 'tuesday'))
+
+    assert event.best_cost == 0
+    assert event.best_state.get_conflicts() == 0
+
+
+def test_decompose_and_faculty_do_not_import_lns():
+    # lns aduce dupa el memoria partajata si poolul de procese al cautarii; decompose si faculty nu au nevoie de ele
+    code = 'import sys, decompose, faculty; print("lns" in sys.modules or "shared" in sys.modules)'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,80 @@
+import pytest
+
+import registry
+from faculty import couple, department_components, faculty_steps, resolve_clashes
+from orar import build_initial_state
+from progress import last
+from repair import teacher_slots
+
+SLOT = ('Luni', (8, 10))
+
+
+@pytest.fixture
+def faculty_state():
+    """
+    Doua departamente cu o sala comuna (S) si un profesor comun (Ion Ionescu), pe un singur interval.
+    """
+    def department(course, students, room):
+        return {
+            'Intervale': ['(8, 10)'],
+            'Zile': ['Luni'],
+            'Materii': {course: students},
+            'Profesori': {
+                'Ion Ionescu': {'Constrangeri': [], 'Materii': [course]},
+                f'Prof {course}': {'Constrangeri': [], 'Materii': [course]},
+            },
+            'Sali': {
+                'S': {'Capacitate': 10, 'Materii': [course]},
+                room: {'Capacitate': 10, 'Materii': [course]},
+            },
+        }
+
+    return build_initial_state(couple({'a': department('X', 5, 'RA'), 'b': department('Y', 20, 'RB')}))
+
+
+def department_timetables(lessons_a, lessons_b):
+    day, interval = SLOT
+    return [{day: {interval: dict({'S': None, 'RA': None}, **lessons_a)}},
+            {day: {interval: dict({'S': None, 'RB': None}, **lessons_b)}}]
+
+
+def test_free_shared_room_keeps_the_other_department_lesson(faculty_state):
+    timetables = department_timetables({'S': ('Prof X', 'a/X')}, {'RB': ('Prof Y', 'b/Y')})
+    merged = resolve_clashes(faculty_state, timetables)[SLOT[0]][SLOT[1]]
+    assert merged == {'S': ('Prof X', 'a/X'), 'RA': None, 'RB': ('Prof Y', 'b/Y')}
+
+
+def test_shared_room_clash_keeps_the_least_covered_course(faculty_state):
+    timetables = department_timetables({'S': ('Prof X', 'a/X')}, {'S': ('Prof Y', 'b/Y'), 'RB': ('Ion Ionescu', 'b/Y')})
+    merged = resolve_clashes(faculty_state, timetables)[SLOT[0]][SLOT[1]]
+    # a/X are 10 locuri pentru 5 studenti, iar b/Y exact cati ii trebuie, deci sala comuna ramane lui b/Y
+    assert merged == {'S': ('Prof Y', 'b/Y'), 'RA': None, 'RB': ('Ion Ionescu', 'b/Y')}
+
+
+def test_shared_teacher_clash_keeps_one_lesson(faculty_state):
+    timetables = department_timetables({'RA': ('Ion Ionescu', 'a/X')}, {'RB': ('Ion Ionescu', 'b/Y')})
+    merged = resolve_clashes(faculty_state, timetables)[SLOT[0]][SLOT[1]]
+    assert merged == {'S': None, 'RA': None, 'RB': ('Ion Ionescu', 'b/Y')}
+
+
+def test_worse_coordinated_timetable_does_not_replace_the_best_state(monkeypatch):
+    # Fiecare departament este rezolvat de un algoritm care muta orele marti, unde profesorii nu vor sa predea
+    monkeypatch.setitem(registry.SOLVERS, 'tuesday', 'test_decompose:tuesday_steps')
+
+    def department(course, teacher, room):
+        return {'Intervale': ['(8, 10)'], 'Zile': ['Luni', 'Marti'], 'Materii': {course: 10},
+                'Profesori': {teacher: {'Constrangeri': ['!Marti'], 'Materii': [course]}},
+                'Sali': {room: {'Capacitate': 10, 'Materii': [course]}}}
+
+    departments = {'a': department('X', 'Ion', 'S1'), 'b': department('Y', 'Ana', 'S2')}
+    specs = couple(departments)
+    state = build_initial_state(specs)
+    for room, lesson in state.timetable['Marti'][(8, 10)].items():
+        if lesson:
+            state.remove_lesson('Marti', (8, 10), room)
+    assert state.get_conflicts() == 0
+
+    event = last(faculty_steps(state, department_components(departments, teacher_slots(specs)), 'tuesday'))
+
+    assert event.best_cost == 0
+    assert event.best_state.get_conflicts() == 0
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+import ga
+from orar import algorithm_steps, build_initial_state
+from progress import last
+
+
+@pytest.fixture
+def incoming(monkeypatch):
+    """
+    Migrantii primiti de insule la fiecare epoca, in ordinea apelurilor Island.evolve.
+    """
+    received = []
+    evolve = ga.Island.evolve
+
+    def record(island, generations, migrants=None):
+        received.append(migrants)
+        return evolve(island, generations, migrants)
+
+    monkeypatch.setattr(ga.Island, 'evolve', record)
+    return received
+
+
+def test_single_island_receives_no_migrants(coverage_specs, incoming):
+    # Orarul optim al instantei costa 2, asa ca algoritmul ruleaza toate generatiile cerute
+    last(ga.ga_steps(build_initial_state(coverage_specs), generations=3 * ga.EPOCH))
+    assert len(incoming) == 3
+    assert all(migrants is None for migrants in incoming)
+
+
+def test_islands_option_reaches_the_ring(coverage_specs, incoming):
+    state = build_initial_state(coverage_specs)
+    event = last(algorithm_steps('ga', state, workers=1, options={'islands': 2, 'generations': 2 * ga.EPOCH}))
+    assert event.best_state.is_valid()
+    # Prima epoca porneste fara migranti; la a doua, fiecare insula primeste elitele celeilalte
+    assert len(incoming) == 4
+    assert incoming[0] is None and incoming[1] is None
+    assert len(incoming[2]) == len(incoming[3]) == ga.MIGRANTS
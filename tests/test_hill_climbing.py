@@ -0,0 +1,85 @@
+import random
+
+from check_constraints import validate_timetable
+from hill_climbing import DeltaCache, MoveIndex, hill_climbing
+from neighborhoods import NEIGHBORHOODS, apply_move, move_delta, move_footprint, neighborhood
+from orar import build_initial_state
+
+
+def test_keeps_coverage_over_preferences(coverage_specs):
+    # Scoaterea orei din sala mica ar castiga doua preferinte si ar pierde un student: orarul ar deveni invalid
+    state, _, _ = hill_climbing(build_initial_state(coverage_specs))
+
+    mandatory, optional, _ = validate_timetable(state.timetable, coverage_specs)
+    assert state.is_valid()
+    assert (mandatory, optional) == (0, 2)
+    assert state.get_conflicts() == 2
+
+
+def test_cached_deltas_match_fresh_deltas(small_specs):
+    # Se aplica mutari aleatoare (nu doar cele mai bune), ca invalidarea sa fie verificata pentru toate vecinatatile
+    state = build_initial_state(small_specs)
+    rng = random.Random(0)
+    cache = DeltaCache()
+    checked = mismatches = 0
+
+    for _ in range(15):
+        moves = list(neighborhood(state))
+        for move in moves:
+            cache.delta(state, move)
+        cache.retain(set(moves))
+        for move in rng.sample(moves, min(len(moves), 300)):
+            checked += 1
+            mismatches += cache.deltas[move][0] != move_delta(state, move)
+
+        move = rng.choice(moves)
+        cache.invalidate(move_footprint(state, move))
+        apply_move(state, move)
+
+    assert checked > 0
+    assert mismatches == 0
+
+
+def test_regenerated_units_match_the_full_neighborhood(small_specs):
+    # Dupa fiecare mutare aleatoare, vecinatatea intretinuta incremental trebuie sa fie exact cea enumerata complet.
+    # A doua instanta are sali si profesori interschimbabili, limite mici de ore si materii care nu pot fi acoperite:
+    # mutarile de plasare exista mereu, iar reprezentantul unei clase de profesori depinde de orele lor
+    symmetric = {
+        'Intervale': ['(8, 10)', '(10, 12)'],
+        'Zile': ['Luni', 'Marti'],
+        'Materii': {'X': 200, 'Y': 100},
+        'Profesori': {
+            'Ana Pop': {'Constrangeri': [], 'Materii': ['X'], 'Sloturi': 2},
+            'Ion Ionescu': {'Constrangeri': [], 'Materii': ['X'], 'Sloturi': 2},
+            'Dan Popa': {'Constrangeri': ['!Marti'], 'Materii': ['X', 'Y'], 'Sloturi': 3},
+        },
+        'Sali': {
+            'A1': {'Capacitate': 20, 'Materii': ['X', 'Y']},
+            'A2': {'Capacitate': 20, 'Materii': ['X', 'Y']},
+            'B': {'Capacitate': 30, 'Materii': ['X']},
+        },
+    }
+    for specs in (small_specs, symmetric):
+        state = build_initial_state(specs)
+        rng = random.Random(1)
+        index = MoveIndex()
+        index.regenerate(state)
+
+        for _ in range(60):
+            assert set(index.count) == set(neighborhood(state))
+            for name in NEIGHBORHOODS:
+                assert {move for (unit_name, _), moves in index.units.items() if unit_name == name
+                        for move in moves} == set(NEIGHBORHOODS[name](state))
+
+            move = rng.choice(sorted(index.count, key=repr))
+            keys = move_footprint(state, move)
+            apply_move(state, move)
+            added, removed = index.regenerate(state, keys)
+            assert not set(added) & set(removed)
+
+
+def test_stops_in_a_local_optimum(small_specs):
+    state, iters, _ = hill_climbing(build_initial_state(small_specs))
+
+    assert iters < 1000
+    assert min(move_delta(state, move) for move in neighborhood(state)) >= 0
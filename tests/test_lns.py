@@ -0,0 +1,89 @@
+import random
+from collections import Counter
+
+import pytest
+
+from lns import (DESTROY, MIN_WEIGHT, REPAIR, REWARD_BEST, apply_changes, choose, destroy_and_repair, encoded_cost,
+                 init_local, repair_greedy, reward)
+from orar import build_initial_state, instance_specs, state_from_timetable
+from repair import repair_timetable
+from shared import publish_instance
+
+
+@pytest.fixture
+def published(small_specs):
+    """
+    Orarul reparat al instantei mici, publicat in memoria partajata.
+    """
+    state = build_initial_state(small_specs)
+    current = repair_timetable(state.timetable, instance_specs(state))
+    shared = publish_instance(state_from_timetable(state.info, current))
+    yield shared, state.info, current
+    shared.close()
+
+
+@pytest.mark.parametrize('repair', sorted(REPAIR))
+@pytest.mark.parametrize('destroy', sorted(DESTROY))
+def test_repair_changes_only_destroyed_or_free_cells(published, destroy, repair):
+    shared, _, _ = published
+    current = shared.array('timetable').tolist()
+    for seed in range(5):
+        rng = random.Random(seed)
+        candidate = list(current)
+        cells = DESTROY[destroy](shared, candidate, rng)
+        for idx in cells:
+            candidate[idx] = 0
+        REPAIR[repair](shared, candidate, cells, rng)
+
+        changed = [idx for idx, code in enumerate(candidate) if code != current[idx]]
+        assert all(idx in cells or current[idx] == 0 for idx in changed)
+
+
+def test_greedy_repair_refills_the_destroyed_cell_first(published):
+    shared, _, _ = published
+    current = shared.array('timetable').tolist()
+    for seed, idx in enumerate(idx for idx, code in enumerate(current) if code):
+        # Ora scoasa incape la loc, deci restul orarului (inclusiv celulele libere) ramane neschimbat
+        candidate = list(current)
+        candidate[idx] = 0
+        repair_greedy(shared, candidate, [idx], random.Random(seed))
+
+        assert all(code == current[other] for other, code in enumerate(candidate) if other != idx)
+        assert candidate[idx]
+
+
+def test_encoded_cost_matches_the_state_cost(published):
+    shared, info, current = published
+    init_local(shared)
+    rng = random.Random(0)
+    for seed in range(20):
+        changes, cost = destroy_and_repair((rng.choice(sorted(DESTROY)), rng.choice(sorted(REPAIR)), seed))
+        assert cost == state_from_timetable(info, apply_changes(shared, current, changes)).get_conflicts()
+
+    # Si pentru orare care incalca toate constrangerile obligatorii: sali, specializari, suprapuneri si limita de ore
+    nr_codes = len(shared.teachers) * len(shared.courses) + 1
+    for _ in range(20):
+        codes = [rng.randrange(nr_codes) if rng.random() < 0.7 else 0 for _ in shared.slots]
+        changes = list(enumerate(codes))
+        assert encoded_cost(shared, codes) == \
+            state_from_timetable(info, apply_changes(shared, current, changes)).get_conflicts()
+
+
+def test_operator_weights_follow_recent_rewards():
+    weights = {name: 1.0 for name in DESTROY}
+    for _ in range(30):
+        reward(weights, 'teacher', REWARD_BEST)
+        for name in ('day', 'room', 'course'):
+            reward(weights, name, 0)
+
+    assert weights['teacher'] == pytest.approx(REWARD_BEST, abs=0.01)
+    # Operatorii fara succes scad pana la pondere minima, dar pot fi alesi in continuare
+    assert all(weights[name] == MIN_WEIGHT for name in ('day', 'room', 'course'))
+    rng = random.Random(0)
+    picks = Counter(choose(weights, rng) for _ in range(1000))
+    assert picks.most_common(1)[0][0] == 'teacher' and len(picks) == len(DESTROY)
+
+    # Un operator care incepe sa reuseasca isi recapata ponderea
+    for _ in range(10):
+        reward(weights, 'day', REWARD_BEST)
+    assert weights['day'] > 2
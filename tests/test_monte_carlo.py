@@ -0,0 +1,50 @@
+import monte_carlo
+from monte_carlo import Node, backpropagate, count_nodes, expand_node, prune_tree
+from orar import algorithm_steps, build_initial_state
+
+
+def test_tree_stays_within_the_node_budget(small_specs, monkeypatch):
+    roots = []
+
+    class RecordingNode(Node):
+        __slots__ = ()
+
+        def __init__(self, move=None, parent=None):
+            super().__init__(move, parent)
+            if parent is None:
+                roots.append(self)
+
+    monkeypatch.setattr(monte_carlo, 'Node', RecordingNode)
+
+    initial = build_initial_state(small_specs)
+    max_nodes = 3 * len(initial.cleared().generate_moves())
+    events = algorithm_steps('mtcs', initial, options={'num_simulations': 100, 'max_nodes': max_nodes})
+
+    largest = 0
+    for _ in events:
+        nodes = count_nodes(roots[0])
+        assert nodes <= max_nodes
+        largest = max(largest, nodes)
+    # Arborele a trecut de pragul la care se taie, deci bugetul a fost chiar folosit
+    assert largest > max_nodes * monte_carlo.PRUNE_FRACTION
+
+
+def test_pruned_nodes_keep_their_statistics_and_expand_again(small_specs):
+    state = build_initial_state(small_specs).cleared()
+    root = Node()
+    nodes = 1 + expand_node(root, state)
+
+    child = root.children[0]
+    state.do_move(*child.move)
+    grandchildren = expand_node(child, state)
+    nodes += grandchildren
+    backpropagate(child.children[0], -5)
+    state.undo_move(*child.move)
+
+    nodes = prune_tree(root, nodes, count_nodes(root) - 1)
+    assert nodes == count_nodes(root) == 1 + len(root.children)
+    assert not child.children and not child.expanded
+    assert (child.visits, child.score) == (1, -5)
+
+    state.do_move(*child.move)
+    assert expand_node(child, state) == grandchildren
@@ -0,0 +1,62 @@
+from check_constraints import get_forbidden_slots
+from neighborhoods import place_moves, relocate_moves
+from orar import build_initial_state, state_from_timetable
+
+
+def test_forbidden_slots_match_the_constraint_checker(coverage_specs):
+    # 'Sambata' nu este o zi a instantei, asa ca nu este o preferinta ca toate celelalte
+    coverage_specs['Profesori']['Ion Ionescu']['Constrangeri'] = ['!Sambata']
+    coverage_specs['Profesori']['Ana Pop']['Constrangeri'] = []
+    info = build_initial_state(coverage_specs).info
+
+    assert info.forbidden == get_forbidden_slots(coverage_specs)
+    assert info.forbidden['Ion Ionescu'] == (set(), set())
+    assert info.teacher_class['Ion Ionescu'] == info.teacher_class['Ana Pop']
+
+
+def symmetric_specs():
+    """
+    Doua zile cu cate un interval, doua sali interschimbabile (A1, A2) si una diferita (B), doi profesori
+    interschimbabili (Ana Pop, Ion Ionescu) si unul care nu vrea sa predea marti.
+    """
+    return {
+        'Intervale': ['(8, 10)'],
+        'Zile': ['Luni', 'Marti'],
+        'Materii': {'X': 100},
+        'Profesori': {
+            'Ana Pop': {'Constrangeri': [], 'Materii': ['X']},
+            'Ion Ionescu': {'Constrangeri': [], 'Materii': ['X']},
+            'Dan Popa': {'Constrangeri': ['!Marti'], 'Materii': ['X']},
+        },
+        'Sali': {
+            'A1': {'Capacitate': 20, 'Materii': ['X']},
+            'A2': {'Capacitate': 20, 'Materii': ['X']},
+            'B': {'Capacitate': 30, 'Materii': ['X']},
+        },
+    }
+
+
+def test_placements_keep_one_move_per_symmetry_class():
+    state = build_initial_state(symmetric_specs()).cleared()
+    info = state.info
+    assert info.room_class['A2'] == 'A1' and info.teacher_class['Ion Ionescu'] == 'Ana Pop'
+
+    placements = [(day, interval, room, teacher) for day, interval, room, teacher, _ in state.generate_moves()]
+    placements_by_neighborhood = [(*slot, teacher) for ((slot, (teacher, _)),) in place_moves(state)]
+    for moves in (placements, placements_by_neighborhood):
+        classes = [(day, interval, info.room_class[room], info.teacher_class[teacher])
+                   for day, interval, room, teacher in moves]
+        # 2 zile x 2 clase de sali x 2 clase de profesori, fara nicio mutare echivalenta alteia
+        assert len(classes) == len(set(classes)) == 8
+
+
+def test_relocations_skip_equivalent_rooms():
+    specs = symmetric_specs()
+    initial = build_initial_state(specs)
+    timetable = initial.cleared().timetable
+    timetable['Luni'][(8, 10)]['A1'] = ('Ana Pop', 'X')
+    state = state_from_timetable(initial.info, timetable)
+
+    targets = [target for (_, (target, _)) in relocate_moves(state)]
+    # A2 din acelasi interval este echivalenta cu A1, iar marti se pastreaza doar prima sala din clasa A
+    assert sorted(targets) == [('Luni', (8, 10), 'B'), ('Marti', (8, 10), 'A1'), ('Marti', (8, 10), 'B')]
@@ -0,0 +1,70 @@
+import time
+
+import registry
+from bounds import instance_bounds
+from orar import build_initial_state, state_from_timetable
+from portfolio import portfolio_steps
+from progress import ProgressEvent, last, until
+
+
+def empty_state(initial_state):
+    timetable = {day: {interval: {room: None for room in rooms} for interval, rooms in intervals.items()}
+                 for day, intervals in initial_state.timetable.items()}
+    return state_from_timetable(initial_state.info, timetable, initial_state.seed)
+
+
+def invalid_steps(initial_state, events=200):
+    # Raporteaza imediat un orar invalid cu un cost mai mic decat al oricarui orar valid, apoi continua pana la oprire
+    state = empty_state(initial_state)
+    yield ProgressEvent('invalid', 1, 1, 1, 1, 0.0, state, True)
+    for iteration in range(2, events):
+        time.sleep(0.05)
+        yield ProgressEvent('invalid', iteration, iteration, 1, 1, 0.0, state, False)
+
+
+def short_invalid_steps(initial_state):
+    yield from invalid_steps(initial_state, events=5)
+
+
+def valid_steps(initial_state):
+    time.sleep(0.5)
+    timetable = {day: {interval: dict(rooms) for interval, rooms in intervals.items()}
+                 for day, intervals in initial_state.timetable.items()}
+    timetable['Luni'][(8, 10)]['EG2'] = ('Ana Pop', 'A')
+    state = state_from_timetable(initial_state.info, timetable, initial_state.seed)
+    yield ProgressEvent('valid', 1, 1, state.get_conflicts(), state.get_conflicts(), 0.5, state, True)
+
+
+def test_valid_timetable_wins_over_a_cheaper_invalid_one(coverage_specs, monkeypatch):
+    monkeypatch.setitem(registry.SOLVERS, 'invalid', f'{__name__}:short_invalid_steps')
+    monkeypatch.setitem(registry.SOLVERS, 'valid', f'{__name__}:valid_steps')
+    initial = build_initial_state(coverage_specs)
+    initial.remove_lesson('Luni', (8, 10), 'EG2')
+    assert not initial.is_valid()
+
+    event = last(until(portfolio_steps(initial, ['invalid', 'valid']), time_limit=30))
+
+    assert event.solver == 'valid'
+    assert event.best_state.is_valid()
+    assert event.best_cost == 2
+
+
+def test_race_goes_on_after_a_valid_seed(small_specs):
+    # lns si ga emit la iteratia 0 orarul initial reparat, de obicei valid, dar departe de optim
+    initial = build_initial_state(small_specs)
+    event = last(until(portfolio_steps(initial, ['ga', 'lns']), time_limit=60))
+
+    assert event.best_state.is_valid()
+    assert event.best_cost == instance_bounds(initial).lower_bound() == 0
+
+
+def test_valid_timetable_at_the_lower_bound_stops_the_race(small_specs, monkeypatch):
+    monkeypatch.setitem(registry.SOLVERS, 'invalid', f'{__name__}:invalid_steps')
+    initial = build_initial_state(small_specs)
+
+    start = time.time()
+    event = last(until(portfolio_steps(initial, ['invalid', 'lns']), time_limit=30))
+
+    assert event.solver == 'lns' and event.best_cost == 0
+    # Cursa se opreste fara sa astepte algoritmul care ar mai rula inca 10 secunde
+    assert time.time() - start < 8
@@ -0,0 +1,10 @@
+import registry
+
+
+def test_built_in_names_do_not_read_entry_points(monkeypatch):
+    monkeypatch.setattr(registry, '_entry_points', None)
+    assert all(registry.exists(name) for name in registry.SOLVERS)
+    assert registry._entry_points is None
+
+    assert not registry.exists('no-such-solver')
+    assert registry._entry_points is not None
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from client import SolverClient
+from orar import build_initial_state
+from service import SolverService
+from utils import read_yaml_file, render_timetable
+
+INPUTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'inputs')
+SMALL = os.path.join(INPUTS, 'orar_mic_exact.yaml')
+LARGE = os.path.join(INPUTS, 'orar_mare_relaxat.yaml')  # mtcs nu se termina pe ea in mai putin de 30 de secunde
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """
+    Porneste serviciul pe un socket temporar si ruleaza scenariul dat cu un client conectat la el.
+    """
+    socket = str(tmp_path / 'orar.sock')
+
+    def run(scenario, workers=2):
+        async def main():
+            service = SolverService(workers)
+            await service.start(socket)
+            try:
+                async with SolverClient(socket) as client:
+                    return await scenario(client, socket)
+            finally:
+                await service.close()
+        return asyncio.run(main())
+
+    return run
+
+
+def test_solve_then_validate(serve):
+    async def scenario(client, socket):
+        job = await client.submit('solve', SMALL, algorithm='hc')
+        solved = await client.wait(job)
+        validated = await client.wait(await client.submit('validate', SMALL, timetable=solved['result']['timetable']))
+        return solved, validated
+
+    solved, validated = serve(scenario)
+    assert solved['event'] == 'done'
+    result = solved['result']
+    assert result['mandatory'] == 0 and result['cost'] >= result['lower_bound']
+    assert validated['event'] == 'done'
+    assert (validated['result']['mandatory'], validated['result']['optional']) == (0, result['optional'])
+
+
+def test_repair_covers_an_empty_timetable(serve):
+    specs = read_yaml_file(SMALL)
+    empty = {day: {interval: {room: None for room in rooms} for interval, rooms in intervals.items()}
+             for day, intervals in build_initial_state(specs).timetable.items()}
+
+    async def scenario(client, socket):
+        return await client.wait(await client.submit('repair', SMALL, timetable=render_timetable(empty, specs)))
+
+    event = serve(scenario)
+    assert event['event'] == 'done'
+    assert event['result']['mandatory_before'] > 0
+    assert event['result']['mandatory'] == 0
+
+
+def test_cancel_returns_the_best_state_so_far(serve):
+    async def scenario(client, socket):
+        job = await client.submit('solve', LARGE, algorithm='mtcs')
+        async for event in client.watch(job):
+            if event['event'] == 'progress':
+                break
+        # Conexiunea primului client urmareste inca jobul, asa ca anularea se trimite din alt client
+        async with SolverClient(socket) as other:
+            start = time.time()
+            await other.cancel(job)
+            final = await other.wait(job)
+        return final, time.time() - start
+
+    event, elapsed = serve(scenario)
+    assert event['event'] == 'cancelled'
+    assert event['result']['cancelled'] and event['result']['timetable']
+    assert elapsed < 20
+
+
+def test_time_budget_stops_the_job(serve):
+    async def scenario(client, socket):
+        return await client.wait(await client.submit('solve', LARGE, algorithm='mtcs', time_limit=1))
+
+    event = serve(scenario)
+    assert event['event'] == 'done'
+    assert event['result']['elapsed'] < 15
+    assert event['result']['timetable']
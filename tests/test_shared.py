@@ -0,0 +1,36 @@
+import random
+
+from orar import build_initial_state
+from shared import attach_instance, publish_instance
+
+
+def test_worker_reads_every_stored_timetable_from_the_shared_block(small_specs):
+    state = build_initial_state(small_specs)
+    shared = publish_instance(state)
+    worker = attach_instance(shared.name)
+    try:
+        assert worker.load_timetable() == state.timetable
+        # Vederea workerului este peste acelasi bloc: vede fiecare scriere fara sa se ataseze din nou
+        cells = worker.array('timetable')
+        rng = random.Random(0)
+        slots = [(day, interval, room) for day in state.timetable for interval in state.timetable[day]
+                 for room in state.timetable[day][interval]]
+        timetable = state.timetable
+        for _ in range(20):
+            timetable = {day: {interval: dict(rooms) for interval, rooms in intervals.items()}
+                         for day, intervals in timetable.items()}
+            for _ in range(5):
+                (day, interval, room), (other_day, other_interval, other_room) = rng.sample(slots, 2)
+                timetable[day][interval][room], timetable[other_day][other_interval][other_room] = \
+                    timetable[other_day][other_interval][other_room], None
+            shared.store_timetable(timetable)
+            assert worker.load_timetable() == timetable
+            assert [worker.decode(code) for code in cells] == \
+                [timetable[day][interval][room] for day, interval, room in worker.slots]
+
+        changes = [(idx, 0) for idx, code in enumerate(cells) if code][:3]
+        shared.store_cells(changes)
+        assert all(cells[idx] == 0 for idx, _ in changes)
+    finally:
+        worker.close()
+        shared.close()
@@ -0,0 +1,91 @@
+import copy
+import os
+import time
+
+from check_constraints import validate_timetable
+from orar import build_initial_state, state_from_timetable
+from repair import repair_timetable
+from store import SolutionStore, instance_fingerprint
+from utils import PROFESORI
+
+
+def solved_state(specs):
+    initial = build_initial_state(specs)
+    return state_from_timetable(initial.info, repair_timetable(initial.timetable, specs))
+
+
+def test_exact_match_warm_start_returns_the_stored_timetable(tmp_path, small_specs):
+    store = SolutionStore(str(tmp_path))
+    state = solved_state(small_specs)
+    assert store.save(small_specs, state)
+
+    assert store.lookup(small_specs)[1] == 1.0
+    assert store.warm_start(small_specs) == state.timetable
+
+
+def test_near_match_warm_start_is_adapted_and_repaired(tmp_path, small_specs):
+    store = SolutionStore(str(tmp_path))
+    state = solved_state(small_specs)
+    store.save(small_specs, state)
+
+    # Profesorul cu cele mai multe ore pleaca: orele lui dispar din orar, iar reparatia le acopera cu ceilalti
+    hours = {}
+    for intervals in state.timetable.values():
+        for rooms in intervals.values():
+            for lesson in filter(None, rooms.values()):
+                hours[lesson[0]] = hours.get(lesson[0], 0) + 1
+    teacher = max(hours, key=hours.get)
+    specs = copy.deepcopy(small_specs)
+    del specs[PROFESORI][teacher]
+
+    entry, score = store.lookup(specs)
+    assert entry is not None and score < 1.0
+    timetable = store.warm_start(specs)
+    assert all(lesson[0] != teacher for intervals in timetable.values() for rooms in intervals.values()
+               for lesson in rooms.values() if lesson)
+    assert validate_timetable(timetable, specs)[0] == 0
+
+
+def test_save_keeps_only_better_timetables(tmp_path, small_specs):
+    store = SolutionStore(str(tmp_path))
+    initial = build_initial_state(small_specs)
+    solved = solved_state(small_specs)
+
+    assert store.save(small_specs, initial)
+    assert store.save(small_specs, solved)
+    assert not store.save(small_specs, initial)
+    assert not store.save(small_specs, solved)
+    assert store.warm_start(small_specs) == solved.timetable
+
+
+def test_eviction_removes_oversized_and_least_recently_used_entries(tmp_path, small_specs):
+    state = solved_state(small_specs)
+
+    # O solutie mai mare decat tot depozitul este stearsa imediat, iar save() nu o raporteaza ca salvata
+    assert not SolutionStore(str(tmp_path), max_bytes=10).save(small_specs, state)
+    assert not os.listdir(tmp_path)
+
+    other = copy.deepcopy(small_specs)
+    other[PROFESORI].popitem()
+    near = copy.deepcopy(other)
+    near[PROFESORI].popitem()
+    store = SolutionStore(str(tmp_path))
+    store.save(small_specs, state)
+    store.save(other, solved_state(other))
+    first, second = (store.entry_path(instance_fingerprint(specs)) for specs in (small_specs, other))
+    old = time.time() - 3600
+    os.utime(first, (old, old))
+    os.utime(second, (old - 1, old - 1))
+
+    # Solutia folosita pentru o instanta asemanatoare devine cea mai recenta, deci se sterge cealalta
+    entry, score = store.lookup(near)
+    assert score < 1.0 and entry['fingerprint'] == instance_fingerprint(other)
+    assert os.stat(second).st_mtime > old
+    SolutionStore(str(tmp_path), max_bytes=os.path.getsize(second)).evict()
+    assert not os.path.exists(first) and os.path.exists(second)
+
+    SolutionStore(str(tmp_path), max_age=60).evict()
+    assert os.path.exists(second)
+    os.utime(second, (old, old))
+    SolutionStore(str(tmp_path), max_age=60).evict()
+    assert not os.listdir(tmp_path)
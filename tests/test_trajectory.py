@@ -0,0 +1,13 @@
+from orar import build_initial_state, run_algorithm
+from trajectory import read_trajectory, replay
+
+
+def test_replay_of_a_recorded_hc_run_gives_the_final_timetable(small_specs, tmp_path):
+    path = str(tmp_path / 'hc.log')
+    initial = build_initial_state(small_specs)
+    final_state, iterations, _ = run_algorithm('hc', initial, trajectory=path)
+
+    header, records = read_trajectory(path)
+    assert iterations > 1 and records[-1][0] == iterations
+    assert replay(header, records) == final_state.timetable
+    assert replay(header, records, iteration=0) == initial.timetable
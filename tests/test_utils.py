@@ -0,0 +1,43 @@
+import io
+
+from check_constraints import parse_timetable_lines
+from utils import write_timetable
+
+
+def test_written_timetable_parses_back_on_a_two_day_instance():
+    # Doua zile, nume lungi de sala (coloane mai late decat formatul initial) si profesori cu aceleasi initiale
+    specs = {
+        'Intervale': ['(8, 10)', '(10, 12)'],
+        'Zile': ['Marti', 'Sambata'],
+        'Materii': {'Algoritmi': 40, 'PL': 20},
+        'Profesori': {
+            'Ion Ionescu': {'Constrangeri': [], 'Materii': ['Algoritmi', 'PL']},
+            'Ilie Ivan': {'Constrangeri': ['!Sambata'], 'Materii': ['PL']},
+        },
+        'Sali': {
+            'Amfiteatrul Mare Al Facultatii': {'Capacitate': 40, 'Materii': ['Algoritmi']},
+            'EG1': {'Capacitate': 20, 'Materii': ['Algoritmi', 'PL']},
+        },
+    }
+    timetable = {
+        'Marti': {
+            (8, 10): {'Amfiteatrul Mare Al Facultatii': ('Ion Ionescu', 'Algoritmi'), 'EG1': ('Ilie Ivan', 'PL')},
+            (10, 12): {'Amfiteatrul Mare Al Facultatii': None, 'EG1': None},
+        },
+        'Sambata': {
+            (8, 10): {'Amfiteatrul Mare Al Facultatii': None, 'EG1': None},
+            (10, 12): {'Amfiteatrul Mare Al Facultatii': None, 'EG1': ('Ion Ionescu', 'PL')},
+        },
+    }
+
+    by_day = io.StringIO()
+    write_timetable(timetable, specs, by_day)
+    assert parse_timetable_lines(specs, by_day.getvalue().splitlines()) == timetable
+    assert [cell.strip() for cell in by_day.getvalue().splitlines()[0].split('|')[1:-1]] == ['Interval'] + specs['Zile']
+    assert len({len(line) for line in by_day.getvalue().splitlines()}) == 1
+
+    # Acelasi tabel si pentru orarul dat pe intervale
+    by_interval = io.StringIO()
+    write_timetable({interval: {day: timetable[day][interval] for day in timetable} for interval in timetable['Marti']},
+                    specs, by_interval)
+    assert by_interval.getvalue() == by_day.getvalue()
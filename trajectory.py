@@ -0,0 +1,175 @@
+import argparse
+import json
+import struct
+import sys
+
+from utils import read_yaml_file, write_timetable
+
+
+MAGIC = b'ORARLOG1'
+HEADER = struct.Struct('<I')  # Lungimea antetului JSON de dupa MAGIC
+# Inregistrare: iteratie, zi, interval, sala, ora, diferenta de cost, cel mai bun cost, momentul (secunde de la start)
+RECORD = struct.Struct('<IBBHiqqd')
+NO_SLOT = 0xFFFF  # Sala folosita de inregistrarile unei iteratii care nu a schimbat orarul
+BUFFER_SIZE = 1 << 16
+
+
+class TrajectoryWriter:
+    def __init__(self, path, days, intervals, rooms, teachers, courses):
+        """
+        Jurnal binar al cautarii, cu inregistrari de lungime fixa (RECORD) scrise printr-un buffer.
+
+        Fiecare iteratie produce cate o inregistrare pentru fiecare slot al celei mai bune stari care s-a schimbat
+        (sau una singura, cu sala NO_SLOT, daca nu s-a schimbat nimic), asa ca orarul de dupa orice iteratie se
+        poate reconstrui pornind de la orarul gol.
+
+        Args:
+            path (str): Fisierul jurnalului.
+            days, intervals, rooms, teachers, courses (list): Ordinea folosita pentru codificarea sloturilor si orelor.
+        """
+        self.days, self.intervals, self.rooms = days, intervals, rooms
+        self.teacher_idx = {teacher: idx for idx, teacher in enumerate(teachers)}
+        self.course_idx = {course: idx for idx, course in enumerate(courses)}
+        self.nr_courses = len(courses)
+        # Codurile orelor din ultimul orar scris, in ordinea zi - interval - sala
+        self.codes = [0] * (len(days) * len(intervals) * len(rooms))
+
+        self.file = open(path, 'wb', buffering=BUFFER_SIZE)
+        header = json.dumps({'days': days, 'intervals': [list(interval) for interval in intervals],
+                             'rooms': rooms, 'teachers': teachers, 'courses': courses}).encode()
+        self.file.write(MAGIC + HEADER.pack(len(header)) + header)
+
+    def encode(self, lesson):
+        if lesson is None:
+            return 0
+        return self.teacher_idx[lesson[0]] * self.nr_courses + self.course_idx[lesson[1]] + 1
+
+    def write(self, iteration, timetable, cost_delta, best_cost, elapsed, changed=True):
+        """
+        Scrie inregistrarile unei iteratii.
+
+        Args:
+            iteration (int): Numarul iteratiei.
+            timetable (dict): Orarul celei mai bune stari.
+            cost_delta (int): Diferenta de cost fata de iteratia precedenta.
+            best_cost (int): Costul celei mai bune stari.
+            elapsed (float): Secunde de la pornirea cautarii.
+            changed (bool): False daca se stie ca orarul nu s-a schimbat (nu se mai compara).
+        """
+        written = False
+        if changed:
+            idx = 0
+            for d, day in enumerate(self.days):
+                for i, interval in enumerate(self.intervals):
+                    rooms = timetable[day][interval]
+                    for r, room in enumerate(self.rooms):
+                        code = self.encode(rooms.get(room))
+                        if code != self.codes[idx]:
+                            self.codes[idx] = code
+                            self.file.write(RECORD.pack(iteration, d, i, r, code, cost_delta, best_cost, elapsed))
+                            written = True
+                        idx += 1
+        if not written:
+            self.file.write(RECORD.pack(iteration, 0, 0, NO_SLOT, 0, cost_delta, best_cost, elapsed))
+
+    def close(self):
+        self.file.close()
+
+
+def record_trajectory(events, path):
+    """
+    Transmite mai departe evenimentele unui algoritm, scriind traiectoria celei mai bune stari in jurnal.
+    Starea se compara cu ultimul orar scris doar la primul eveniment si la cele cu imbunatatiri.
+
+    Args:
+        events (generator): Generatorul de evenimente al algoritmului.
+        path (str): Fisierul jurnalului.
+
+    Yields:
+        ProgressEvent: Evenimentele algoritmului, nemodificate.
+    """
+    writer, cost = None, None
+    try:
+        for event in events:
+            if writer is None:
+                state = event.best_state
+                days = list(state.timetable)
+                writer = TrajectoryWriter(path, days, list(state.timetable[days[0]]), list(state.info.classrooms),
+                                          list(state.info.teachers), list(state.info.courses))
+            writer.write(event.iteration, event.best_state.timetable, 0 if cost is None else event.cost - cost,
+                         event.best_cost, event.elapsed, changed=cost is None or event.improved)
+            cost = event.cost
+            yield event
+    finally:
+        events.close()
+        if writer is not None:
+            writer.close()
+
+
+def read_trajectory(path):
+    """
+    Citeste un jurnal scris de TrajectoryWriter.
+
+    Returns:
+        dict: Antetul (ordinea zilelor, intervalelor, salilor, profesorilor si materiilor).
+        list: Inregistrarile, ca tupluri (iteratie, zi, interval, sala, ora, diferenta de cost, cost, moment).
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f'{path} nu este un jurnal de traiectorie')
+    (length,) = HEADER.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + HEADER.size
+    header = json.loads(data[start:start + length])
+    header['intervals'] = [tuple(interval) for interval in header['intervals']]
+    body = data[start + length:]
+    body = body[:len(body) - len(body) % RECORD.size]  # O inregistrare scrisa pe jumatate la oprire se ignora
+    return header, list(RECORD.iter_unpack(body))
+
+
+def replay(header, records, iteration=None):
+    """
+    Reconstruieste orarul celei mai bune stari de dupa iteratia data (implicit, ultima).
+
+    Returns:
+        dict: Orarul (zile -> intervale -> sali -> (profesor, materie) sau None).
+    """
+    days, intervals, rooms = header['days'], header['intervals'], header['rooms']
+    teachers, courses = header['teachers'], header['courses']
+    timetable = {day: {interval: {room: None for room in rooms} for interval in intervals} for day in days}
+    for record in records:
+        step, d, i, r, code = record[:5]
+        if iteration is not None and step > iteration:
+            break
+        if r != NO_SLOT:
+            timetable[days[d]][intervals[i]][rooms[r]] = \
+                None if code == 0 else (teachers[(code - 1) // len(courses)], courses[(code - 1) % len(courses)])
+    return timetable
+
+
+def summary(records, file):
+    """
+    Scrie cate o linie pentru fiecare iteratie: sloturile schimbate, diferenta de cost, cel mai bun cost si momentul.
+    """
+    iterations = {}
+    for step, _, _, room, _, delta, best, elapsed in records:
+        changed, _, _, _ = iterations.get(step, (0, delta, best, elapsed))
+        iterations[step] = (changed + (room != NO_SLOT), delta, best, elapsed)
+    for step, (changed, delta, best, elapsed) in iterations.items():
+        file.write(f"{step:>8} {changed:>6} slots {delta:>+10} cost {best:>10} best {elapsed:>10.3f}s\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay a search trajectory log written with --trajectory.')
+    parser.add_argument('input_file', type=str, help='Input YAML file containing timetable specifications')
+    parser.add_argument('log_file', type=str, help='Trajectory log')
+    parser.add_argument('--iteration', type=int, default=None, help='Rebuild the best timetable after this iteration (default: the last one)')
+    parser.add_argument('--summary', action='store_true', help='Print one line per iteration instead of the timetable')
+    args = parser.parse_args()
+
+    header, records = read_trajectory(args.log_file)
+    if args.summary:
+        summary(records, sys.stdout)
+    else:
+        timetable_specs = read_yaml_file(args.input_file)
+        write_timetable(replay(header, records, args.iteration), timetable_specs, sys.stdout)
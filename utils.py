@@ -1,6 +1,6 @@
-import yaml
 import argparse
 import sys
+import io
 
 ##################### MACROURI #####################
 INTERVALE = 'Intervale'
@@ -15,6 +15,8 @@ def read_yaml_file(file_path : str) -> dict:
     '''
     Citeste un fișier yaml și returnează conținutul său sub formă de dicționar
     '''
+    import yaml  # PyYAML se incarca doar cand se citeste un fisier
+
     with open(file_path, 'r') as file:
         return yaml.safe_load(file)
     
@@ -136,97 +138,88 @@ def allign_string_with_spaces(s : str, max_len : int, allignment_type : str = 'c
     return s
 
 
-def pretty_print_timetable_aux_zile(timetable : {str : {(int, int) : {str : (str, str)}}}, input_path : str) -> str:
+def timetable_column_width(timetable_specs : dict, min_len : int = 30) -> int:
     '''
-    Primește un dicționar ce are chei zilele, cu valori dicționare de intervale reprezentate ca tupluri de int-uri, cu valori dicționare de săli, cu valori tupluri (profesor, materie)
+    Primește specificațiile orarului
 
-    Returnează un string formatat să arate asemenea unui tabel excel cu zilele pe linii, intervalele pe coloane și în intersecția acestora, ferestrele de 2 ore cu materiile alocate în fiecare sală fiecărui profesor
+    Returnează lățimea unei coloane a tabelului, calculată o singură dată din cele mai lungi nume de materie, sală,
+    inițiale de profesor și zi, astfel încât orice celulă să încapă (cel puțin min_len, lățimea formatului inițial)
     '''
 
-    max_len = 30
+    profs_to_initials, _ = get_profs_initials(timetable_specs[PROFESORI])
 
-    profs = read_yaml_file(input_path)[PROFESORI].keys()
-    profs_to_initials, _ = get_profs_initials(profs)
+    longest_room = max(len(room) for room in timetable_specs[SALI])
+    longest_subject = max(len(subject) for subject in timetable_specs[MATERII])
+    longest_initials = max(len(initials) for initials in profs_to_initials.values())
 
-    table_str = '|           Interval           |             Luni             |             Marti            |           Miercuri           |              Joi             |            Vineri            |\n'
+    # 6 spații de aliniere la stânga + "materie : (sală - inițiale)" sau "sală - goala", plus cel puțin un spațiu la final
+    lesson_len = 6 + longest_subject + len(' : ( - )') + longest_room + longest_initials + 1
+    empty_len = 6 + longest_room + len(' - goala') + 1
+    day_len = max(len(day) for day in timetable_specs[ZILE]) + 2
 
-    no_classes = len(timetable['Luni'][(8, 10)])
+    return max(min_len, lesson_len, empty_len, day_len)
 
-    first_line_len = 187
-    delim = '-' * first_line_len + '\n'
-    table_str = table_str + delim
-    
-    for interval in timetable['Luni']:
-        s_interval = '|'
-        
-        crt_str = allign_string_with_spaces(f'{interval[0]} - {interval[1]}', max_len, 'center')
 
-        s_interval += crt_str
+def write_timetable(timetable : dict, timetable_specs : dict, file) -> None:
+    '''
+    Primește un orar (fie zile -> intervale -> săli, fie intervale -> zile -> săli, cu valori tupluri (profesor, materie) sau None),
+    specificațiile lui și un fișier deschis pentru scriere
 
-        for class_idx in range(no_classes):
-            if class_idx != 0:
-                s_interval += f'|{30 * " "}'
+    Scrie orarul în fișier, rând cu rând, sub forma unui tabel cu intervalele pe linii și zilele pe coloane.
+    Zilele, intervalele și sălile se iau din specificații; lățimea coloanelor și inițialele profesorilor se calculează o singură dată,
+    deci timpul de scriere este liniar în dimensiunea orarului, iar memoria suplimentară nu depinde de numărul de săli
+    '''
 
-            for day in timetable:
-                classes = timetable[day][interval]
-                classroom = list(classes.keys())[class_idx]
+    max_len = timetable_column_width(timetable_specs)
+    profs_to_initials, _ = get_profs_initials(timetable_specs[PROFESORI])
 
-                s_interval += '|'
+    days = timetable_specs[ZILE]
+    intervals = [eval(interval) for interval in timetable_specs[INTERVALE]]
+    rooms = list(timetable_specs[SALI])
+    by_day = any(day in timetable for day in days)
 
-                if not classes[classroom]:
-                    s_interval += allign_string_with_spaces(f'{classroom} - goala', max_len, 'left')
-                else:
-                    prof, subject = classes[classroom]
-                    s_interval += allign_string_with_spaces(f'{subject} : ({classroom} - {profs_to_initials[prof]})', max_len, 'left')
-            
-            s_interval += '|\n'
-        table_str += s_interval + delim
+    file.write('|' + allign_string_with_spaces('Interval', max_len, 'center'))
+    for day in days:
+        file.write('|' + allign_string_with_spaces(day, max_len, 'center'))
+    file.write('|\n')
 
-    return table_str
+    delim = '-' * ((max_len + 1) * (len(days) + 1) + 1) + '\n'
+    file.write(delim)
 
-def pretty_print_timetable_aux_intervale(timetable : {(int, int) : {str : {str : (str, str)}}}, input_path : str) -> str:
-    '''
-    Primește un dicționar de intervale reprezentate ca tupluri de int-uri, cu valori dicționare de zile, cu valori dicționare de săli, cu valori tupluri (profesor, materie)
+    empty_interval = ' ' * max_len
 
-    Returnează un string formatat să arate asemenea unui tabel excel cu zilele pe linii, intervalele pe coloane și în intersecția acestora, ferestrele de 2 ore cu materiile alocate în fiecare sală fiecărui profesor
-    '''
+    for interval in intervals:
+        columns = [(timetable[day][interval] if by_day else timetable[interval][day]) for day in days]
 
-    max_len = 30
+        for class_idx, classroom in enumerate(rooms):
+            if class_idx == 0:
+                file.write('|' + allign_string_with_spaces(f'{interval[0]} - {interval[1]}', max_len, 'center'))
+            else:
+                file.write('|' + empty_interval)
 
-    profs = read_yaml_file(input_path)[PROFESORI].keys()
-    profs_to_initials, _ = get_profs_initials(profs)
-
-    table_str = '|           Interval           |             Luni             |             Marti            |           Miercuri           |              Joi             |            Vineri            |\n'
-
-    no_classes = len(timetable[(8, 10)]['Luni'])
+            for classes in columns:
+                lesson = classes.get(classroom)
+                if not lesson:
+                    file.write('|' + allign_string_with_spaces(f'{classroom} - goala', max_len, 'left'))
+                else:
+                    prof, subject = lesson
+                    file.write('|' + allign_string_with_spaces(f'{subject} : ({classroom} - {profs_to_initials[prof]})', max_len, 'left'))
 
-    first_line_len = 187
-    delim = '-' * first_line_len + '\n'
-    table_str = table_str + delim
-    
-    for interval in timetable:
-        s_interval = '|' + allign_string_with_spaces(f'{interval[0]} - {interval[1]}', max_len, 'center')
+            file.write('|\n')
+        file.write(delim)
 
-        for class_idx in range(no_classes):
-            if class_idx != 0:
-                s_interval += '|'
 
-            for day in timetable[interval]:
-                classes = timetable[interval][day]
-                classroom = list(classes.keys())[class_idx]
+def render_timetable(timetable : dict, timetable_specs : dict) -> str:
+    '''
+    Primește un orar și specificațiile lui
 
-                s_interval += '|'
+    Returnează tabelul scris de write_timetable sub formă de string
+    '''
 
-                if not classes[classroom]:
-                    s_interval += allign_string_with_spaces(f'{classroom} - goala', max_len, 'left')
-                else:
-                    prof, subject = classes[classroom]
-                    s_interval += allign_string_with_spaces(f'{subject} : ({classroom} - {profs_to_initials[prof]})', max_len, 'left')
-            
-            s_interval += '|\n'
-        table_str += s_interval + delim
+    output = io.StringIO()
+    write_timetable(timetable, timetable_specs, output)
+    return output.getvalue()
 
-    return table_str
 
 def pretty_print_timetable(timetable : dict, input_path : str) -> str:
     '''
@@ -235,10 +228,7 @@ def pretty_print_timetable(timetable : dict, input_path : str) -> str:
     
     Pentru cazul în care o sală nu este ocupată la un moment de timp, se așteaptă 'None' în valoare, în loc de tuplu
     '''
-    if 'Luni' in timetable:
-        return pretty_print_timetable_aux_zile(timetable, input_path)
-    else:
-        return pretty_print_timetable_aux_intervale(timetable, input_path)
+    return render_timetable(timetable, read_yaml_file(input_path))
 
 
 if __name__ == '__main__':